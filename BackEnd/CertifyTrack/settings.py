@@ -11,6 +11,7 @@ Modified to:
 - Safer parsing for CORS env var.
 """
 
+import importlib.util
 import os
 from pathlib import Path
 from datetime import timedelta
@@ -144,6 +145,12 @@ REST_FRAMEWORK = {
     ],
 }
 
+# List endpoints are cursor paginated (api/pagination.py) for clients that
+# pass ?cursor= or ?page_size=: rows per page when only ?cursor= is given,
+# and the most a client may ask for with ?page_size=
+API_PAGE_SIZE = int(os.getenv("API_PAGE_SIZE", "100"))
+API_MAX_PAGE_SIZE = int(os.getenv("API_MAX_PAGE_SIZE", "1000"))
+
 # Simple JWT sensible defaults (can be overridden via env vars)
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=int(os.getenv("JWT_ACCESS_MINUTES", "60"))),
@@ -153,6 +160,8 @@ SIMPLE_JWT = {
 
 # CORS settings
 CORS_ALLOW_CREDENTIALS = True
+# Let the frontend read the pagination cursors and calendar ETags
+CORS_EXPOSE_HEADERS = ["Link", "X-Next-Cursor", "X-Previous-Cursor", "ETag"]
 
 def _parse_csv_env(env_name, default):
     """
@@ -209,9 +218,100 @@ EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD", "")
 EMAIL_USE_TLS = os.getenv("EMAIL_USE_TLS", "True").lower() in ("1", "true", "yes")
 DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL", "noreply@certifytrack.com")
 
+# Email outbox (api.mailer): emails are queued as EmailOutbox rows and sent
+# by `manage.py deliver_emails` over one connection per batch.
+# EMAIL_RATE_LIMIT_PER_MINUTE caps sends to the provider (EMAIL_HOST);
+# 0 means no limit. It is counted in the cache below, so it only holds
+# across processes with REDIS_URL; with the local-memory cache every
+# process gets the whole limit. Failed sends are retried after
+# EMAIL_RETRY_BACKOFF_SECONDS * 2**(attempt - 1).
+EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", "50"))
+EMAIL_RATE_LIMIT_PER_MINUTE = int(os.getenv("EMAIL_RATE_LIMIT_PER_MINUTE", "0"))
+EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", "5"))
+EMAIL_RETRY_BACKOFF_SECONDS = int(os.getenv("EMAIL_RETRY_BACKOFF_SECONDS", "60"))
+EMAIL_POLL_INTERVAL_SECONDS = int(os.getenv("EMAIL_POLL_INTERVAL_SECONDS", "5"))
+EMAIL_LOCK_TIMEOUT_SECONDS = int(os.getenv("EMAIL_LOCK_TIMEOUT_SECONDS", "600"))
+
+# Event reminders (manage.py send_event_reminders): how long before an
+# event's start each reminder is sent, e.g. "24h,1h" (suffixes m, h, d)
+EVENT_REMINDER_OFFSETS = [
+    offset.strip()
+    for offset in os.getenv("EVENT_REMINDER_OFFSETS", "24h,1h").split(",")
+    if offset.strip()
+]
+
 # Verification & Password Reset
 EMAIL_VERIFICATION_TIMEOUT_DAYS = int(os.getenv("EMAIL_VERIFICATION_TIMEOUT_DAYS", "7"))
 PASSWORD_RESET_TIMEOUT_MINUTES = int(os.getenv("PASSWORD_RESET_TIMEOUT_MINUTES", "10"))
 
 # Frontend URLs for email links
 FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:5173")
+
+# Certificate generation: number of worker processes used to render PDFs.
+# 1 renders inline in the calling process.
+CERTIFICATE_WORKERS = int(os.getenv("CERTIFICATE_WORKERS", str(os.cpu_count() or 1)))
+
+# CSV/XLSX imports (attendance, bulk users, mentee assignment): rows read,
+# validated and written per batch
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "500"))
+
+# Bulk user provisioning (a provision_users job): processes used to hash
+# temporary passwords. 1 hashes inline in the job worker.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+
+# Dashboard counters (api.stats): seconds a counter value is cached. Writes
+# invalidate the cached value; `manage.py reconcile_stats` fixes any drift.
+STATS_CACHE_TIMEOUT = int(os.getenv("STATS_CACHE_TIMEOUT", "300"))
+
+# Background jobs (manage.py run_workers)
+# REDIS_URL is optional: when set, workers are woken through a Redis list
+# instead of waiting for the next database poll.
+REDIS_URL = os.getenv("REDIS_URL", "")
+JOB_QUEUE_KEY = os.getenv("JOB_QUEUE_KEY", "certifytrack:jobs")
+JOB_WORKER_CONCURRENCY = int(os.getenv("JOB_WORKER_CONCURRENCY", "2"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_BACKOFF_SECONDS = int(os.getenv("JOB_RETRY_BACKOFF_SECONDS", "30"))
+JOB_POLL_INTERVAL_SECONDS = int(os.getenv("JOB_POLL_INTERVAL_SECONDS", "2"))
+JOB_LOCK_TIMEOUT_SECONDS = int(os.getenv("JOB_LOCK_TIMEOUT_SECONDS", "1800"))
+# A running job renews its lock this often; keep it well under the timeout.
+JOB_HEARTBEAT_SECONDS = int(os.getenv("JOB_HEARTBEAT_SECONDS", "60"))
+
+# Event status daemon (manage.py update_event_statuses --daemon): sleeps
+# until the next status transition, but at most this long so edited events
+# are picked up; with REDIS_URL, saving an event wakes it at once.
+EVENT_STATUS_WAKE_KEY = os.getenv("EVENT_STATUS_WAKE_KEY", "certifytrack:event-status")
+EVENT_STATUS_MAX_SLEEP_SECONDS = int(os.getenv("EVENT_STATUS_MAX_SLEEP_SECONDS", "300"))
+
+# Cache: Redis when REDIS_URL is set (and django-redis is installed), shared
+# by all processes; otherwise local memory, private to each process.
+if REDIS_URL and importlib.util.find_spec("django_redis"):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': os.getenv("CACHE_REDIS_URL", REDIS_URL),
+            'KEY_PREFIX': 'certifytrack',
+            'OPTIONS': {
+                'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+                # A Redis outage degrades to cache misses instead of errors
+                'IGNORE_EXCEPTIONS': True,
+            },
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'certifytrack',
+            'OPTIONS': {'MAX_ENTRIES': int(os.getenv("LOCMEM_CACHE_MAX_ENTRIES", "10000"))},
+        }
+    }
+
+# Seconds a cached API response (api.caching) is kept. Tagged writes
+# invalidate earlier; the timeout bounds staleness from untagged writes.
+API_CACHE_TIMEOUT = int(os.getenv("API_CACHE_TIMEOUT", "300"))
+
+# Hall bookings (api.hall_availability.run_locked): times a booking is
+# tried when the database gives up waiting for the hall's lock, and the
+# delay in seconds before the first retry (doubled for every further one).
+HALL_LOCK_ATTEMPTS = int(os.getenv("HALL_LOCK_ATTEMPTS", "5"))
+HALL_LOCK_RETRY_DELAY = float(os.getenv("HALL_LOCK_RETRY_DELAY", "0.05"))
@@ -20,7 +20,7 @@ from django.conf import settings
 from django.conf.urls.static import static
 
 # Custom view to serve certificate files with framing allowed
-from django.http import HttpResponse
+from django.http import FileResponse
 from django.views.decorators.http import require_GET
 
 @require_GET
@@ -37,13 +37,13 @@ def serve_certificate(request, path):
         raise Http404("File not found")
 
     try:
-        with open(file_path, 'rb') as f:
-            response = HttpResponse(f.read(), content_type='application/pdf')
-            # Explicitly allow framing for certificate previews
-            response['X-Frame-Options'] = 'ALLOWALL'
-            return response
+        # FileResponse streams the file in chunks and closes it when done
+        response = FileResponse(open(file_path, 'rb'), content_type='application/pdf')
     except IOError:
         raise Http404("File not readable")
+    # Explicitly allow framing for certificate previews
+    response['X-Frame-Options'] = 'ALLOWALL'
+    return response
 
 urlpatterns = [
     # Certificate serving URLs must come BEFORE static files
@@ -0,0 +1,240 @@
+"""
+AICTE points ledger for CertifyTrack.
+
+Approved, pending and rejected point totals are stored per student (on
+Student) and per student and category (AICTEPointLedger), so dashboards
+and compliance filters read indexed columns instead of aggregating every
+student's transactions.
+
+The totals are adjusted by deltas: the signals in api.signals record every
+transaction save and delete, and code that writes transactions in bulk
+(bulk_create and friends send no signals) calls record_created itself.
+rebuild_ledger recomputes everything from the transactions and repairs
+any drift.
+"""
+
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F, Q, Sum
+
+from .models import AICTEPointLedger, AICTEPointTransaction, Student
+
+# Transaction status -> AICTEPointLedger field (Student fields add "aicte_")
+STATUS_FIELDS = {
+    "APPROVED": "approved_points",
+    "PENDING": "pending_points",
+    "REJECTED": "rejected_points",
+}
+
+# Ids per IN (...) clause of the grouped updates
+UPDATE_BATCH_SIZE = 500
+
+
+def transaction_state(txn):
+    """The part of a transaction the ledger depends on."""
+    return (txn.student_id, txn.category_id, txn.status, txn.points_allocated)
+
+
+def previous_state(pk):
+    """The stored ledger state of transaction pk, or None if not saved yet."""
+    return (
+        AICTEPointTransaction.objects.filter(pk=pk)
+        .values_list("student_id", "category_id", "status", "points_allocated")
+        .first()
+    )
+
+
+def _chunks(ids):
+    ids = sorted(ids)
+    for i in range(0, len(ids), UPDATE_BATCH_SIZE):
+        yield ids[i : i + UPDATE_BATCH_SIZE]
+
+
+def _delta(fields):
+    """{field: points} -> hashable ((field, points), ...) without zeros."""
+    return tuple(
+        sorted((field, points) for field, points in fields.items() if points)
+    )
+
+
+def apply_changes(changes):
+    """
+    Add signed point changes to the ledger.
+
+    changes is an iterable of (student_id, category_id, status, points).
+    Keys receiving the same change are updated together, so recording a
+    bulk import of one event costs a handful of UPDATEs, not one per
+    student.
+    """
+    by_key = defaultdict(lambda: defaultdict(int))
+    for student_id, category_id, status, points in changes:
+        if status in STATUS_FIELDS and points:
+            by_key[(student_id, category_id)][STATUS_FIELDS[status]] += points
+
+    ledger_groups = defaultdict(list)  # (category_id, delta) -> student ids
+    by_student = defaultdict(lambda: defaultdict(int))
+    for (student_id, category_id), fields in by_key.items():
+        delta = _delta(fields)
+        if not delta:
+            continue
+        ledger_groups[(category_id, delta)].append(student_id)
+        for field, points in delta:
+            by_student[student_id][field] += points
+
+    student_groups = defaultdict(list)  # delta -> student ids
+    for student_id, fields in by_student.items():
+        delta = _delta(fields)
+        if delta:
+            student_groups[delta].append(student_id)
+
+    if not ledger_groups:
+        return
+
+    with transaction.atomic():
+        # Only changes that add points need a row. A missing row that only
+        # loses points was removed with its student (CASCADE runs before
+        # the transactions' post_delete), and must not be recreated.
+        AICTEPointLedger.objects.bulk_create(
+            [
+                AICTEPointLedger(
+                    student_id=student_id, category_id=category_id
+                )
+                for (category_id, delta), student_ids in ledger_groups.items()
+                if any(points > 0 for _, points in delta)
+                for student_id in student_ids
+            ],
+            batch_size=UPDATE_BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+        for (category_id, delta), student_ids in ledger_groups.items():
+            for chunk in _chunks(student_ids):
+                AICTEPointLedger.objects.filter(
+                    category_id=category_id, student_id__in=chunk
+                ).update(
+                    **{field: F(field) + points for field, points in delta}
+                )
+        for delta, student_ids in student_groups.items():
+            for chunk in _chunks(student_ids):
+                Student.objects.filter(id__in=chunk).update(
+                    **{
+                        f"aicte_{field}": F(f"aicte_{field}") + points
+                        for field, points in delta
+                    }
+                )
+
+
+def record_saved(txn, previous):
+    """Record a transaction save; previous is its previous_state() or None."""
+    current = transaction_state(txn)
+    if previous == current:
+        return
+    changes = [current]
+    if previous is not None:
+        student_id, category_id, status, points = previous
+        changes.append((student_id, category_id, status, -points))
+    apply_changes(changes)
+
+
+def record_deleted(txn):
+    student_id, category_id, status, points = transaction_state(txn)
+    apply_changes([(student_id, category_id, status, -points)])
+
+
+def record_created(transactions):
+    """Record transactions inserted without signals (e.g. bulk_create)."""
+    apply_changes(transaction_state(txn) for txn in transactions)
+
+
+def _status_sums(prefix=""):
+    return {
+        field: Sum(
+            f"{prefix}points_allocated",
+            filter=Q(**{f"{prefix}status": status}),
+        )
+        for status, field in STATUS_FIELDS.items()
+    }
+
+
+def rebuild_ledger(dry_run=False):
+    """
+    Recompute the ledger from the transactions and repair what differs.
+
+    Reads one grouped aggregate per table and only writes rows whose
+    stored totals are wrong. Returns (ledger_rows_fixed, students_fixed).
+    """
+    fields = list(STATUS_FIELDS.values())
+    with transaction.atomic():
+        expected = {
+            (row["student_id"], row["category_id"]): tuple(
+                row[field] or 0 for field in fields
+            )
+            for row in AICTEPointTransaction.objects.values(
+                "student_id", "category_id"
+            )
+            .annotate(**_status_sums())
+            .order_by()
+            .iterator(chunk_size=2000)
+        }
+
+        to_update = []
+        stale_ids = []
+        ledger = AICTEPointLedger.objects.select_for_update()
+        for entry in ledger.iterator(chunk_size=2000):
+            key = (entry.student_id, entry.category_id)
+            totals = expected.pop(key, None)
+            if totals is None:
+                # No transactions left; a row of zeros is still correct
+                if any(getattr(entry, field) for field in fields):
+                    stale_ids.append(entry.id)
+            elif tuple(getattr(entry, field) for field in fields) != totals:
+                for field, value in zip(fields, totals):
+                    setattr(entry, field, value)
+                to_update.append(entry)
+        to_create = [
+            AICTEPointLedger(
+                student_id=student_id,
+                category_id=category_id,
+                **dict(zip(fields, totals)),
+            )
+            for (student_id, category_id), totals in expected.items()
+        ]
+        ledger_fixed = len(to_update) + len(stale_ids) + len(to_create)
+
+        student_sums = _status_sums("aicte_transactions__")
+        students = []
+        for student in (
+            Student.objects.annotate(
+                **{
+                    f"expected_{field}": student_sums[field]
+                    for field in fields
+                }
+            )
+            .only("id", *[f"aicte_{field}" for field in fields])
+            .iterator(chunk_size=2000)
+        ):
+            wrong = False
+            for field in fields:
+                value = getattr(student, f"expected_{field}") or 0
+                if getattr(student, f"aicte_{field}") != value:
+                    setattr(student, f"aicte_{field}", value)
+                    wrong = True
+            if wrong:
+                students.append(student)
+
+        if not dry_run:
+            AICTEPointLedger.objects.bulk_update(
+                to_update, fields, batch_size=UPDATE_BATCH_SIZE
+            )
+            for chunk in _chunks(stale_ids):
+                AICTEPointLedger.objects.filter(id__in=chunk).delete()
+            AICTEPointLedger.objects.bulk_create(
+                to_create, batch_size=UPDATE_BATCH_SIZE
+            )
+            Student.objects.bulk_update(
+                students,
+                [f"aicte_{field}" for field in fields],
+                batch_size=UPDATE_BATCH_SIZE,
+            )
+
+    return ledger_fixed, len(students)
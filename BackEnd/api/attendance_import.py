@@ -0,0 +1,384 @@
+"""
+Attendance import for CertifyTrack events.
+
+Reads an uploaded CSV/XLSX attendance sheet (or JSON rows) and applies it
+to an event: attendance records, pending AICTE point transactions and
+certificate placeholders. Used by the upload-attendance endpoint through
+the job queue. Sheets are streamed and written in batches of
+IMPORT_BATCH_SIZE rows, so memory does not grow with the roster.
+"""
+
+import secrets
+import string
+
+from django.db import connection, transaction
+from django.utils.timezone import now
+
+from . import aicte_ledger, stats
+from .caching import invalidate_tags
+from .importers import ImportField, ImportSchema, RowReader
+from .models import (
+    AICTEPointTransaction,
+    AuditLog,
+    Certificate,
+    EventAttendance,
+    Student,
+    User,
+)
+from .notifications import notify
+
+# Rows per INSERT/UPDATE statement for the bulk writes
+BULK_BATCH_SIZE = 500
+
+# Values of the attendance column that count as present
+PRESENT_VALUES = {"present", "p", "1", "true", "yes", "attended"}
+
+
+def _parse_student_id(value):
+    try:
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        return int(str(value).strip())
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid student_id: {value}")
+
+
+def _parse_present(value):
+    return str(value).strip().lower() in PRESENT_VALUES
+
+
+def _require_student(data):
+    if data["student_id"] is None and not data["usn"]:
+        raise ValueError("Row has no student_id or usn")
+
+
+ATTENDANCE_SCHEMA = ImportSchema(
+    [
+        ImportField(
+            "student_id", aliases=("studentId", "id"), parse=_parse_student_id
+        ),
+        ImportField("usn"),
+        # attendance (present/cancelled/no-show) or is_present
+        # (1/0/true/false);
+        # a missing flag counts as present
+        ImportField(
+            "is_present",
+            aliases=("attendance", "status"),
+            parse=_parse_present,
+            default=True,
+        ),
+    ],
+    validate=_require_student,
+)
+
+
+def read_attendance_file(file_obj, filename, batch_size=None):
+    """
+    Stream the rows of an attendance sheet (.csv or .xlsx).
+
+    Raises ValidationError if the file type is unsupported or the file
+    cannot be parsed.
+    """
+    return RowReader.from_file(
+        file_obj, filename, ATTENDANCE_SCHEMA, batch_size
+    )
+
+
+def read_attendance_records(records, batch_size=None):
+    """Stream attendance rows posted as a JSON list of objects."""
+    return RowReader.from_records(records, ATTENDANCE_SCHEMA, batch_size)
+
+
+def import_attendance(event, rows, user):
+    """
+    Apply attendance rows to an event and mark it completed.
+
+    rows is a RowReader from read_attendance_file/read_attendance_records.
+    Each row identifies a student by student_id (or usn) and carries an
+    attendance flag. Rows are processed a batch at a time: the batch's
+    students are resolved with two in_bulk queries, diffed against the
+    event's existing attendance and written with bulk operations, so the
+    query count grows with the number of batches rather than rows. If a
+    student appears more than once, the last row wins. Everything runs in
+    one transaction.
+
+    Returns a dict of counts plus "rows", a per-row report with a status of
+    created, updated, unchanged, duplicate, not_found or invalid.
+    """
+    report = []
+    latest = {}  # student id -> report entry of the row that wins
+    # student id -> [is_present before this import, is_present stored now];
+    # None means there is no attendance record
+    stored = {}
+    student_users = {}  # student id -> user id, for notifications
+
+    with transaction.atomic():
+        for batch in rows.batches():
+            _import_batch(
+                event, batch, user, report, latest, stored, student_users
+            )
+
+        for student_id, entry in latest.items():
+            before = stored[student_id][0]
+            if before is None:
+                entry["status"] = "created"
+            elif before != entry["is_present"]:
+                entry["status"] = "updated"
+            else:
+                entry["status"] = "unchanged"
+
+        present_ids = [
+            student_id
+            for student_id, entry in latest.items()
+            if entry["is_present"]
+        ]
+        points_created = _create_pending_transactions(
+            event, present_ids, student_users
+        )
+
+        # certificate placeholders; the PDFs are rendered by
+        # generate-certificates
+        with_certificate = set(
+            Certificate.objects.filter(
+                event=event, student_id__in=present_ids
+            ).values_list("student_id", flat=True)
+        )
+        new_certificates = Certificate.objects.bulk_create(
+            [
+                Certificate(event=event, student_id=student_id)
+                for student_id in present_ids
+                if student_id not in with_certificate
+            ],
+            batch_size=BULK_BATCH_SIZE,
+        )
+        stats.record_created(new_certificates)
+        certificates_created = len(new_certificates)
+        # attendance, transactions and certificates were written in bulk
+        invalidate_tags("events", "aicte", "certificates")
+
+        # mark event completed if not already
+        if event.status != "completed":
+            event.status = "completed"
+            event.save()
+        created_count = sum(
+            1 for entry in latest.values() if entry["status"] == "created"
+        )
+        if user:
+            AuditLog.objects.create(
+                user=user,
+                action=(
+                    f"Uploaded attendance for event {event.name}: "
+                    f"created {created_count} attendance records, "
+                    f"{points_created} AICTE transactions, "
+                    f"{certificates_created} certificates"
+                ),
+            )
+
+    for error in rows.errors:
+        report.append(
+            {
+                "row": error.row,
+                "student_id": None,
+                "usn": None,
+                "is_present": None,
+                "status": "invalid",
+                "message": error.message,
+            }
+        )
+    report.sort(key=lambda entry: entry["row"])
+
+    return {
+        "attendance_records_created": created_count,
+        "attendance_records_updated": sum(
+            1 for entry in report if entry["status"] == "updated"
+        ),
+        "aicte_transactions_created": points_created,
+        "certificates_created": certificates_created,
+        "rows_skipped": sum(
+            1
+            for entry in report
+            if entry["status"] in ("invalid", "not_found")
+        ),
+        "rows": report,
+    }
+
+
+def _import_batch(event, batch, user, report, latest, stored, student_users):
+    """Resolve one batch of rows to students and write their attendance."""
+    entries = []
+    for row_number, data in batch:
+        entry = {"row": row_number, **data, "status": None}
+        report.append(entry)
+        entries.append(entry)
+
+    by_id = Student.objects.in_bulk(
+        {entry["student_id"] for entry in entries if entry["student_id"]}
+    )
+    by_usn = Student.objects.in_bulk(
+        {entry["usn"] for entry in entries if not entry["student_id"]},
+        field_name="usn",
+    )
+
+    winners = {}
+    for entry in entries:
+        if entry["student_id"]:
+            student = by_id.get(entry["student_id"])
+        else:
+            student = by_usn.get(entry["usn"])
+        if student is None:
+            entry["status"] = "not_found"
+            entry["message"] = "Student not found"
+            continue
+        entry["student_id"] = student.id
+        entry["usn"] = student.usn
+        previous = latest.get(student.id)
+        if previous is not None:
+            previous["status"] = "duplicate"
+            previous["message"] = f"Superseded by row {entry['row']}"
+        latest[student.id] = entry
+        winners[student.id] = entry
+        student_users[student.id] = student.user_id
+
+    # Students first seen in this batch: compare with what is stored. Those
+    # seen in an earlier batch were already written by this import.
+    unseen = [student_id for student_id in winners if student_id not in stored]
+    existing = {
+        record.student_id: record
+        for record in EventAttendance.objects.filter(
+            event=event, student_id__in=unseen
+        )
+    }
+    for student_id in unseen:
+        record = existing.get(student_id)
+        is_present = None if record is None else record.is_present
+        stored[student_id] = [is_present, is_present]
+
+    to_create = []
+    to_update = []
+    user_id = getattr(user, "id", None)
+    for student_id, entry in winners.items():
+        current = stored[student_id][1]
+        if current is None:
+            to_create.append(student_id)
+        elif current != entry["is_present"]:
+            to_update.append(student_id)
+        elif (
+            student_id in existing
+            and existing[student_id].marked_by_id != user_id
+        ):
+            to_update.append(student_id)
+        stored[student_id][1] = entry["is_present"]
+
+    def build(student_id):
+        return EventAttendance(
+            event=event,
+            student_id=student_id,
+            is_present=winners[student_id]["is_present"],
+            marked_by=user,
+        )
+
+    if connection.features.supports_update_conflicts_with_target:
+        # One upsert on (event, student); also safe against a concurrent
+        # upload for the same event inserting the same students
+        EventAttendance.objects.bulk_create(
+            [build(student_id) for student_id in to_create + to_update],
+            batch_size=BULK_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=["event", "student"],
+            update_fields=["is_present", "marked_by"],
+        )
+    else:
+        EventAttendance.objects.bulk_create(
+            [build(student_id) for student_id in to_create],
+            batch_size=BULK_BATCH_SIZE,
+        )
+        EventAttendance.objects.filter(
+            event=event, student_id__in=to_update
+        ).update(marked_by=user)
+        for is_present in (True, False):
+            EventAttendance.objects.filter(
+                event=event,
+                student_id__in=[
+                    student_id
+                    for student_id in to_update
+                    if winners[student_id]["is_present"] is is_present
+                ],
+            ).update(is_present=is_present)
+
+
+def _create_pending_transactions(event, student_ids, student_users):
+    """
+    Allocate PENDING AICTE points to the given students if the event awards
+    points and they have no transaction for it yet. Returns the number
+    created.
+
+    bulk_create does not send post_save, so the ledger update, student
+    notification and audit entry that the AICTEPointTransaction signals
+    would add are made here in bulk as well.
+    """
+    if (
+        not (event.aicte_category and event.points_awarded > 0)
+        or not student_ids
+    ):
+        return 0
+
+    already_allocated = set(
+        AICTEPointTransaction.objects.filter(
+            event=event, student_id__in=student_ids
+        ).values_list("student_id", flat=True)
+    )
+    created_at = now()
+    transactions = AICTEPointTransaction.objects.bulk_create(
+        [
+            AICTEPointTransaction(
+                student_id=student_id,
+                event=event,
+                category=event.aicte_category,
+                points_allocated=event.points_awarded,
+                # 8-character verification code with random alphanumeric
+                # characters
+                verification_code="".join(
+                    secrets.choice(string.ascii_letters + string.digits)
+                    for _ in range(8)
+                ),
+                status="PENDING",
+                created_at=created_at,
+            )
+            for student_id in student_ids
+            if student_id not in already_allocated
+        ],
+        batch_size=BULK_BATCH_SIZE,
+    )
+    if not transactions:
+        return 0
+    aicte_ledger.record_created(transactions)
+    stats.record_created(transactions)
+
+    # Same messages as signals.notify_on_transaction_status_change
+    category_name = event.aicte_category.name
+    message = (
+        f"Your AICTE points for event '{event.name}' "
+        f"(category: {category_name}) are now: PENDING. "
+        f"Allocated points: {event.points_awarded}."
+    )
+    notify(
+        User.objects.filter(
+            id__in=[student_users[txn.student_id] for txn in transactions]
+        ),
+        "info",
+        "AICTE points pending",
+        message,
+    )
+    # Bulk-created rows only get their ids back on some databases
+    if all(txn.id for txn in transactions):
+        AuditLog.objects.bulk_create(
+            [
+                AuditLog(
+                    user_id=student_users[txn.student_id],
+                    action=f"AICTE transaction {txn.id} status PENDING",
+                )
+                for txn in transactions
+            ],
+            batch_size=BULK_BATCH_SIZE,
+        )
+    return len(transactions)
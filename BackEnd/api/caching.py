@@ -0,0 +1,191 @@
+"""
+Response caching for CertifyTrack API views.
+
+The backend is the default Django cache: Redis (django-redis) when
+REDIS_URL is set, per-process local memory otherwise (see CACHES in
+settings).
+
+@cached_response("events") caches a GET handler's 200 responses under a
+key made of the view, the user's role (and id, unless the response is
+the same for everyone in that role), the path, the query parameters and
+the current version of each tag. Saving or deleting a tagged model
+(api.signals) moves the tag to a new version once the transaction
+commits, so every entry built from the old data is skipped and expires
+on its own; nothing has to enumerate keys. Code that writes tagged rows
+without signals (bulk_create, QuerySet.update) calls invalidate_tags.
+
+Hits and misses are counted per view and reported by cache_stats().
+"""
+
+import functools
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+# Headers kept with a cached response (pagination cursors)
+CACHED_HEADERS = ("Link", "X-Next-Cursor", "X-Previous-Cursor")
+
+# model label -> tags whose cached responses the model's rows appear in
+MODEL_TAGS = {
+    "api.Event": ("events",),
+    "api.EventRegistration": ("events",),
+    "api.EventAttendance": ("events",),
+    # A student's mentor decides which transactions and certificates the
+    # mentor's lists show
+    "api.Student": ("aicte", "certificates"),
+    "api.AICTEPointTransaction": ("aicte",),
+    "api.Certificate": ("certificates",),
+    "api.Hall": ("halls",),
+    "api.HallBooking": ("halls",),
+}
+
+# Names of the cached views, for cache_stats()
+_cached_views = set()
+
+
+def _tag_key(tag):
+    return f"cache:tag:{tag}"
+
+
+def _counter_key(name, outcome):
+    return f"cache:stats:{name}:{outcome}"
+
+
+def _new_version():
+    # Time based rather than a counter, so a tag version evicted from the
+    # cache can never come back as a version that old entries were built on
+    return time.time_ns()
+
+
+def tag_versions(tags):
+    """Current version of each tag, starting a version for unknown tags."""
+    keys = {tag: _tag_key(tag) for tag in tags}
+    stored = cache.get_many(keys.values())
+    versions = {}
+    for tag, key in keys.items():
+        if key not in stored:
+            cache.add(key, _new_version(), None)
+            stored[key] = cache.get(key)
+        versions[tag] = stored[key]
+    return versions
+
+
+def invalidate_tags(*tags):
+    """Give tags new versions once the current transaction commits."""
+
+    def bump():
+        cache.set_many({_tag_key(tag): _new_version() for tag in tags}, None)
+
+    transaction.on_commit(bump)
+
+
+def tags_for_model(model):
+    return MODEL_TAGS.get(model._meta.label, ())
+
+
+def _count(name, outcome):
+    key = _counter_key(name, outcome)
+    if cache.add(key, 1, None):
+        return
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr()
+        cache.add(key, 1, None)
+
+
+def cache_stats():
+    """{view name: {"hits", "misses", "hit_rate"}} for the cached views."""
+    names = sorted(_cached_views)
+    counts = cache.get_many(
+        [
+            _counter_key(name, outcome)
+            for name in names
+            for outcome in ("hits", "misses")
+        ]
+    )
+    report = {}
+    for name in names:
+        hits = counts.get(_counter_key(name, "hits"), 0)
+        misses = counts.get(_counter_key(name, "misses"), 0)
+        total = hits + misses
+        report[name] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total * 100, 1) if total else 0,
+        }
+    return report
+
+
+def response_key(name, request, tags, per_user=True):
+    user = request.user
+    role = getattr(user, "user_type", None) or "anonymous"
+    scope = [name, role]
+    if per_user:
+        scope.append(str(user.pk))
+    params = urlencode(sorted(request.query_params.lists()), doseq=True)
+    versions = tag_versions(tags)
+    scope += [request.path, params] + [
+        f"{tag}={versions[tag]}" for tag in tags
+    ]
+    digest = hashlib.sha256("\n".join(scope).encode()).hexdigest()
+    return f"cache:response:{name}:{digest}"
+
+
+def cached_response(*tags, timeout=None, per_user=True):
+    """
+    Cache the 200 responses of a GET view method or function view.
+
+    tags name the data the response is built from (see MODEL_TAGS).
+    Responses are per user unless per_user=False, which shares them
+    between users of the same role; only use it when the response does
+    not depend on who asks, e.g. admin-wide reports.
+    """
+
+    def decorator(view):
+        name = view.__qualname__
+        _cached_views.add(name)
+
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            request = next(arg for arg in args if isinstance(arg, Request))
+            if request.method != "GET":
+                return view(*args, **kwargs)
+
+            key = response_key(name, request, tags, per_user)
+            cached = cache.get(key)
+            if cached is not None:
+                _count(name, "hits")
+                data, headers = cached
+                response = Response(
+                    data, status=status.HTTP_200_OK, headers=headers
+                )
+                response["X-Cache"] = "HIT"
+                return response
+
+            _count(name, "misses")
+            response = view(*args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                headers = {
+                    header: response[header]
+                    for header in CACHED_HEADERS
+                    if response.has_header(header)
+                }
+                cache.set(
+                    key,
+                    (response.data, headers),
+                    settings.API_CACHE_TIMEOUT if timeout is None else timeout,
+                )
+            response["X-Cache"] = "MISS"
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,159 @@
+"""
+Bulk certificate export for CertifyTrack events.
+
+Streams every generated certificate of an event either as a ZIP archive or
+as one merged multi-page PDF, so organizers can archive an event in a
+single download. Certificates are read from storage one at a time and in
+chunks; nothing holds the whole export in memory.
+"""
+
+import hashlib
+import tempfile
+import zipfile
+
+from PyPDF2 import PdfReader, PdfWriter
+from PyPDF2.generic import IndirectObject, NameObject
+
+# Bytes read from storage per chunk when streaming certificate files
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+def certificate_filename(cert):
+    """Name of a certificate inside an export, e.g. 1AB22CS001_42.pdf."""
+    return f"{cert.student.usn}_{cert.id}.pdf"
+
+
+class _ZipStream:
+    """
+    Write-only file object that collects what zipfile writes so it can be
+    yielded to the client. Having no seek() makes zipfile write data
+    descriptors instead of rewinding to patch local headers.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_certificates_zip(certificates):
+    """
+    Yield a ZIP archive of the certificates' PDF files chunk by chunk.
+
+    PDFs are already compressed, so entries are stored rather than deflated.
+    Certificates whose file is missing from storage are skipped.
+    """
+    stream = _ZipStream()
+    with zipfile.ZipFile(
+        stream, "w", compression=zipfile.ZIP_STORED
+    ) as archive:
+        for cert in certificates:
+            try:
+                source = cert.file.open("rb")
+            except (FileNotFoundError, ValueError):
+                continue
+            with (
+                source,
+                archive.open(certificate_filename(cert), "w") as entry,
+            ):
+                for chunk in iter(lambda: source.read(EXPORT_CHUNK_SIZE), b""):
+                    entry.write(chunk)
+                    data = stream.drain()
+                    if data:
+                        yield data
+            data = stream.drain()
+            if data:
+                yield data
+    # Central directory, written when the archive closes
+    yield stream.drain()
+
+
+def _shared_xobject_key(xobject):
+    """Content key for an image XObject, or None if it should not be shared."""
+    if xobject.get("/Subtype") != "/Image":
+        return None
+    data = getattr(xobject, "_data", None)
+    if data is None:
+        return None
+    digest = hashlib.md5(data)
+    # Images differing only in their alpha channel must stay separate
+    smask = xobject.get("/SMask")
+    if smask is not None:
+        digest.update(getattr(smask.get_object(), "_data", b""))
+    return digest.hexdigest(), len(data)
+
+
+def build_certificates_pdf(certificates):
+    """
+    Merge the certificates into one multi-page PDF in a temporary file.
+
+    Every certificate of an event embeds the same background image, so image
+    XObjects with identical content are written once and shared by all
+    pages; the merged file and the writer's memory then grow only by each
+    page's text and QR code. Returns (file, page_count) with the file
+    positioned at the start; closing it deletes it.
+    """
+    writer = PdfWriter()
+    shared = {}
+    page_count = 0
+
+    for cert in certificates:
+        try:
+            source = cert.file.open("rb")
+        except (FileNotFoundError, ValueError):
+            continue
+        with source:
+            reader = PdfReader(source)
+            for page in reader.pages:
+                resources = page.get("/Resources")
+                xobjects = (
+                    resources.get_object().get("/XObject")
+                    if resources
+                    else None
+                )
+                if xobjects:
+                    xobjects = xobjects.get_object()
+                    for name in list(xobjects.keys()):
+                        key = _shared_xobject_key(xobjects[name].get_object())
+                        if key in shared:
+                            # Point at the copy already in the writer
+                            xobjects[NameObject(name)] = shared[key]
+
+                added = writer.add_page(page)
+                page_count += 1
+
+                added_resources = added.get("/Resources")
+                added_xobjects = (
+                    added_resources.get_object().get("/XObject")
+                    if added_resources
+                    else None
+                )
+                if added_xobjects:
+                    added_xobjects = added_xobjects.get_object()
+                    for name in added_xobjects.keys():
+                        ref = added_xobjects.raw_get(name)
+                        if not isinstance(ref, IndirectObject):
+                            continue
+                        key = _shared_xobject_key(ref.get_object())
+                        if key is not None and key not in shared:
+                            shared[key] = ref
+
+    output = tempfile.TemporaryFile()
+    writer.write(output)
+    output.seek(0)
+    return output, page_count
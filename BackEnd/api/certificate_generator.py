@@ -1,10 +1,15 @@
 import os
 import json
+import hashlib
+import threading
+
 import qrcode
 from reportlab.pdfgen import canvas
+from reportlab.pdfbase import pdfmetrics
 from reportlab.lib.pagesizes import landscape, A4
 from reportlab.lib.utils import ImageReader
 from django.conf import settings
+from django.core.exceptions import ValidationError
 
 
 class CertificateGenerator:
@@ -24,56 +29,25 @@ class CertificateGenerator:
 
     def load_metadata(self):
         """Load JSON metadata (coordinates, font sizes, signature positions)"""
-        with open(self.metadata_path, "r") as f:
-            content = f.read()
+        return parse_metadata(self.metadata_path)
 
-        # Handle potential trailing data or comments in JSON files
-        # Try to parse the JSON, and if it fails with "Extra data" error,
-        # extract only the valid JSON portion
-        try:
-            return json.loads(content)
-        except json.JSONDecodeError as e:
-            if "Extra data" in str(e):
-                # Try to extract valid JSON by finding the first complete object
-                try:
-                    # Find the end of the first valid JSON object by tracking braces
-                    brace_count = 0
-                    end_pos = 0
-                    in_string = False
-                    escape_next = False
-
-                    for i, char in enumerate(content):
-                        if escape_next:
-                            escape_next = False
-                            continue
-
-                        if char == '\\':
-                            escape_next = True
-                            continue
-
-                        if char == '"' and not escape_next:
-                            in_string = not in_string
-                            continue
-
-                        if not in_string:
-                            if char == '{':
-                                brace_count += 1
-                            elif char == '}':
-                                brace_count -= 1
-                                if brace_count == 0:
-                                    # Found the end of the first JSON object
-                                    end_pos = i + 1
-                                    break
-
-                    if end_pos > 0:
-                        valid_json = content[:end_pos]
-                        return json.loads(valid_json)
-                    else:
-                        raise e
-                except Exception:
-                    raise ValidationError(f"Invalid JSON metadata file: {self.metadata_path}")
-            else:
-                raise e
+    def prepare(
+        self,
+        template_type,
+        faculty_signature_path="",
+        principal_signature_path="",
+    ):
+        """
+        Load the template, metadata, fonts and signatures once and return a
+        PreparedTemplate that can render any number of certificates.
+        """
+        return PreparedTemplate(
+            template_type=template_type,
+            template_path=self.template_path,
+            metadata_path=self.metadata_path,
+            faculty_signature_path=faculty_signature_path,
+            principal_signature_path=principal_signature_path,
+        )
 
     def generate_qr_code(self, qr_text):
         """Generate QR code PNG in memory"""
@@ -119,71 +93,374 @@ class CertificateGenerator:
         """
         Generate certificate and return BytesIO buffer
         """
+        prepared = self.prepare(
+            template_type, faculty_signature_path, principal_signature_path
+        )
+        return prepared.render(
+            student_name=student_name,
+            event_name=event_name,
+            club_name=club_name,
+            date=date,
+            usn=usn,
+            points=points,
+            qr_text=qr_text,
+        )
+
+
+class PreparedTemplate(CertificateGenerator):
+    """
+    A certificate template ready to render any number of certificates.
+
+    The scaled layout, the encoded background and the signatures come from
+    the process-wide compiled-template cache, so rendering N certificates
+    only pays for the per-student text and QR code.
+    """
+
+    def __init__(
+        self,
+        template_type,
+        template_path,
+        metadata_path,
+        faculty_signature_path="",
+        principal_signature_path="",
+    ):
+        super().__init__(template_path, metadata_path)
+        self.template_type = template_type
+
+        layout = get_compiled_layout(metadata_path)
+        if layout is None:
+            raise ValidationError(f"Metadata file not found: {metadata_path}")
+        self.metadata = layout.metadata
+        self.page_width = layout.page_width
+        self.page_height = layout.page_height
+        self.text_layout = layout.text_layout
+        self.qr_layout = layout.qr_layout
+        self.faculty_layout = layout.faculty_layout
+        self.principal_layout = layout.principal_layout
+
+        self.background = get_compiled_image(template_path)
+        if self.background is None:
+            raise ValidationError(f"Template image not found: {template_path}")
+        self.faculty_signature = get_compiled_image(
+            faculty_signature_path, mask="auto"
+        )
+        self.principal_signature = get_compiled_image(
+            principal_signature_path, mask="auto"
+        )
+
+    def draw_compiled(self, c, image, meta):
+        """Draw a compiled image (signature) at the given (scaled) position."""
+        if image is None:
+            return  # fail silently if signature not uploaded
+        image.draw(
+            c,
+            meta["x"],
+            meta["y"],
+            width=meta["width"],
+            height=meta["height"],
+            preserveAspectRatio=True,
+        )
+
+    def draw_qr(self, c, qr_text, meta):
+        """
+        Draws the QR code for qr_text as filled rectangles.
+
+        Like drawImage(preserveAspectRatio=True), the square code is fitted
+        into the layout box and centred in it.
+        """
+        size, runs = qr_modules(qr_text)
+        side = min(meta["width"], meta["height"])
+        module = side / size
+        left = meta["x"] + (meta["width"] - side) / 2
+        top = meta["y"] + (meta["height"] + side) / 2
+
+        c.saveState()
+        c.setFillColorRGB(1, 1, 1)
+        c.rect(left, top - side, side, side, stroke=0, fill=1)
+
+        path = c.beginPath()
+        for row, col, length in runs:
+            path.rect(
+                left + col * module,
+                top - (row + 1) * module,
+                length * module,
+                module,
+            )
+        c.setFillColorRGB(0, 0, 0)
+        c.drawPath(path, stroke=0, fill=1)
+        c.restoreState()
+
+    def render(
+        self,
+        student_name,
+        event_name,
+        club_name,
+        date,
+        usn,
+        points,
+        qr_text,
+    ):
+        """
+        Render one certificate from the prepared state and return a BytesIO
+        buffer
+        """
         from io import BytesIO
-        metadata = self.load_metadata()
 
         # PDF canvas (A4 Landscape) - use BytesIO buffer
         buffer = BytesIO()
         c = canvas.Canvas(buffer, pagesize=landscape(A4))
 
-        # Background template PNG
-        template_png = self.template_path
-
-        # Calculate scaling factors between image dimensions and PDF canvas
-        image_width = float(metadata["canvas"]["width"])  # 2000
-        image_height = float(metadata["canvas"]["height"])  # 1414
-        page_width, page_height = landscape(A4)  # (841.89, 595.28)
-
-        scale_x = page_width / image_width
-        scale_y = page_height / image_height
-
-        # Scale image to fit
-        c.drawImage(template_png, 0, 0, width=page_width, height=page_height)
-
-        # Function to scale metadata coordinates
-        def scale_meta(meta_dict):
-            scaled = meta_dict.copy()
-            if "x" in scaled:
-                scaled["x"] *= scale_x
-            if "y" in scaled:
-                scaled["y"] *= scale_y
-            if "width" in scaled:
-                scaled["width"] *= scale_x
-            if "height" in scaled:
-                scaled["height"] *= scale_y
-            return scaled
+        # Scale image to fit (decoded once per process, not per certificate)
+        self.background.draw(
+            c, 0, 0, width=self.page_width, height=self.page_height
+        )
 
         # Draw text placeholders (scaled)
-        placeholders = metadata["placeholders"]
-
-        self.draw_text(c, student_name, scale_meta(placeholders["student_name"]))
-        self.draw_text(c, event_name, scale_meta(placeholders["event_name"]))
-        self.draw_text(c, club_name, scale_meta(placeholders["club_name"]))
-        self.draw_text(c, date, scale_meta(placeholders["date"]))
-        self.draw_text(c, usn, scale_meta(placeholders["usn"]))
+        layout = self.text_layout
+        self.draw_text(c, student_name, layout["student_name"])
+        self.draw_text(c, event_name, layout["event_name"])
+        self.draw_text(c, club_name, layout["club_name"])
+        self.draw_text(c, date, layout["date"])
+        self.draw_text(c, usn, layout["usn"])
 
         # AICTE points field only for AICTE template (scaled)
-        if template_type == "certificate_aicte":
-            self.draw_text(c, str(points), scale_meta(placeholders["points"]))
-
-        # Generate QR Code (in-memory)
-        qr_image = self.generate_qr_code(qr_text)
-        qr_path = os.path.join(self.template_dir, "qr_temp.png")
-        qr_image.save(qr_path)
+        if self.template_type == "certificate_aicte":
+            self.draw_text(c, str(points), layout["points"])
 
-        # Draw QR code (scaled)
-        self.draw_image(c, qr_path, scale_meta(metadata["qrcode"]))
+        # Draw QR code (scaled) as vector modules, straight from memory
+        self.draw_qr(c, qr_text, self.qr_layout)
 
         # Draw signatures (scaled)
-        self.draw_image(c, faculty_signature_path, scale_meta(metadata["signatures"]["faculty_coordinator"]))
-        self.draw_image(c, principal_signature_path, scale_meta(metadata["signatures"]["principal"]))
-
-        # Cleanup QR
-        if os.path.exists(qr_path):
-            os.remove(qr_path)
+        self.draw_compiled(c, self.faculty_signature, self.faculty_layout)
+        self.draw_compiled(c, self.principal_signature, self.principal_layout)
 
         c.showPage()
         c.save()
 
         buffer.seek(0)
         return buffer
+
+
+def parse_metadata(metadata_path):
+    """
+    Parse a template metadata file.
+
+    Only the first JSON object is used, so files with trailing data or
+    comments after the object still load.
+    """
+    with open(metadata_path, "r") as f:
+        content = f.read()
+    try:
+        metadata, _ = json.JSONDecoder().raw_decode(content.lstrip())
+    except json.JSONDecodeError:
+        raise ValidationError(f"Invalid JSON metadata file: {metadata_path}")
+    return metadata
+
+
+class CompiledLayout:
+    """Template metadata parsed, validated and scaled from pixels to points."""
+
+    def __init__(self, metadata):
+        self.metadata = metadata
+        try:
+            # Calculate scaling factors between image dimensions and PDF canvas
+            # (841.89, 595.28)
+            self.page_width, self.page_height = landscape(A4)
+            canvas_size = metadata["canvas"]
+            self.scale_x = self.page_width / float(canvas_size["width"])
+            self.scale_y = self.page_height / float(canvas_size["height"])
+
+            placeholders = metadata["placeholders"]
+            self.text_layout = {
+                name: self.scale_meta(meta)
+                for name, meta in placeholders.items()
+            }
+            self.qr_layout = self.scale_meta(metadata["qrcode"])
+            self.faculty_layout = self.scale_meta(
+                metadata["signatures"]["faculty_coordinator"]
+            )
+            self.principal_layout = self.scale_meta(
+                metadata["signatures"]["principal"]
+            )
+        except (KeyError, TypeError, ValueError, ZeroDivisionError) as e:
+            raise ValidationError(
+                f"Invalid certificate template metadata: {e}"
+            )
+
+        # Resolve fonts now so a bad template fails once, not per student
+        for meta in self.text_layout.values():
+            pdfmetrics.getFont(meta["font"])
+
+    def scale_meta(self, meta_dict):
+        """Scale metadata coordinates from template pixels to PDF points."""
+        scaled = meta_dict.copy()
+        if "x" in scaled:
+            scaled["x"] *= self.scale_x
+        if "y" in scaled:
+            scaled["y"] *= self.scale_y
+        if "width" in scaled:
+            scaled["width"] *= self.scale_x
+        if "height" in scaled:
+            scaled["height"] *= self.scale_y
+        return scaled
+
+
+class CompiledImage:
+    """
+    An image decoded once and shared by every canvas.
+
+    draw() hands the same ImageReader to Canvas.drawImage, so the file is
+    opened and decoded once per process rather than once per PDF; each PDF
+    still compresses the pixels into its own XObject, and drawImage embeds
+    an image only once per PDF however often it is drawn.
+    """
+
+    def __init__(self, image_path, mask=None):
+        self.reader = ImageReader(image_path)
+        self.mask = mask
+        # Decode now, while the file is known to exist
+        self.reader.getRGBData()
+        self.width, self.height = self.reader.getSize()
+
+    def draw(self, c, x, y, width, height, preserveAspectRatio=False):
+        c.drawImage(
+            self.reader,
+            x,
+            y,
+            width=width,
+            height=height,
+            mask=self.mask,
+            preserveAspectRatio=preserveAspectRatio,
+        )
+
+
+# ----------------------------------------------------------------------------
+# Compiled-template cache
+# ----------------------------------------------------------------------------
+# Layouts and encoded images are cached per process, keyed by absolute path
+# plus file mtime and size, so replacing a template or signature file is
+# picked up on the next render. Uploads of CertificateTemplate and
+# PrincipalSignature also clear the cache (see signals.py).
+
+_compiled_cache = {}
+_compiled_cache_lock = threading.Lock()
+
+
+def _file_key(path):
+    if not path:
+        return None
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return os.path.abspath(path), st.st_mtime_ns, st.st_size
+
+
+def _get_compiled(kind, path, build):
+    key = _file_key(path)
+    if key is None:
+        return None
+    cache_key = (kind,) + key
+    with _compiled_cache_lock:
+        compiled = _compiled_cache.get(cache_key)
+    if compiled is None:
+        compiled = build(path)
+        with _compiled_cache_lock:
+            # Drop entries for older versions of the same file
+            prefix = cache_key[:2]
+            for stale in [k for k in _compiled_cache if k[:2] == prefix]:
+                del _compiled_cache[stale]
+            _compiled_cache[cache_key] = compiled
+    return compiled
+
+
+def get_compiled_layout(metadata_path):
+    """The cached CompiledLayout for a metadata file, or None if missing."""
+    return _get_compiled(
+        "layout",
+        metadata_path,
+        lambda path: CompiledLayout(parse_metadata(path)),
+    )
+
+
+def get_compiled_image(image_path, mask=None):
+    """The cached CompiledImage for an image file, or None if missing."""
+    return _get_compiled(
+        ("image", mask),
+        image_path,
+        lambda path: CompiledImage(path, mask=mask),
+    )
+
+
+def clear_template_cache():
+    """Forget every compiled layout and image in this process."""
+    with _compiled_cache_lock:
+        _compiled_cache.clear()
+
+
+def qr_modules(qr_text):
+    """
+    Encode qr_text and return (size, runs) for drawing.
+
+    size is the module count per side including the quiet zone, and runs
+    is a tuple of (row, col, length) horizontal runs of dark modules, so a
+    row of adjacent modules becomes one rectangle. Matches the settings of
+    CertificateGenerator.generate_qr_code (border of 2 modules).
+    """
+    qr = qrcode.QRCode(border=2)
+    qr.add_data(qr_text)
+    qr.make(fit=True)
+    matrix = qr.get_matrix()
+
+    runs = []
+    for row, cells in enumerate(matrix):
+        col = 0
+        width = len(cells)
+        while col < width:
+            if cells[col]:
+                start = col
+                while col < width and cells[col]:
+                    col += 1
+                runs.append((row, start, col - start))
+            else:
+                col += 1
+    return len(matrix), tuple(runs)
+
+
+# ----------------------------------------------------------------------------
+# Process-pool rendering
+# ----------------------------------------------------------------------------
+# These helpers run inside worker processes, so they must not touch the ORM:
+# workers receive plain strings and return PDF bytes for the parent to save.
+
+_worker_template = None
+
+
+def init_render_worker(
+    template_type,
+    template_path,
+    metadata_path,
+    faculty_signature_path="",
+    principal_signature_path="",
+):
+    """Pool initializer: prepare the template once per worker process."""
+    global _worker_template
+    generator = CertificateGenerator(template_path, metadata_path)
+    _worker_template = generator.prepare(
+        template_type, faculty_signature_path, principal_signature_path
+    )
+
+
+def render_in_worker(job):
+    """
+    Render one certificate in a worker.
+
+    job is (key, fields) where fields are the keyword arguments of
+    PreparedTemplate.render. Returns (key, pdf_bytes, sha256, error).
+    """
+    key, fields = job
+    try:
+        pdf_bytes = _worker_template.render(**fields).getvalue()
+    except Exception as e:
+        return key, None, None, str(e)
+    return key, pdf_bytes, hashlib.sha256(pdf_bytes).hexdigest(), None
@@ -0,0 +1,338 @@
+"""
+Certificate generation pipeline for CertifyTrack.
+
+Spreads PDF rendering for an event across a process pool. Workers only
+render (ReportLab + QR) and hand back PDF bytes with their SHA-256; every
+database write happens here in the parent, in batches. Progress is stored
+on a CertificateGenerationRun row so the frontend can poll it while the
+run is in flight. Runs are started by the generate_certificates job.
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from os import path
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.db.models import F
+from django.utils.timezone import now
+
+from . import stats
+from .caching import invalidate_tags
+from .certificate_generator import init_render_worker, render_in_worker
+from .email_utils import certificate_generation_context
+from .models import (
+    AICTEPointTransaction,
+    AuditLog,
+    Certificate,
+    CertificateGenerationRun,
+    EventAttendance,
+    PrincipalSignature,
+)
+from .notifications import notify
+
+# How many finished certificates to collect before writing them back
+WRITE_BATCH_SIZE = 50
+
+
+def get_template_paths(event):
+    """Return (template_type, template_path, metadata_path) for an event."""
+    # Determine template type based on AICTE category
+    template_type = "certificate_regular"
+    if event.aicte_category:
+        template_type = "certificate_aicte"
+
+    template_dir = path.join(settings.MEDIA_ROOT, "certificates", "templates")
+    template_path = path.join(template_dir, f"{template_type}.png")
+    metadata_path = path.join(template_dir, f"{template_type}.json")
+
+    if not path.exists(template_path) or not path.exists(metadata_path):
+        raise ValidationError(
+            f"Certificate template or metadata file not found: {template_type}"
+        )
+    return template_type, template_path, metadata_path
+
+
+def get_signature_paths(event):
+    """Return (faculty signature path, principal signature path) of event."""
+    faculty_signature_path = ""
+    principal_signature_path = ""
+
+    # Try to get faculty signature from club coordinator
+    if event.club and event.club.faculty_coordinator:
+        mentor = event.club.faculty_coordinator
+        if hasattr(mentor, "signature") and mentor.signature:
+            faculty_signature_path = path.join(
+                settings.MEDIA_ROOT, str(mentor.signature)
+            )
+        elif hasattr(mentor.user, "signature") and mentor.user.signature:
+            faculty_signature_path = path.join(
+                settings.MEDIA_ROOT, str(mentor.user.signature)
+            )
+
+    # Try to get principal signature from PrincipalSignature model
+    active_principal_sig = PrincipalSignature.objects.filter(
+        is_active=True
+    ).first()
+    if active_principal_sig and active_principal_sig.signature_image:
+        principal_signature_path = path.join(
+            settings.MEDIA_ROOT, str(active_principal_sig.signature_image)
+        )
+
+    return faculty_signature_path, principal_signature_path
+
+
+def render_certificates(template_args, jobs, workers=None):
+    """
+    Render certificate jobs, yielding (key, pdf_bytes, sha256, error).
+
+    template_args are the init_render_worker arguments. With more than one
+    worker the jobs are spread over a process pool; otherwise they are
+    rendered inline in this process.
+    """
+    if workers is None:
+        workers = settings.CERTIFICATE_WORKERS
+    workers = max(1, min(workers, len(jobs)))
+
+    if workers == 1:
+        init_render_worker(*template_args)
+        for job in jobs:
+            yield render_in_worker(job)
+        return
+
+    # spawn, not fork: never hand a copy of the parent's DB connections
+    # and threads to the render workers
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_render_worker,
+        initargs=template_args,
+    ) as executor:
+        chunksize = max(1, len(jobs) // (workers * 4))
+        yield from executor.map(render_in_worker, jobs, chunksize=chunksize)
+
+
+def abandon_run(run, by_id, generated, errors, error):
+    """Mark run FAILED and delete its certificates that were not written."""
+    written = {cert.id for cert in generated}
+    unwritten = [
+        cert for cert_id, cert in by_id.items() if cert_id not in written
+    ]
+    for cert in unwritten:
+        # PDFs saved to storage but not yet recorded on their row
+        if cert.file:
+            try:
+                cert.file.delete(save=False)
+            except Exception:
+                pass
+    with stats.batched():
+        Certificate.objects.filter(
+            id__in=[cert.id for cert in unwritten]
+        ).delete()
+    invalidate_tags("certificates")
+
+    run.done = len(generated)
+    run.failed = len(unwritten)
+    run.errors = errors + [f"Generation stopped: {error}"]
+    run.status = "FAILED"
+    run.finished_at = now()
+    run.save(
+        update_fields=["done", "failed", "errors", "status", "finished_at"]
+    )
+
+
+def generate_event_certificates(
+    event, user=None, certificate_url=None, workers=None
+):
+    """
+    Generate certificates for every present attendee of a completed event.
+
+    Existing certificates for the event are replaced. Returns the
+    CertificateGenerationRun holding the final counts and errors.
+
+    certificate_url, if given, maps a Certificate to the absolute URL used
+    in the notification email.
+    """
+    if event.status != "completed":
+        raise ValidationError(
+            "Certificates can only be generated for completed events."
+        )
+
+    attendees = list(
+        EventAttendance.objects.filter(
+            event=event, is_present=True
+        ).select_related("student__user")
+    )
+    if not attendees:
+        raise ValidationError("No attendees found for this event.")
+
+    template_type, template_path, metadata_path = get_template_paths(event)
+    faculty_signature_path, principal_signature_path = get_signature_paths(
+        event
+    )
+    template_args = (
+        template_type,
+        template_path,
+        metadata_path,
+        faculty_signature_path,
+        principal_signature_path,
+    )
+
+    run = CertificateGenerationRun.objects.create(
+        event=event, started_by=user, total=len(attendees)
+    )
+
+    # Delete existing certificates for this event to enable re-generation
+    existing_certs = Certificate.objects.filter(event=event)
+    existing_count = 0
+    for cert in existing_certs:
+        # Delete the file from storage
+        if cert.file:
+            cert.file.delete(save=False)
+        existing_count += 1
+    if existing_count > 0:
+        with stats.batched():
+            existing_certs.delete()
+        if user:
+            AuditLog.objects.create(
+                user=user,
+                action=(
+                    f"Deleted {existing_count} existing certificates "
+                    f"for event: {event.name}"
+                ),
+            )
+
+    # Create all certificate records up front so their ids can go in the QR
+    issue_date = now()
+    certificates = Certificate.objects.bulk_create(
+        [
+            Certificate(
+                event=event, student=attendance.student, issue_date=issue_date
+            )
+            for attendance in attendees
+        ]
+    )
+    stats.record_created(certificates)
+    invalidate_tags("certificates")
+    by_id = {cert.id: cert for cert in certificates}
+
+    # Verification codes for every attendee in a single query
+    verification_codes = dict(
+        AICTEPointTransaction.objects.filter(
+            event=event, verification_code__isnull=False
+        ).values_list("student_id", "verification_code")
+    )
+
+    club_name = event.club.name if event.club else ""
+    event_date = event.event_date.strftime("%d %b %Y")
+    points = event.points_awarded if event.aicte_category else 0
+
+    jobs = []
+    for cert in certificates:
+        student = cert.student
+        code = verification_codes.get(student.id) or "N/A"
+        jobs.append(
+            (
+                cert.id,
+                {
+                    "student_name": student.user.get_full_name()
+                    or student.user.username,
+                    "event_name": event.name,
+                    "club_name": club_name,
+                    "date": event_date,
+                    "usn": getattr(student, "usn", "N/A"),
+                    "points": points,
+                    "qr_text": (
+                        f"Certificate ID: {cert.id}, Student: {student.usn}, "
+                        f"Event: {event.name}, Verification Code: {code}"
+                    ),
+                },
+            )
+        )
+
+    generated = []
+    failed_ids = []
+    errors = []
+    pending_writes = []
+
+    def flush():
+        if not pending_writes:
+            return
+        Certificate.objects.bulk_update(pending_writes, ["file", "file_hash"])
+        invalidate_tags("certificates")
+        # In-app notifications and emails, as each student prefers
+        notify(
+            [cert.student.user for cert in pending_writes],
+            "certificate_generated",
+            "Certificate Generated",
+            f"Your certificate for '{event.name}' has been generated "
+            "successfully.",
+            email=(
+                "certificate_generated",
+                certificate_generation_context(event),
+            ),
+            email_fields={
+                cert.student.user_id: {
+                    "certificate_url": (
+                        certificate_url(cert) if certificate_url else None
+                    )
+                }
+                for cert in pending_writes
+            },
+            event=event,
+        )
+        CertificateGenerationRun.objects.filter(pk=run.pk).update(
+            done=F("done") + len(pending_writes)
+        )
+        generated.extend(pending_writes)
+        pending_writes.clear()
+
+    try:
+        for cert_id, pdf_bytes, file_hash, error in render_certificates(
+            template_args, jobs, workers
+        ):
+            cert = by_id[cert_id]
+            if error is None:
+                try:
+                    # Save PDF to certificate record with proper naming
+                    cert.file.save(
+                        f"certificate_{cert.id}.pdf",
+                        ContentFile(pdf_bytes),
+                        save=False,
+                    )
+                    cert.file_hash = file_hash
+                except Exception as e:
+                    error = str(e)
+
+            if error is not None:
+                failed_ids.append(cert.id)
+                errors.append(f"Student {cert.student.user.username}: {error}")
+                CertificateGenerationRun.objects.filter(pk=run.pk).update(
+                    failed=F("failed") + 1
+                )
+                continue
+
+            pending_writes.append(cert)
+            if len(pending_writes) >= WRITE_BATCH_SIZE:
+                flush()
+        flush()
+    except Exception as e:
+        # The pool or storage broke down: drop every certificate that was
+        # not written back, so the event shows no file-less certificates
+        abandon_run(run, by_id, generated, errors, e)
+        raise
+
+    # Drop the records whose PDFs could not be produced
+    if failed_ids:
+        Certificate.objects.filter(id__in=failed_ids).delete()
+
+    run.done = len(generated)
+    run.failed = len(failed_ids)
+    run.errors = errors
+    run.status = "COMPLETED" if generated or not failed_ids else "FAILED"
+    run.finished_at = now()
+    run.save(
+        update_fields=["done", "failed", "errors", "status", "finished_at"]
+    )
+    return run
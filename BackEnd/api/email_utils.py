@@ -1,10 +1,18 @@
 """
 Email sending utilities for CertifyTrack.
-Handles verification emails and password reset OTP delivery.
-Uses plain HTML strings (no Django templates needed).
+Handles verification emails, password reset OTP delivery and notification
+emails. Uses plain HTML strings (no Django templates needed).
+
+Emails are queued in the outbox (api.mailer) and delivered by
+`manage.py deliver_emails`, so callers never wait on SMTP; only the
+verification link and password reset code, which a user is waiting on,
+are sent straight away (urgent=True). Each email type is rendered by the
+builders below (EMAIL_BUILDERS); send_bulk_emails renders one email type
+for many users and queues them with a single INSERT.
 """
 
-from django.core.mail import send_mail
+import inspect
+
 from django.conf import settings
 from django.template.loader import render_to_string
 from django.utils.timezone import now, timedelta
@@ -12,33 +20,105 @@ import uuid
 import secrets
 import string
 
+from .mailer import enqueue, outbox_email, send_now
+
 
-def send_notification_email(user, subject, html_content, plain_content):
+def send_notification_email(user, subject, html_content, plain_content, email_type="", notification=None, urgent=False):
     """
-    Send a notification email to a user based on their preferences.
+    Queue a notification email to a user.
 
     Args:
         user: User instance
         subject: Email subject
         html_content: HTML email content
         plain_content: Plain text email content
+        email_type: Kind of email, for delivery metrics
+        notification: Notification to mark is_email_sent once delivered
+        urgent: Send it now, as the user is waiting for it; it is queued
+            for a retry if that fails
     """
+    email = outbox_email(
+        user.email,
+        subject,
+        plain_content,
+        html_content,
+        user=user,
+        notification=notification,
+        email_type=email_type,
+    )
     try:
-        send_mail(
-            subject,
-            plain_content,
-            settings.DEFAULT_FROM_EMAIL,
-            [user.email],
-            html_message=html_content,
-            fail_silently=False,
-        )
-        print(f"[Notification Email] Sent to {user.email}: {subject}")
+        if urgent and send_now(email):
+            print(f"[Notification Email] Sent to {user.email}: {subject}")
+            return True
+        if not urgent:
+            enqueue([email])
+        print(f"[Notification Email] Queued for {user.email}: {subject}")
         return True
     except Exception as e:
-        print(f"[Notification Email] Failed to send to {user.email}: {str(e)}")
+        print(f"[Notification Email] Failed to queue for {user.email}: {str(e)}")
         return False
 
 
+def user_display_name(user):
+    return user.get_full_name() or user.username
+
+
+def render_email(email_type, **context):
+    """
+    Render (subject, html, text) of an email type. Each builder is passed
+    the fields of context it takes; the subject is formatted with context.
+    """
+    subject, html, html_fields, text, text_fields = EMAIL_BUILDERS[email_type]
+    return (
+        subject.format(**context),
+        html(**{name: context[name] for name in html_fields}),
+        text(**{name: context[name] for name in text_fields}),
+    )
+
+
+def send_bulk_emails(email_type, context, recipients, notifications=None):
+    """
+    Render one email type for many users and queue them with one INSERT.
+
+    Args:
+        email_type: Key of EMAIL_BUILDERS
+        context: Fields shared by every recipient (the event's)
+        recipients: (user, fields) pairs; user_name is filled in
+        notifications: Optional {user id: Notification} to mark once delivered
+
+    Returns the number of emails queued.
+    """
+    notifications = notifications or {}
+    recipients = [(user, fields) for user, fields in recipients if user.email]
+    try:
+        rendered = [
+            render_email(
+                email_type,
+                **context,
+                user_name=user_display_name(user),
+                **fields,
+            )
+            for user, fields in recipients
+        ]
+        emails = enqueue([
+            outbox_email(
+                user.email,
+                subject,
+                text,
+                html,
+                user=user,
+                notification=notifications.get(user.id),
+                email_type=email_type,
+            )
+            for (user, _), (subject, html, text) in zip(recipients, rendered)
+        ])
+        print(f"[Notification Email] Queued {len(emails)} {email_type} emails")
+        return len(emails)
+    except Exception as e:
+        print(f"[Notification Email] Failed to queue {email_type} emails: {str(e)}")
+        return 0
+
+
 def get_verification_email_html(user_name, verification_url, token, frontend_url):
     """Generate HTML for verification email."""
     return f"""
@@ -128,19 +208,16 @@ def send_verification_email(user):
     verification_url = f"{settings.FRONTEND_URL}/verify-email?token={user.email_verification_token}"
     user_name = user.get_full_name() or user.username
     
-    subject = "Verify Your CertifyTrack Email"
-    html_message = get_verification_email_html(user_name, verification_url, user.email_verification_token, settings.FRONTEND_URL)
-    plain_message = get_verification_email_text(user_name, verification_url)
-    print(f"[Email Verification] Sent verification email to {user.email} with token: {user.email_verification_token}")
-    
-    send_mail(
-        subject,
-        plain_message,
-        settings.DEFAULT_FROM_EMAIL,
-        [user.email],
-        html_message=html_message,
-        fail_silently=False,
+    subject, html_message, plain_message = render_email(
+        "verification",
+        user_name=user_name,
+        verification_url=verification_url,
+        token=user.email_verification_token,
+        frontend_url=settings.FRONTEND_URL,
     )
+    print(f"[Email Verification] Sending verification email to {user.email} with token: {user.email_verification_token}")
+    
+    send_notification_email(user, subject, html_message, plain_message, email_type="verification", urgent=True)
 
 
 def get_password_reset_email_html(user_name, otp, otp_minutes, frontend_url):
@@ -246,19 +323,16 @@ def send_password_reset_email(user, otp):
     """
     user_name = user.get_full_name() or user.username
     
-    subject = "Password Reset Code - CertifyTrack"
-    html_message = get_password_reset_email_html(user_name, otp, settings.PASSWORD_RESET_TIMEOUT_MINUTES, settings.FRONTEND_URL)
-    plain_message = get_password_reset_email_text(user_name, otp, settings.PASSWORD_RESET_TIMEOUT_MINUTES)
-    print(f"[Password Reset] Sent password reset email to {user.email} with OTP: {otp}")
-    
-    send_mail(
-        subject,
-        plain_message,
-        settings.DEFAULT_FROM_EMAIL,
-        [user.email],
-        html_message=html_message,
-        fail_silently=False,
+    subject, html_message, plain_message = render_email(
+        "password_reset",
+        user_name=user_name,
+        otp=otp,
+        otp_minutes=settings.PASSWORD_RESET_TIMEOUT_MINUTES,
+        frontend_url=settings.FRONTEND_URL,
     )
+    print(f"[Password Reset] Sending password reset email to {user.email} with OTP: {otp}")
+    
+    send_notification_email(user, subject, html_message, plain_message, email_type="password_reset", urgent=True)
 
 
 def get_account_locked_email_html(user_name, frontend_url):
@@ -355,18 +429,11 @@ def send_account_locked_email(user):
     """
     user_name = user.get_full_name() or user.username
     
-    subject = "Account Locked - CertifyTrack"
-    html_message = get_account_locked_email_html(user_name, settings.FRONTEND_URL)
-    plain_message = get_account_locked_email_text(user_name)
-    
-    send_mail(
-        subject,
-        plain_message,
-        settings.DEFAULT_FROM_EMAIL,
-        [user.email],
-        html_message=html_message,
-        fail_silently=False,
+    subject, html_message, plain_message = render_email(
+        "account_locked", user_name=user_name, frontend_url=settings.FRONTEND_URL
     )
+    
+    send_notification_email(user, subject, html_message, plain_message, email_type="account_locked")
 
 
 def get_welcome_email_html(user_name, user_type, frontend_url):
@@ -452,19 +519,15 @@ def send_welcome_email(user):
     user_name = user.get_full_name() or user.username
     user_type = user.get_user_type_display()
 
-    subject = "Welcome to CertifyTrack!"
-    html_message = get_welcome_email_html(user_name, user_type, settings.FRONTEND_URL)
-    plain_message = get_welcome_email_text(user_name, user_type)
-
-    send_mail(
-        subject,
-        plain_message,
-        settings.DEFAULT_FROM_EMAIL,
-        [user.email],
-        html_message=html_message,
-        fail_silently=False,
+    subject, html_message, plain_message = render_email(
+        "welcome",
+        user_name=user_name,
+        user_type=user_type,
+        frontend_url=settings.FRONTEND_URL,
     )
 
+    send_notification_email(user, subject, html_message, plain_message, email_type="welcome")
+
 
 # ============================================================================
 # EVENT NOTIFICATION EMAILS
@@ -554,19 +617,25 @@ The CertifyTrack Team
     """.strip()
 
 
+def event_registration_context(event):
+    return {
+        "event_name": event.name,
+        "event_date": event.event_date.strftime('%A, %B %d, %Y'),
+        "event_time": event.start_time.strftime('%I:%M %p'),
+        "club_name": event.club.name,
+        "frontend_url": settings.FRONTEND_URL,
+    }
+
+
 def send_event_registration_email(user, event):
     """Send event registration confirmation email."""
-    user_name = user.get_full_name() or user.username
-    event_name = event.name
-    event_date = event.event_date.strftime('%A, %B %d, %Y')
-    event_time = event.start_time.strftime('%I:%M %p')
-    club_name = event.club.name
-
-    subject = f"Event Registration Confirmed - {event_name}"
-    html_message = get_event_registration_email_html(user_name, event_name, event_date, event_time, club_name, settings.FRONTEND_URL)
-    plain_message = get_event_registration_email_text(user_name, event_name, event_date, event_time, club_name)
+    subject, html_message, plain_message = render_email(
+        "event_registration",
+        user_name=user_display_name(user),
+        **event_registration_context(event),
+    )
 
-    return send_notification_email(user, subject, html_message, plain_message)
+    return send_notification_email(user, subject, html_message, plain_message, email_type="event_registration")
 
 
 def get_event_cancellation_email_html(user_name, event_name, event_date, club_name, reason, frontend_url):
@@ -670,18 +739,34 @@ The CertifyTrack Team
     """.strip()
 
 
+def event_cancellation_context(event, reason):
+    return {
+        "event_name": event.name,
+        "event_date": event.event_date.strftime('%A, %B %d, %Y'),
+        "club_name": event.club.name,
+        "reason": reason,
+        "frontend_url": settings.FRONTEND_URL,
+    }
+
+
 def send_event_cancellation_email(user, event, reason=None):
     """Send event cancellation notification email."""
-    user_name = user.get_full_name() or user.username
-    event_name = event.name
-    event_date = event.event_date.strftime('%A, %B %d, %Y')
-    club_name = event.club.name
+    subject, html_message, plain_message = render_email(
+        "event_cancellation",
+        user_name=user_display_name(user),
+        **event_cancellation_context(event, reason),
+    )
 
-    subject = f"Event Cancelled - {event_name}"
-    html_message = get_event_cancellation_email_html(user_name, event_name, event_date, club_name, reason, settings.FRONTEND_URL)
-    plain_message = get_event_cancellation_email_text(user_name, event_name, event_date, club_name, reason)
+    return send_notification_email(user, subject, html_message, plain_message, email_type="event_cancellation")
 
-    return send_notification_email(user, subject, html_message, plain_message)
+
+def send_event_cancellation_emails(users, event, reason=None):
+    """Queue the cancellation notice of an event to many users at once."""
+    return send_bulk_emails(
+        "event_cancellation",
+        event_cancellation_context(event, reason),
+        [(user, {}) for user in users],
+    )
 
 
 def get_certificate_generation_email_html(user_name, event_name, certificate_url, frontend_url):
@@ -795,16 +880,35 @@ The CertifyTrack Team
     """.strip()
 
 
+def certificate_generation_context(event):
+    return {"event_name": event.name, "frontend_url": settings.FRONTEND_URL}
+
+
 def send_certificate_generation_email(user, event, certificate_url):
     """Send certificate generation notification email."""
-    user_name = user.get_full_name() or user.username
-    event_name = event.name
+    subject, html_message, plain_message = render_email(
+        "certificate_generated",
+        user_name=user_display_name(user),
+        certificate_url=certificate_url,
+        **certificate_generation_context(event),
+    )
 
-    subject = f"Certificate Available - {event_name}"
-    html_message = get_certificate_generation_email_html(user_name, event_name, certificate_url, settings.FRONTEND_URL)
-    plain_message = get_certificate_generation_email_text(user_name, event_name, certificate_url)
+    return send_notification_email(user, subject, html_message, plain_message, email_type="certificate_generated")
 
-    return send_notification_email(user, subject, html_message, plain_message)
+
+def send_certificate_generation_emails(event, recipients):
+    """
+    Queue certificate notifications for an event at once.
+
+    Args:
+        event: Event instance
+        recipients: (user, certificate_url) pairs
+    """
+    return send_bulk_emails(
+        "certificate_generated",
+        certificate_generation_context(event),
+        [(user, {"certificate_url": url}) for user, url in recipients],
+    )
 
 
 def get_points_approval_email_html(user_name, event_name, points, status, reason, frontend_url):
@@ -908,16 +1012,26 @@ The CertifyTrack Team
     """.strip()
 
 
+def points_decision_context(event, points, status, reason=None):
+    return {
+        "event_name": event.name,
+        "points": points,
+        "status": status,
+        "decision": status.title(),
+        "reason": reason,
+        "frontend_url": settings.FRONTEND_URL,
+    }
+
+
 def send_points_decision_email(user, event, points, status, reason=None):
     """Send AICTE points approval/rejection notification email."""
-    user_name = user.get_full_name() or user.username
-    event_name = event.name
-
-    subject = f"AICTE Points {status.title()} - {event_name}"
-    html_message = get_points_approval_email_html(user_name, event_name, points, status, reason, settings.FRONTEND_URL)
-    plain_message = get_points_approval_email_text(user_name, event_name, points, status, reason)
+    subject, html_message, plain_message = render_email(
+        "points_decision",
+        user_name=user_display_name(user),
+        **points_decision_context(event, points, status, reason),
+    )
 
-    return send_notification_email(user, subject, html_message, plain_message)
+    return send_notification_email(user, subject, html_message, plain_message, email_type="points_decision")
 
 
 def get_hall_booking_decision_email_html(user_name, hall_name, event_name, booking_date, start_time, status, reason, frontend_url):
@@ -1024,20 +1138,23 @@ The CertifyTrack Team
 
 def send_hall_booking_decision_email(user, booking, decision, reason=None):
     """Send hall booking approval/rejection notification email."""
-    user_name = user.get_full_name() or user.username
-    hall_name = booking.hall.name
-    event_name = booking.event.name
-    booking_date = booking.booking_date.strftime('%A, %B %d, %Y')
-    start_time = booking.start_time.strftime('%I:%M %p')
-
-    subject = f"Hall Booking {decision.title()} - {hall_name}"
-    html_message = get_hall_booking_decision_email_html(user_name, hall_name, event_name, booking_date, start_time, decision, reason, settings.FRONTEND_URL)
-    plain_message = get_hall_booking_decision_email_text(user_name, hall_name, event_name, booking_date, start_time, decision, reason)
+    subject, html_message, plain_message = render_email(
+        "hall_booking_decision",
+        user_name=user_display_name(user),
+        hall_name=booking.hall.name,
+        event_name=booking.event.name,
+        booking_date=booking.booking_date.strftime('%A, %B %d, %Y'),
+        start_time=booking.start_time.strftime('%I:%M %p'),
+        status=decision,
+        decision=decision.title(),
+        reason=reason,
+        frontend_url=settings.FRONTEND_URL,
+    )
 
-    return send_notification_email(user, subject, html_message, plain_message)
+    return send_notification_email(user, subject, html_message, plain_message, email_type="hall_booking_decision")
 
 
-def get_event_reminder_email_html(user_name, event_name, event_date, event_time, club_name, venue, frontend_url):
+def get_event_reminder_email_html(user_name, event_name, event_date, event_time, club_name, venue, starts_in, frontend_url):
     """Generate HTML for event reminder."""
     return f"""
     <!DOCTYPE html>
@@ -1070,7 +1187,7 @@ def get_event_reminder_email_html(user_name, event_name, event_date, event_time,
 
                 <div class="reminder-box">
                     <p class="urgent">📅 DON'T FORGET!</p>
-                    <p>Your event starts in less than 24 hours</p>
+                    <p>Your event starts in less than {starts_in}</p>
                 </div>
 
                 <div class="event-details">
@@ -1106,7 +1223,7 @@ def get_event_reminder_email_html(user_name, event_name, event_date, event_time,
     """
 
 
-def get_event_reminder_email_text(user_name, event_name, event_date, event_time, club_name, venue):
+def get_event_reminder_email_text(user_name, event_name, event_date, event_time, club_name, venue, starts_in):
     """Generate plain text for event reminder."""
     return f"""
 Hi {user_name},
@@ -1114,7 +1231,7 @@ Hi {user_name},
 This is a friendly reminder about your upcoming event.
 
 📅 DON'T FORGET!
-Your event starts in less than 24 hours
+Your event starts in less than {starts_in}
 
 Event Details:
 - Event: {event_name}
@@ -1133,17 +1250,117 @@ The CertifyTrack Team
     """.strip()
 
 
-def send_event_reminder_email(user, event):
-    """Send event reminder email 24 hours before."""
-    user_name = user.get_full_name() or user.username
-    event_name = event.name
-    event_date = event.event_date.strftime('%A, %B %d, %Y')
-    event_time = event.start_time.strftime('%I:%M %p')
-    club_name = event.club.name
-    venue = event.assigned_hall.name if event.assigned_hall else None
+def event_reminder_context(event, starts_in="24 hours"):
+    return {
+        "event_name": event.name,
+        "event_date": event.event_date.strftime('%A, %B %d, %Y'),
+        "event_time": event.start_time.strftime('%I:%M %p'),
+        "club_name": event.club.name,
+        "venue": event.assigned_hall.name if event.assigned_hall else None,
+        "starts_in": starts_in,
+        "frontend_url": settings.FRONTEND_URL,
+    }
+
+
+def send_event_reminder_email(user, event, starts_in="24 hours"):
+    """Send event reminder email, by default 24 hours before."""
+    subject, html_message, plain_message = render_email(
+        "event_reminder",
+        user_name=user_display_name(user),
+        **event_reminder_context(event, starts_in),
+    )
+
+    return send_notification_email(user, subject, html_message, plain_message, email_type="event_reminder")
+
+
+def send_event_reminder_emails(users, event, starts_in="24 hours"):
+    """Queue the reminder of an event to many users at once."""
+    return send_bulk_emails(
+        "event_reminder",
+        event_reminder_context(event, starts_in),
+        [(user, {}) for user in users],
+    )
 
-    subject = f"Event Reminder - {event_name} Tomorrow"
-    html_message = get_event_reminder_email_html(user_name, event_name, event_date, event_time, club_name, venue, settings.FRONTEND_URL)
-    plain_message = get_event_reminder_email_text(user_name, event_name, event_date, event_time, club_name, venue)
 
-    return send_notification_email(user, subject, html_message, plain_message)
+# ============================================================================
+# EMAIL TYPES
+# ============================================================================
+
+
+def _builders(subject, html, text):
+    """(subject, html builder, its fields, text builder, its fields)"""
+    return (
+        subject,
+        html,
+        tuple(inspect.signature(html).parameters),
+        text,
+        tuple(inspect.signature(text).parameters),
+    )
+
+
+# Subjects are format strings over the same fields as the builders
+EMAIL_BUILDERS = {
+    email_type: _builders(*builders)
+    for email_type, *builders in (
+        (
+            "verification",
+            "Verify Your CertifyTrack Email",
+            get_verification_email_html,
+            get_verification_email_text,
+        ),
+        (
+            "password_reset",
+            "Password Reset Code - CertifyTrack",
+            get_password_reset_email_html,
+            get_password_reset_email_text,
+        ),
+        (
+            "account_locked",
+            "Account Locked - CertifyTrack",
+            get_account_locked_email_html,
+            get_account_locked_email_text,
+        ),
+        (
+            "welcome",
+            "Welcome to CertifyTrack!",
+            get_welcome_email_html,
+            get_welcome_email_text,
+        ),
+        (
+            "event_registration",
+            "Event Registration Confirmed - {event_name}",
+            get_event_registration_email_html,
+            get_event_registration_email_text,
+        ),
+        (
+            "event_cancellation",
+            "Event Cancelled - {event_name}",
+            get_event_cancellation_email_html,
+            get_event_cancellation_email_text,
+        ),
+        (
+            "certificate_generated",
+            "Certificate Available - {event_name}",
+            get_certificate_generation_email_html,
+            get_certificate_generation_email_text,
+        ),
+        (
+            "points_decision",
+            "AICTE Points {decision} - {event_name}",
+            get_points_approval_email_html,
+            get_points_approval_email_text,
+        ),
+        (
+            "hall_booking_decision",
+            "Hall Booking {decision} - {hall_name}",
+            get_hall_booking_decision_email_html,
+            get_hall_booking_decision_email_text,
+        ),
+        (
+            "event_reminder",
+            "Event Reminder - {event_name} in {starts_in}",
+            get_event_reminder_email_html,
+            get_event_reminder_email_text,
+        ),
+    )
+}
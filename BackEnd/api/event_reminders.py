@@ -0,0 +1,161 @@
+"""
+Event reminders for CertifyTrack.
+
+EVENT_REMINDER_OFFSETS lists how long before an event's start its
+registered students are reminded, e.g. "24h,1h". send_due_reminders() is
+meant to run every minute (`manage.py send_event_reminders` from cron):
+
+- A reminder of kind "24h" is due for a registration from 24 hours
+  before its event starts until it starts. Due reminders are found with a
+  range scan of the Event.starts_at index and an anti-join on
+  EventReminder, so a run costs the same however long the history of
+  events and reminders grows, and a missed run is caught up by the next.
+- When several kinds are due at once (a late registration, runs missed
+  for hours), only the closest is sent; the others are recorded as
+  skipped so they never go out late.
+- Each (event, student, kind) is recorded in EventReminder, unique, and
+  claimed with the run's batch_id before anything is sent, so running
+  twice, or two runs overlapping, never sends a reminder twice.
+- Reminders go out through api.notifications: an in-app notification and,
+  if the student opted in, an email queued in the outbox and delivered in
+  batches over pooled connections by `manage.py deliver_emails`.
+"""
+
+import re
+import uuid
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils.timezone import now
+
+from .email_utils import event_reminder_context
+from .models import Event, EventRegistration, EventReminder, User
+from .notifications import notify
+
+# Registrations and events that get reminders
+REMINDED_REGISTRATION_STATUSES = ["REGISTERED", "ATTENDED"]
+REMINDED_EVENT_STATUSES = ["scheduled"]
+
+_UNITS = {"m": "minute", "h": "hour", "d": "day"}
+
+
+class ReminderOffset:
+    """One entry of EVENT_REMINDER_OFFSETS, e.g. "24h"."""
+
+    def __init__(self, kind):
+        match = re.fullmatch(r"(\d+)([mhd])", kind)
+        if not match or not int(match[1]):
+            raise ImproperlyConfigured(
+                f"EVENT_REMINDER_OFFSETS: '{kind}' is not a number of "
+                "minutes, hours or days such as 30m, 24h or 2d"
+            )
+        amount, unit = int(match[1]), _UNITS[match[2]]
+        self.kind = kind
+        self.delta = timedelta(**{f"{unit}s": amount})
+        # For "starts in less than ..."
+        self.label = f"{amount} {unit}" if amount == 1 else f"{amount} {unit}s"
+
+
+def reminder_offsets():
+    """The configured offsets, closest to the event first."""
+    offsets = {
+        kind: ReminderOffset(kind) for kind in settings.EVENT_REMINDER_OFFSETS
+    }
+    return sorted(offsets.values(), key=lambda offset: offset.delta)
+
+
+def due_registrations(offset, at):
+    """(event id, student id) of registrations owed offset's reminder at at."""
+    return EventRegistration.objects.filter(
+        status__in=REMINDED_REGISTRATION_STATUSES,
+        event__status__in=REMINDED_EVENT_STATUSES,
+        event__starts_at__gt=at,
+        event__starts_at__lte=at + offset.delta,
+    ).filter(
+        ~Exists(
+            EventReminder.objects.filter(
+                event_id=OuterRef("event_id"),
+                student_id=OuterRef("student_id"),
+                kind=offset.kind,
+            )
+        )
+    ).values_list("event_id", "student_id")
+
+
+def send_due_reminders(at=None, dry_run=False):
+    """
+    Send every reminder due at at (default: now) that has not been sent.
+
+    Returns {"due", "sent", "skipped", "emailed"} counts; with dry_run
+    nothing is recorded or sent and sent/skipped are what would be.
+    """
+    at = at or now()
+    offsets = reminder_offsets()
+    labels = {offset.kind: offset.label for offset in offsets}
+
+    # (event id, student id) -> due kinds, closest first
+    due = defaultdict(list)
+    for offset in offsets:
+        for pair in due_registrations(offset, at):
+            due[pair].append(offset.kind)
+    superseded = sum(len(kinds) - 1 for kinds in due.values())
+    result = {
+        "due": len(due),
+        "sent": len(due) if dry_run else 0,
+        "skipped": superseded if dry_run else 0,
+        "emailed": 0,
+    }
+    if not due or dry_run:
+        return result
+
+    batch_id = uuid.uuid4().hex
+    with transaction.atomic():
+        EventReminder.objects.bulk_create(
+            [
+                EventReminder(
+                    event_id=event_id,
+                    student_id=student_id,
+                    kind=kind,
+                    batch_id=batch_id,
+                    skipped=position > 0,
+                    sent_at=at,
+                )
+                for (event_id, student_id), kinds in due.items()
+                for position, kind in enumerate(kinds)
+            ],
+            batch_size=500,
+            ignore_conflicts=True,
+        )
+        # Only what this run inserted; an overlapping run sends the rest
+        claimed = EventReminder.objects.filter(batch_id=batch_id).values_list(
+            "event_id", "student__user_id", "kind", "skipped"
+        )
+        recipients = defaultdict(list)  # (event id, kind) -> user ids
+        for event_id, user_id, kind, skipped in claimed:
+            if skipped:
+                result["skipped"] += 1
+            else:
+                recipients[event_id, kind].append(user_id)
+
+        events = Event.objects.select_related("club", "assigned_hall").in_bulk(
+            {event_id for event_id, _ in recipients}
+        )
+        for (event_id, kind), user_ids in recipients.items():
+            event = events[event_id]
+            label = labels[kind]
+            _, emailed = notify(
+                User.objects.filter(id__in=user_ids),
+                "event_reminder",
+                "Event Reminder",
+                f"'{event.name}' starts in less than {label}, at "
+                f"{event.start_time:%I:%M %p} on {event.event_date}.",
+                email=("event_reminder", event_reminder_context(event, label)),
+                event=event,
+            )
+            result["sent"] += len(user_ids)
+            result["emailed"] += emailed
+    return result
@@ -0,0 +1,218 @@
+"""
+Event status engine for CertifyTrack.
+
+Events move from draft to scheduled to ongoing to completed with time,
+judged on Event.starts_at and Event.ends_at (the date and time fields
+combined, see Event.save):
+
+- draft -> scheduled on the day the event starts, unless it has already
+  ended (an ended draft was never published and is left alone)
+- scheduled -> ongoing once it has started
+- scheduled or ongoing -> completed once it has ended; an event without
+  an end time ends at the midnight after its last day
+
+update_statuses() applies each transition as an UPDATE of every event it
+matches, in one transaction, so a run costs a few queries however many
+events change. Transitions apply in order, so an event can go through
+several in one run (a draft that has started becomes ongoing). The club
+organizers of the changed events are notified of each event's final
+status, once, with one bulk INSERT. The UPDATEs send no signals, so the
+dashboard counters (api.stats) and cached event responses are updated
+here.
+
+next_transition() is when the next event will change status; `manage.py
+update_event_statuses --daemon` sleeps until then instead of polling.
+With REDIS_URL set, saving an event wakes the daemon (wake_daemon), as
+the edit may bring the next transition forward.
+"""
+
+import logging
+import time as clock
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Min, Q
+from django.utils.timezone import localdate, make_aware, now
+
+from . import caching, stats
+from .jobs import get_redis
+from .models import ClubOrganizer, Event, Notification
+from .notifications import load_preferences, wants_in_app
+
+logger = logging.getLogger(__name__)
+
+# Events per UPDATE
+UPDATE_BATCH_SIZE = 500
+
+# Organizer notification per new status
+STATUS_MESSAGES = {
+    "scheduled": (
+        "Your event '{name}' has been automatically set to scheduled status."
+    ),
+    "ongoing": "Your event '{name}' is now ongoing.",
+    "completed": "Your event '{name}' has been completed.",
+}
+
+
+def _midnight(day):
+    return make_aware(datetime.combine(day, time.min))
+
+
+def transitions(at):
+    """(name, from status, to status, condition) in the order they apply."""
+    tomorrow = _midnight(localdate(at) + timedelta(days=1))
+    return [
+        (
+            "draft_to_scheduled",
+            "draft",
+            "scheduled",
+            Q(starts_at__lt=tomorrow, ends_at__gt=at),
+        ),
+        (
+            "scheduled_to_completed",
+            "scheduled",
+            "completed",
+            Q(ends_at__lte=at),
+        ),
+        ("scheduled_to_ongoing", "scheduled", "ongoing", Q(starts_at__lte=at)),
+        ("ongoing_to_completed", "ongoing", "completed", Q(ends_at__lte=at)),
+    ]
+
+
+def _chunks(ids):
+    for i in range(0, len(ids), UPDATE_BATCH_SIZE):
+        yield ids[i : i + UPDATE_BATCH_SIZE]
+
+
+def _notify_organizers(changed):
+    """Notify club organizers of (event id, name, club id, status) rows."""
+    club_ids = {club_id for _, _, club_id, _ in changed if club_id}
+    organizers = defaultdict(list)  # club id -> users
+    club_organizers = ClubOrganizer.objects.filter(club_id__in=club_ids)
+    for organizer in club_organizers.select_related("user"):
+        organizers[organizer.club_id].append(organizer.user)
+    users = [user for club_users in organizers.values() for user in club_users]
+    preferences = load_preferences(users)
+    notifications = [
+        Notification(
+            user=user,
+            title="Event Status Updated",
+            message=STATUS_MESSAGES[new_status].format(name=name),
+            notification_type="info",
+            event_id=event_id,
+        )
+        for event_id, name, club_id, new_status in changed
+        for user in organizers.get(club_id, ())
+        if wants_in_app(preferences[user.id], "info")
+    ]
+    return Notification.objects.bulk_create(
+        notifications, batch_size=UPDATE_BATCH_SIZE
+    )
+
+
+def update_statuses(at=None, dry_run=False):
+    """
+    Move every event whose status is behind the clock at at (default: now).
+
+    Returns {transition name: [(event id, event name)]}. With dry_run the
+    changes are made and rolled back, so chained transitions are reported
+    as they would happen.
+    """
+    at = at or now()
+    changes = {}
+    # event id -> (name, club id, final status), to notify
+    changed = {}
+    counters = defaultdict(int)
+    with transaction.atomic():
+        for name, old, new, condition in transitions(at):
+            rows = list(
+                Event.objects.select_for_update()
+                .filter(condition, status=old)
+                .order_by("id")
+                .values_list("id", "name", "club_id")
+            )
+            changes[name] = [
+                (event_id, event_name) for event_id, event_name, _ in rows
+            ]
+            if not rows:
+                continue
+            ids = [event_id for event_id, _, _ in rows]
+            for chunk in _chunks(ids):
+                Event.objects.filter(id__in=chunk, status=old).update(
+                    status=new, updated_at=at
+                )
+            counters[f"events:{old}"] -= len(rows)
+            counters[f"events:{new}"] += len(rows)
+            for event_id, event_name, club_id in rows:
+                changed[event_id] = (event_name, club_id, new)
+
+        if changed:
+            _notify_organizers(
+                [(event_id, *change) for event_id, change in changed.items()]
+            )
+            stats.apply_changes(counters)
+            caching.invalidate_tags("events")
+        if dry_run:
+            transaction.set_rollback(True)
+    return changes
+
+
+def next_transition(at=None):
+    """When the next event changes status after at (default: now), or None."""
+    at = at or now()
+    boundaries = Event.objects.aggregate(
+        draft=Min("starts_at", filter=Q(status="draft", ends_at__gt=at)),
+        start=Min("starts_at", filter=Q(status="scheduled", starts_at__gt=at)),
+        end=Min(
+            "ends_at",
+            filter=Q(status__in=["scheduled", "ongoing"], ends_at__gt=at),
+        ),
+    )
+    if boundaries["draft"] is not None:
+        # Drafts are scheduled at the start of their day
+        boundaries["draft"] = max(
+            _midnight(localdate(boundaries["draft"])), at
+        )
+    upcoming = [
+        boundary for boundary in boundaries.values() if boundary is not None
+    ]
+    return min(upcoming, default=None)
+
+
+def wake_daemon():
+    """Wake `update_event_statuses --daemon` to look at the events again."""
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        # One pending wake-up is enough, whether or not a daemon is running
+        client.pipeline().rpush(settings.EVENT_STATUS_WAKE_KEY, 1).ltrim(
+            settings.EVENT_STATUS_WAKE_KEY, -1, -1
+        ).execute()
+    except Exception as e:
+        logger.warning("Error waking the event status daemon: %s", e)
+
+
+def wait_for_change(timeout, stop):
+    """
+    Block for up to timeout seconds, or until an event is saved (with
+    Redis) or stop (a threading.Event) is set.
+    """
+    client = get_redis()
+    if client is not None:
+        try:
+            # Short waits so a stop request is noticed
+            deadline = clock.monotonic() + timeout
+            while not stop.is_set():
+                remaining = deadline - clock.monotonic()
+                if remaining <= 0:
+                    return
+                wait = max(1, int(min(remaining, 5)))
+                if client.blpop(settings.EVENT_STATUS_WAKE_KEY, timeout=wait):
+                    return
+            return
+        except Exception as e:
+            logger.warning("Error waiting on Redis for event changes: %s", e)
+    stop.wait(timeout)
@@ -0,0 +1,412 @@
+"""
+Batch hall allocation for CertifyTrack.
+
+Event.assign_hall places one event at a time, trying its primary and then
+its secondary hall. allocate_halls places every scheduled event of a date
+range that needs a hall and has none, all at once:
+
+- A hall is a candidate for an event when it is available, seats the
+  event's max_participants and has no APPROVED or PENDING booking
+  overlapping the event (api.hall_availability).
+- Candidates are tried in order of preference: the primary hall, the
+  secondary hall, then the other halls from the smallest that fits, so
+  large halls stay free for large events.
+- Events overlapping on the same day form an interval graph; two events
+  adjacent in it cannot share a hall. Events are placed in start order
+  with augmenting paths, as in bipartite matching: when every candidate
+  of an event is taken, an event holding one of them is moved to another
+  of its candidates if it can be (recursively), which frees the hall.
+  When a day's events all overlap each other this is exactly maximum
+  bipartite matching of events to halls.
+
+Events that cannot be placed are reported as conflicts with a reason and
+suggestions: other halls that are large enough and free at that time, or
+the next free slots of the same length on the event's day.
+
+apply_allocation writes the result: the APPROVED HallBooking rows with
+bulk_create and the events' assigned_hall with bulk_update. run_allocation
+plans and writes in one transaction holding the halls' day locks
+(api.hall_availability.run_locked).
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils.timezone import now
+
+from . import caching, hall_availability, stats
+from .hall_availability import (
+    OCCUPYING_STATUSES,
+    interval,
+    interval_mask,
+    to_time,
+)
+from .models import AuditLog, Event, Hall, HallBooking
+
+# Suggestions listed per conflict
+MAX_SUGGESTIONS = 3
+
+# Conflict reasons
+NO_HALL_LARGE_ENOUGH = "no_hall_large_enough"
+ALL_HALLS_BUSY = "all_halls_busy"
+NO_BOOKER = "no_booker"
+
+
+class Conflict:
+    """An event that could not be given a hall."""
+
+    def __init__(self, event, reason, message, suggestions=()):
+        self.event = event
+        self.reason = reason
+        self.message = message
+        self.suggestions = list(suggestions)
+
+    def as_dict(self):
+        return {
+            "event": self.event.id,
+            "event_name": self.event.name,
+            "date": self.event.event_date,
+            "reason": self.reason,
+            "message": self.message,
+            "suggestions": self.suggestions,
+        }
+
+
+class Allocation:
+    """The outcome of allocate_halls: {event: hall} and the conflicts."""
+
+    def __init__(self, assignments, conflicts):
+        self.assignments = assignments
+        self.conflicts = conflicts
+
+    def as_dict(self):
+        assigned = [
+            {
+                "event": event.id,
+                "event_name": event.name,
+                "date": event.event_date,
+                "hall": hall.id,
+                "hall_name": hall.name,
+                "preference": _preference(event, hall),
+            }
+            for event, hall in sorted(
+                self.assignments.items(),
+                key=lambda item: (item[0].event_date, item[0].start_time),
+            )
+        ]
+        return {
+            "assigned": assigned,
+            "conflicts": [conflict.as_dict() for conflict in self.conflicts],
+        }
+
+
+def _preference(event, hall):
+    if hall.id == event.primary_hall_id:
+        return "primary"
+    if hall.id == event.secondary_hall_id:
+        return "secondary"
+    return "other"
+
+
+def pending_events(first_day, last_day):
+    """Scheduled events of the range that need a hall and have none."""
+    return (
+        Event.objects.filter(
+            status="scheduled",
+            assigned_hall__isnull=True,
+            event_date__range=(first_day, last_day),
+        )
+        .filter(
+            Q(needsVenueCampus=True)
+            | Q(primary_hall__isnull=False)
+            | Q(secondary_hall__isnull=False)
+        )
+        # Events holding a hall through a booking made by hand
+        .exclude(hall_bookings__booking_status__in=OCCUPYING_STATUSES)
+        .select_related("club", "created_by")
+        .order_by("event_date", "start_time", "id")
+    )
+
+
+class _DaySolver:
+    """Places the events of one day (see the module docstring)."""
+
+    def __init__(self, halls, occupancy):
+        self.halls = halls
+        self.occupancy = occupancy
+        self.placed = {}  # event -> hall
+        self.held = defaultdict(list)  # hall id -> [(start, end, event)]
+
+    def candidates(self, event, span):
+        """Halls that seat the event and are free of existing bookings."""
+        needed = event.max_participants or 0
+        wanted = interval_mask(*span)
+        fitting = [
+            hall
+            for hall in self.halls
+            if hall.capacity >= needed
+            and not self.occupancy.mask(hall.id) & wanted
+        ]
+        preferred = [event.primary_hall_id, event.secondary_hall_id]
+        return sorted(
+            fitting,
+            key=lambda hall: (
+                preferred.index(hall.id) if hall.id in preferred else 2,
+                hall.capacity,
+                hall.name,
+            ),
+        )
+
+    def holders(self, hall, span):
+        start, end = span
+        return [
+            event
+            for held_start, held_end, event in self.held[hall.id]
+            if held_start < end and start < held_end
+        ]
+
+    def assign(self, event, span, hall):
+        self.placed[event] = hall
+        self.held[hall.id].append((*span, event))
+
+    def unassign(self, event):
+        hall = self.placed.pop(event)
+        self.held[hall.id] = [
+            entry for entry in self.held[hall.id] if entry[2] is not event
+        ]
+        return hall
+
+    def place(self, event, spans, options, visited):
+        """
+        Augmenting-path search: give event a hall, moving others if needed.
+        """
+        span = spans[event]
+        # The most preferred hall nobody holds at that time, if any, so
+        # events are only moved off their preferences when it places more
+        for hall in options[event]:
+            if hall.id not in visited and not self.holders(hall, span):
+                visited.add(hall.id)
+                self.assign(event, span, hall)
+                return True
+        for hall in options[event]:
+            if hall.id in visited:
+                continue
+            visited.add(hall.id)
+            holders = self.holders(hall, span)
+            previous = {holder: self.unassign(holder) for holder in holders}
+            self.assign(event, span, hall)
+            moved = []
+            for holder in holders:
+                if not self.place(holder, spans, options, visited):
+                    break
+                moved.append(holder)
+            else:
+                return True
+            # Undo this attempt
+            for holder in moved:
+                self.unassign(holder)
+            self.unassign(event)
+            for holder, held_hall in previous.items():
+                self.assign(holder, spans[holder], held_hall)
+        return False
+
+    def solve(self, events):
+        spans = {
+            event: interval(
+                event.start_time, event.end_time or event.start_time
+            )
+            for event in events
+        }
+        options = {
+            event: self.candidates(event, spans[event]) for event in events
+        }
+        unplaced = []
+        for event in sorted(
+            events, key=lambda event: (spans[event], event.id)
+        ):
+            if not options[event] or not self.place(
+                event, spans, options, set()
+            ):
+                unplaced.append(event)
+        return spans, unplaced
+
+    def suggestions(self, event, span):
+        """Where else, or when else on the day, the event could go."""
+        needed = event.max_participants or 0
+        large_enough = [hall for hall in self.halls if hall.capacity >= needed]
+        free_now = [
+            hall
+            for hall in large_enough
+            if not self.occupancy.mask(hall.id) & interval_mask(*span)
+            and not self.holders(hall, span)
+        ]
+        suggestions = [
+            {
+                "hall": hall.id,
+                "hall_name": hall.name,
+                "date": self.occupancy.day,
+                "start_time": to_time(span[0]),
+                "end_time": to_time(span[1]),
+            }
+            for hall in free_now[:MAX_SUGGESTIONS]
+        ]
+        if suggestions:
+            return suggestions
+
+        # Same length later the same day, earliest first, around both the
+        # existing bookings and this allocation
+        length = span[1] - span[0]
+        planned = hall_availability.DayOccupancy(self.occupancy.day, ())
+        slots = []
+        for hall in large_enough:
+            planned.bookings[hall.id] = list(
+                self.occupancy.bookings.get(hall.id, ())
+            ) + [(start, end, None) for start, end, _ in self.held[hall.id]]
+            start = planned.free_slot(hall.id, length, after=span[0])
+            if start is not None:
+                slots.append((start, hall))
+        slots.sort(key=lambda slot: (slot[0], slot[1].capacity))
+        return [
+            {
+                "hall": hall.id,
+                "hall_name": hall.name,
+                "date": self.occupancy.day,
+                "start_time": to_time(start),
+                "end_time": to_time(start + length),
+            }
+            for start, hall in slots[:MAX_SUGGESTIONS]
+        ]
+
+
+def allocate_halls(first_day, last_day, events=None):
+    """
+    Plan hall assignments for the events of first_day..last_day.
+
+    events defaults to pending_events(first_day, last_day). Reads the
+    halls and the range's bookings with one query each and writes
+    nothing; pass the result to apply_allocation.
+    """
+    if events is None:
+        events = pending_events(first_day, last_day)
+    halls = list(
+        Hall.objects.filter(is_available=True).order_by("capacity", "name")
+    )
+    largest = max((hall.capacity for hall in halls), default=0)
+    days = hall_availability.occupancy_range(first_day, last_day)
+
+    by_day = defaultdict(list)
+    for event in events:
+        by_day[event.event_date].append(event)
+
+    assignments = {}
+    conflicts = []
+    for day, day_events in sorted(by_day.items()):
+        solver = _DaySolver(halls, days[day])
+        spans, unplaced = solver.solve(day_events)
+        assignments.update(solver.placed)
+        for event in unplaced:
+            needed = event.max_participants or 0
+            if needed > largest:
+                reason = NO_HALL_LARGE_ENOUGH
+                message = (
+                    f"No hall seats {needed} participants; "
+                    f"the largest seats {largest}."
+                )
+            else:
+                reason = ALL_HALLS_BUSY
+                message = (
+                    f"Every hall seating {needed} participants is booked on "
+                    f"{day} from {event.start_time}."
+                )
+            suggestions = solver.suggestions(event, spans[event])
+            conflicts.append(Conflict(event, reason, message, suggestions))
+    return Allocation(assignments, conflicts)
+
+
+def apply_allocation(allocation, user=None):
+    """
+    Write an allocation in one transaction: an APPROVED HallBooking per
+    assigned event (booked by the event's creator, or user) and the
+    events' assigned_hall. Events with neither a creator nor user become
+    conflicts. Returns the created bookings.
+
+    Use run_allocation, which holds the halls' locks from planning to
+    writing, rather than calling this directly.
+    """
+    assigned_at = now()
+    bookings = []
+    events = []
+    for event, hall in list(allocation.assignments.items()):
+        booked_by = event.created_by or user
+        if booked_by is None:
+            del allocation.assignments[event]
+            allocation.conflicts.append(
+                Conflict(
+                    event,
+                    NO_BOOKER,
+                    "The event has no creator to book the hall for.",
+                )
+            )
+            continue
+        bookings.append(
+            HallBooking(
+                hall=hall,
+                event=event,
+                booking_date=event.event_date,
+                start_time=event.start_time,
+                end_time=event.end_time or event.start_time,
+                booking_status="APPROVED",
+                booked_by=booked_by,
+                approved_by=user or booked_by,
+            )
+        )
+        event.assigned_hall = hall
+        event.hall_assigned_at = assigned_at
+        events.append(event)
+
+    with transaction.atomic():
+        HallBooking.objects.bulk_create(bookings)
+        Event.objects.bulk_update(
+            events, ["assigned_hall", "hall_assigned_at"]
+        )
+        if user is not None and bookings:
+            AuditLog.objects.create(
+                user=user,
+                action=f"Allocated halls to {len(bookings)} events",
+            )
+        # bulk_create and bulk_update send no signals
+        stats.record_created(bookings)
+        caching.invalidate_tags("halls", "events")
+        hall_availability.invalidate(
+            *{booking.booking_date for booking in bookings}
+        )
+    return bookings
+
+
+def run_allocation(first_day, last_day, user=None, dry_run=False):
+    """
+    allocate_halls and, unless dry_run, apply_allocation in one transaction
+    holding the locks of every available hall on every day of the range,
+    so no booking can be made between planning and writing. Returns the
+    Allocation.
+    """
+    if dry_run:
+        return allocate_halls(first_day, last_day)
+
+    def allocate():
+        allocation = allocate_halls(first_day, last_day)
+        apply_allocation(allocation, user)
+        return allocation
+
+    hall_ids = Hall.objects.filter(is_available=True).values_list(
+        "id", flat=True
+    )
+    days = [
+        first_day + timedelta(days=offset)
+        for offset in range((last_day - first_day).days + 1)
+    ]
+    return hall_availability.run_locked(
+        [(hall_id, day) for hall_id in hall_ids for day in days], allocate
+    )
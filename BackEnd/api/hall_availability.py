@@ -0,0 +1,391 @@
+"""
+Hall availability for CertifyTrack.
+
+Every overlap question about halls goes through this module: is a hall
+free, which halls are free, and when is the next free slot of a given
+length. The answers come from a per-day occupancy index: for each hall,
+the day's APPROVED and PENDING bookings as a bitmap with one bit per
+minute (a Python int of 1440 bits). Checking an interval is then a single
+AND of two integers, however many bookings the hall has.
+
+For planning across days, hall_calendar lists the busy and free
+intervals of each hall on each day of a date range from one range query,
+and hall_calendar_etag tags that answer so unchanged ranges are not sent
+again.
+
+A day's index is built with one query and kept in the Django cache until
+a booking of that day is written (see api.signals). Checks made before a
+write (creating or approving a booking, assigning an event's hall) pass
+use_cache=False and read the bookings fresh from the database.
+
+Writes are serialised per hall and day: run_locked takes the row lock of
+every HallDayLock involved (SELECT ... FOR UPDATE) before a booking is
+checked and saved, so two requests for the same slot cannot both see it
+free. Bookings of other halls or days do not wait for each other. When
+the database gives up on a lock (deadlock, lock timeout, or "database is
+locked" on SQLite) the whole transaction is retried with backoff.
+
+Intervals are half-open, [start, end): a booking ending at 11:00 does not
+overlap one starting at 11:00. An interval with no length (an event
+without an end time) occupies its start minute; one that ends before it
+starts (past midnight) occupies the rest of the day.
+"""
+
+import hashlib
+import random
+import time as clock
+from collections import defaultdict
+from datetime import time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import OperationalError, transaction
+from django.db.models import Count, Max
+
+from .models import HallBooking, HallDayLock
+
+# Bookings in these states hold their hall
+OCCUPYING_STATUSES = ("APPROVED", "PENDING")
+
+MINUTES_PER_DAY = 24 * 60
+
+CACHE_TIMEOUT = 24 * 60 * 60
+
+# Longest date range one calendar request may cover
+CALENDAR_MAX_DAYS = 92
+
+
+def _minute(value):
+    return value.hour * 60 + value.minute
+
+
+def interval(start_time, end_time):
+    """(start, end) minutes of the day for a pair of times."""
+    start = _minute(start_time)
+    end = _minute(end_time) + (
+        1 if end_time.second or end_time.microsecond else 0
+    )
+    if end < start:
+        end = MINUTES_PER_DAY
+    elif end == start:
+        end = start + 1
+    return start, min(end, MINUTES_PER_DAY)
+
+
+def interval_mask(start, end):
+    """Bitmap with the bits of minutes [start, end) set."""
+    return ((1 << (end - start)) - 1) << start
+
+
+def merge_intervals(intervals):
+    """Sorted, non-overlapping union of (start, end) intervals."""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+def free_intervals(busy, opens=0, closes=MINUTES_PER_DAY):
+    """The gaps between merged busy intervals within [opens, closes)."""
+    free = []
+    cursor = opens
+    for start, end in busy:
+        if start > cursor:
+            free.append((cursor, min(start, closes)))
+        cursor = max(cursor, end)
+        if cursor >= closes:
+            break
+    if cursor < closes:
+        free.append((cursor, closes))
+    return [(start, end) for start, end in free if start < end]
+
+
+def to_time(minute):
+    """The time of a minute of the day; the end of the day is 23:59:59."""
+    if minute >= MINUTES_PER_DAY:
+        return time(23, 59, 59)
+    return time(minute // 60, minute % 60)
+
+
+class DayOccupancy:
+    """The occupying bookings of every hall on one day."""
+
+    def __init__(self, day, bookings):
+        """bookings: (booking_id, hall_id, start_time, end_time) tuples."""
+        self.day = day
+        self.bookings = defaultdict(
+            list
+        )  # hall id -> [(start, end, booking id)]
+        self.masks = defaultdict(int)  # hall id -> bitmap of occupied minutes
+        for booking_id, hall_id, start_time, end_time in bookings:
+            start, end = interval(start_time, end_time)
+            self.bookings[hall_id].append((start, end, booking_id))
+            self.masks[hall_id] |= interval_mask(start, end)
+
+    def mask(self, hall_id, exclude=None):
+        """Occupied minutes of a hall, optionally ignoring one booking."""
+        if exclude is None:
+            return self.masks.get(hall_id, 0)
+        mask = 0
+        for start, end, booking_id in self.bookings.get(hall_id, ()):
+            if booking_id != exclude:
+                mask |= interval_mask(start, end)
+        return mask
+
+    def is_free(self, hall_id, start, end, exclude=None):
+        return not self.mask(hall_id, exclude) & interval_mask(start, end)
+
+    def free_halls(self, hall_ids, start, end):
+        wanted = interval_mask(start, end)
+        return [
+            hall_id for hall_id in hall_ids if not self.mask(hall_id) & wanted
+        ]
+
+    def free_slot(self, hall_id, length, after=0, before=MINUTES_PER_DAY):
+        """
+        First start minute >= after of length free minutes ending by before.
+        """
+        if length <= 0:
+            return None
+        candidate = after
+        for start, end, _ in sorted(self.bookings.get(hall_id, ())):
+            if end <= candidate:
+                continue
+            if start - candidate >= length:
+                break
+            candidate = max(candidate, end)
+        if candidate + length <= min(before, MINUTES_PER_DAY):
+            return candidate
+        return None
+
+
+def _cache_key(day):
+    return f"hall_availability:{day.isoformat()}"
+
+
+def build_occupancy(day, hall_ids=None):
+    """
+    Read one day's occupying bookings from the database (one query),
+    of every hall or only of hall_ids.
+    """
+    bookings = HallBooking.objects.filter(
+        booking_date=day, booking_status__in=OCCUPYING_STATUSES
+    )
+    if hall_ids is not None:
+        bookings = bookings.filter(hall_id__in=hall_ids)
+    return DayOccupancy(
+        day, bookings.values_list("id", "hall_id", "start_time", "end_time")
+    )
+
+
+def occupancy(day, use_cache=True, hall_ids=None):
+    """
+    The index of day, from the cache or, with use_cache=False, from the
+    database (limited to hall_ids if given).
+    """
+    if not use_cache:
+        return build_occupancy(day, hall_ids)
+    key = _cache_key(day)
+    index = cache.get(key)
+    if index is None:
+        index = build_occupancy(day)
+        cache.set(key, index, CACHE_TIMEOUT)
+    return index
+
+
+def invalidate(*days):
+    """Forget the cached index of days once the current transaction commits."""
+    keys = [_cache_key(day) for day in days if day]
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def is_hall_free(
+    hall, day, start_time, end_time, exclude_booking=None, use_cache=True
+):
+    """
+    Whether hall (a Hall or its id) has no APPROVED or PENDING booking
+    overlapping start_time-end_time on day, not counting exclude_booking.
+    """
+    hall_id = getattr(hall, "pk", hall)
+    start, end = interval(start_time, end_time)
+    exclude = getattr(exclude_booking, "pk", exclude_booking)
+    index = occupancy(day, use_cache, hall_ids=[hall_id])
+    return index.is_free(hall_id, start, end, exclude)
+
+
+def free_halls(halls, day, start_time, end_time, use_cache=True):
+    """
+    The halls of halls (Hall instances, in order) free on day at that time.
+    """
+    halls = list(halls)
+    start, end = interval(start_time, end_time)
+    free_ids = set(
+        occupancy(day, use_cache).free_halls(
+            [hall.pk for hall in halls], start, end
+        )
+    )
+    return [hall for hall in halls if hall.pk in free_ids]
+
+
+def next_free_slot(hall, day, minutes, after=None, days=1):
+    """
+    The first free slot of minutes length for hall on day at or after
+    after (a time; start of day by default), looking at most days days
+    ahead. Returns (date, start_time, end_time) or None.
+    """
+    hall_id = getattr(hall, "pk", hall)
+    earliest = _minute(after) if after else 0
+    for offset in range(days):
+        current = day + timedelta(days=offset)
+        start = occupancy(current).free_slot(hall_id, minutes, after=earliest)
+        if start is not None:
+            return current, to_time(start), to_time(start + minutes)
+        earliest = 0
+    return None
+
+
+def _day_range(first_day, last_day):
+    return [
+        first_day + timedelta(days=offset)
+        for offset in range((last_day - first_day).days + 1)
+    ]
+
+
+def occupancy_range(first_day, last_day, hall_ids=None):
+    """
+    {date: DayOccupancy} for every day of first_day..last_day, read from
+    the database with one query over the (booking_date, hall) index, of
+    every hall or only of hall_ids.
+    """
+    bookings = HallBooking.objects.filter(
+        booking_date__range=(first_day, last_day),
+        booking_status__in=OCCUPYING_STATUSES,
+    )
+    if hall_ids is not None:
+        bookings = bookings.filter(hall_id__in=list(hall_ids))
+    by_day = defaultdict(list)
+    for booking_id, day, hall_id, start_time, end_time in bookings.values_list(
+        "id", "booking_date", "hall_id", "start_time", "end_time"
+    ):
+        by_day[day].append((booking_id, hall_id, start_time, end_time))
+    return {
+        day: DayOccupancy(day, by_day.get(day, ()))
+        for day in _day_range(first_day, last_day)
+    }
+
+
+def hall_calendar(hall_ids, first_day, last_day, opens=None, closes=None):
+    """
+    Busy and free intervals of each hall on each day of first_day..last_day.
+
+    Reads the range's bookings with one query (occupancy_range) and merges
+    them in memory. Free intervals lie between opens and closes (times;
+    the whole day by default). Returns
+    {hall_id: [{"date", "busy": [(start_time, end_time)], "free": [...]}]}
+    with a day entry for every date of the range.
+    """
+    hall_ids = list(hall_ids)
+    window = (
+        _minute(opens) if opens else 0,
+        _minute(closes) if closes else MINUTES_PER_DAY,
+    )
+    days = occupancy_range(first_day, last_day, hall_ids)
+
+    def as_times(spans):
+        return [(to_time(start), to_time(end)) for start, end in spans]
+
+    grid = {}
+    for hall_id in hall_ids:
+        grid[hall_id] = []
+        for day, index in days.items():
+            busy = merge_intervals(
+                (start, end)
+                for start, end, _ in index.bookings.get(hall_id, ())
+            )
+            grid[hall_id].append(
+                {
+                    "date": day,
+                    "busy": as_times(busy),
+                    "free": as_times(free_intervals(busy, *window)),
+                }
+            )
+    return grid
+
+
+def hall_calendar_etag(hall_ids, first_day, last_day, *params):
+    """
+    An ETag for hall_calendar() over the same halls and dates.
+
+    Built from the count and latest updated_at of the range's bookings in
+    any status (one aggregate query), so any booking created, changed or
+    deleted in the range gives a new tag; params (e.g. the opening hours)
+    are mixed in as given.
+    """
+    summary = HallBooking.objects.filter(
+        booking_date__range=(first_day, last_day), hall_id__in=list(hall_ids)
+    ).aggregate(count=Count("id"), latest=Max("updated_at"))
+    parts = [
+        ",".join(str(hall_id) for hall_id in sorted(hall_ids)),
+        first_day.isoformat(),
+        last_day.isoformat(),
+        str(summary["count"]),
+        summary["latest"].isoformat() if summary["latest"] else "",
+        *(str(param) for param in params),
+    ]
+    digest = hashlib.sha256("|".join(parts).encode()).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def lock_hall_days(pairs):
+    """
+    Lock the (hall_id, day) pairs until the current transaction ends.
+
+    Missing lock rows are created first. Rows are locked in one query in
+    a fixed order, so transactions locking overlapping sets cannot
+    deadlock each other.
+    """
+    pairs = sorted({(getattr(hall, "pk", hall), day) for hall, day in pairs})
+    if not pairs:
+        return
+    HallDayLock.objects.bulk_create(
+        [HallDayLock(hall_id=hall_id, day=day) for hall_id, day in pairs],
+        ignore_conflicts=True,
+    )
+    halls = {hall_id for hall_id, _ in pairs}
+    days = {day for _, day in pairs}
+    list(
+        HallDayLock.objects.select_for_update()
+        .filter(hall_id__in=halls, day__in=days)
+        .order_by("hall_id", "day")
+        .values_list("id", flat=True)
+    )
+
+
+def run_locked(pairs, func):
+    """
+    Run func() in a transaction holding the locks of pairs (see
+    lock_hall_days) and return its result.
+
+    If the database gives up waiting for a lock, the transaction is rolled
+    back and retried after an exponential, jittered delay, up to
+    HALL_LOCK_ATTEMPTS times. Inside an outer transaction there is nothing
+    to retry, so the error is raised at once.
+    """
+    pairs = list(pairs)
+    attempts = max(1, settings.HALL_LOCK_ATTEMPTS)
+    for attempt in range(1, attempts + 1):
+        try:
+            with transaction.atomic():
+                lock_hall_days(pairs)
+                return func()
+        except OperationalError:
+            if (
+                attempt == attempts
+                or transaction.get_connection().in_atomic_block
+            ):
+                raise
+            delay = settings.HALL_LOCK_RETRY_DELAY * 2 ** (attempt - 1)
+            clock.sleep(delay * random.uniform(0.5, 1.5))
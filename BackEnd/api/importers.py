@@ -0,0 +1,264 @@
+"""
+Streaming tabular imports for CertifyTrack.
+
+Attendance sheets, user rosters and mentee assignments are uploaded as CSV
+or XLSX files. RowReader reads them one row at a time (CSV is decoded
+incrementally, XLSX is opened in openpyxl's read-only mode), normalises the
+header names, validates every row against an ImportSchema and yields the
+clean rows, optionally in batches. Rows that fail validation never stop the
+import; they are collected as RowError objects on reader.errors.
+
+Row numbers are the ones a user sees in a spreadsheet: the header is row 1
+and the first data row is row 2.
+"""
+
+import csv
+import io
+from itertools import islice
+
+import openpyxl
+from django.conf import settings
+from django.core.exceptions import ValidationError
+
+CSV_EXTENSIONS = (".csv",)
+EXCEL_EXTENSIONS = (".xlsx", ".xls")
+
+
+class RowError(Exception):
+    """A row that could not be imported."""
+
+    def __init__(self, row, message, field=None):
+        super().__init__(message)
+        self.row = row
+        self.message = message
+        self.field = field
+
+    def __str__(self):
+        return f"Row {self.row}: {self.message}"
+
+    def as_dict(self):
+        return {"row": self.row, "field": self.field, "message": self.message}
+
+
+def normalise_header(name):
+    """'Student USN ' -> 'student_usn'; None (an unnamed column) -> ''."""
+    if name is None:
+        return ""
+    return "_".join(str(name).strip().lower().replace("-", " ").split())
+
+
+def _is_blank(value):
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+# ============================================================================
+# FIELD PARSERS
+# ============================================================================
+# A parser takes a non-blank cell value and returns the clean value, or
+# raises ValueError with the message to report for the row.
+
+
+def parse_str(value):
+    # XLSX cells holding whole numbers come back as floats (e.g. 1.0)
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def parse_int(value):
+    try:
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        return int(str(value).strip())
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid integer: {value}")
+
+
+def parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in {"1", "true", "yes", "y"}
+
+
+class ImportField:
+    """
+    One column of an import.
+
+    The value is taken from the first non-blank of name and aliases
+    (compared after header normalisation). A blank value becomes default,
+    or a row error if the field is required.
+    """
+
+    def __init__(
+        self, name, aliases=(), required=False, parse=parse_str, default=None
+    ):
+        self.name = name
+        self.keys = [name] + [normalise_header(alias) for alias in aliases]
+        self.required = required
+        self.parse = parse
+        self.default = default
+
+    def clean(self, raw):
+        for key in self.keys:
+            value = raw.get(key)
+            if not _is_blank(value):
+                return self.parse(value)
+        if self.required:
+            raise ValueError(f"Missing required field: {self.name}")
+        return self.default
+
+
+class ImportSchema:
+    """
+    The fields of an import plus optional whole-row validation.
+
+    validate receives the cleaned row dict and may raise ValueError or
+    return a modified dict.
+    """
+
+    def __init__(self, fields, validate=None):
+        self.fields = fields
+        self.validate = validate
+
+    def clean(self, row_number, raw):
+        data = {}
+        for field in self.fields:
+            try:
+                data[field.name] = field.clean(raw)
+            except ValueError as e:
+                raise RowError(row_number, str(e), field.name)
+        if self.validate is not None:
+            try:
+                data = self.validate(data) or data
+            except ValueError as e:
+                raise RowError(row_number, str(e))
+        return data
+
+
+# ============================================================================
+# SOURCES
+# ============================================================================
+
+
+def iter_csv_rows(file_obj):
+    """
+    Yield (row_number, row dict) from a binary CSV file, decoding as it reads.
+
+    A UTF-8 byte order mark (as written by Excel) is dropped.
+    """
+    text = io.TextIOWrapper(file_obj, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.reader(text)
+        try:
+            header = [normalise_header(name) for name in next(reader)]
+        except StopIteration:
+            return
+        for values in reader:
+            yield reader.line_num, dict(zip(header, values))
+    except UnicodeDecodeError:
+        raise ValidationError("Failed to parse CSV: file is not UTF-8 encoded")
+    except csv.Error as e:
+        raise ValidationError(f"Failed to parse CSV: {str(e)}")
+    finally:
+        # Leave the underlying upload open for the caller
+        text.detach()
+
+
+def iter_excel_rows(file_obj):
+    """Yield (row_number, row dict) from the active sheet of an XLSX file."""
+    try:
+        wb = openpyxl.load_workbook(file_obj, read_only=True, data_only=True)
+    except Exception as e:
+        raise ValidationError(f"Failed to parse Excel: {str(e)}")
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        try:
+            header = [normalise_header(name) for name in next(rows)]
+        except StopIteration:
+            return
+        for row_number, values in enumerate(rows, start=2):
+            yield row_number, dict(zip(header, values))
+    finally:
+        wb.close()
+
+
+def iter_file_rows(file_obj, filename):
+    """Yield (row_number, row dict) from a CSV or XLSX upload."""
+    filename = filename.lower()
+    if filename.endswith(CSV_EXTENSIONS):
+        return iter_csv_rows(file_obj)
+    if filename.endswith(EXCEL_EXTENSIONS):
+        return iter_excel_rows(file_obj)
+    raise ValidationError("Unsupported file type; only .csv and .xlsx allowed")
+
+
+def iter_record_rows(records):
+    """Yield (row_number, row dict) from already-decoded rows (e.g. JSON)."""
+    for row_number, record in enumerate(records, start=1):
+        if not isinstance(record, dict):
+            yield row_number, None
+            continue
+        yield (
+            row_number,
+            {normalise_header(key): value for key, value in record.items()},
+        )
+
+
+# ============================================================================
+# READER
+# ============================================================================
+
+
+class RowReader:
+    """
+    Validated rows of an import, read lazily.
+
+    Iterating yields (row_number, data) for every valid row; blank rows are
+    skipped and invalid rows are appended to errors as RowError. Without a
+    schema, data is the raw row with normalised headers.
+    """
+
+    def __init__(self, rows, schema=None, batch_size=None):
+        self._rows = rows
+        self.schema = schema
+        self.batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+        self.errors = []
+        self.row_count = 0
+
+    @classmethod
+    def from_file(cls, file_obj, filename, schema=None, batch_size=None):
+        return cls(iter_file_rows(file_obj, filename), schema, batch_size)
+
+    @classmethod
+    def from_records(cls, records, schema=None, batch_size=None):
+        return cls(iter_record_rows(records), schema, batch_size)
+
+    def __iter__(self):
+        for row_number, raw in self._rows:
+            if raw is None:
+                self.row_count += 1
+                self.errors.append(
+                    RowError(row_number, "Row is not an object")
+                )
+                continue
+            if all(_is_blank(value) for value in raw.values()):
+                continue
+            self.row_count += 1
+            if self.schema is None:
+                yield row_number, raw
+                continue
+            try:
+                data = self.schema.clean(row_number, raw)
+            except RowError as e:
+                self.errors.append(e)
+                continue
+            yield row_number, data
+
+    def batches(self):
+        """Yield lists of up to batch_size (row_number, data) pairs."""
+        rows = iter(self)
+        while True:
+            batch = list(islice(rows, self.batch_size))
+            if not batch:
+                return
+            yield batch
@@ -0,0 +1,402 @@
+"""
+Background jobs for CertifyTrack.
+
+Heavy event operations are stored as BackgroundJob rows and executed by
+`manage.py run_workers`, so HTTP requests only enqueue and return a job id.
+The database is the source of truth: a job is claimed with a conditional
+UPDATE (works the same on SQLite and PostgreSQL), failed jobs are retried
+with exponential backoff, and jobs left RUNNING by a dead worker are
+re-queued once their lock expires. A running job renews its lock every
+JOB_HEARTBEAT_SECONDS, so a long job is never mistaken for an abandoned
+one, and its outcome is only recorded while the worker still holds it.
+
+When REDIS_URL is set and the redis package is installed, new job ids are
+also pushed onto a Redis list so idle workers wake immediately instead of
+waiting for the next poll. Redis is only a wake-up hint; losing it never
+loses a job.
+"""
+
+import logging
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from datetime import timedelta
+from urllib.parse import urljoin
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils.timezone import now
+
+from .attendance_import import (
+    import_attendance,
+    read_attendance_file,
+    read_attendance_records,
+)
+from .certificate_pipeline import generate_event_certificates
+from .models import AuditLog, BackgroundJob, Event
+from .provisioning import provision_users, read_user_file
+
+logger = logging.getLogger(__name__)
+
+# job_type -> callable(job) returning a JSON-serialisable result
+JOB_HANDLERS = {}
+
+_redis_client = None
+
+
+def job_handler(job_type):
+    """Register a function as the handler for a job type."""
+
+    def decorator(func):
+        JOB_HANDLERS[job_type] = func
+        return func
+
+    return decorator
+
+
+def get_redis():
+    """Return a Redis client for the job queue, or None if not configured."""
+    global _redis_client
+    if not settings.REDIS_URL:
+        return None
+    if _redis_client is None:
+        try:
+            import redis
+        except ImportError:
+            return None
+        _redis_client = redis.Redis.from_url(settings.REDIS_URL)
+    return _redis_client
+
+
+def _notify_workers(job_id):
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        client.rpush(settings.JOB_QUEUE_KEY, job_id)
+    except Exception:
+        # Workers still find the job by polling the database
+        logger.warning("Error pushing job %s to Redis", job_id, exc_info=True)
+
+
+def enqueue(job_type, payload=None, user=None, event=None, max_attempts=None):
+    """Create a queued job and wake a worker once the transaction commits."""
+    if job_type not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job type: {job_type}")
+    job = BackgroundJob.objects.create(
+        job_type=job_type,
+        payload=payload or {},
+        created_by=user,
+        event=event,
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+    )
+    transaction.on_commit(lambda: _notify_workers(job.id))
+    return job
+
+
+def wait_for_job(timeout):
+    """
+    Block for up to timeout seconds until a job may be available.
+
+    Returns the job id pushed to Redis, or None after a plain poll interval.
+    """
+    client = get_redis()
+    if client is not None:
+        try:
+            item = client.blpop(
+                settings.JOB_QUEUE_KEY, timeout=max(1, int(timeout))
+            )
+            return int(item[1]) if item else None
+        except Exception:
+            logger.warning("Error waiting on Redis job queue", exc_info=True)
+    time.sleep(timeout)
+    return None
+
+
+def claim_job(worker_id, job_id=None):
+    """
+    Claim the next runnable job for worker_id, or None if there is none.
+
+    A job is ours only if the conditional UPDATE from QUEUED to RUNNING
+    changed exactly one row, so concurrent workers never run the same job.
+    """
+    candidates = BackgroundJob.objects.filter(
+        status="QUEUED", run_after__lte=now()
+    ).order_by("run_after", "id")
+    if job_id is not None:
+        candidates = candidates.filter(pk=job_id)
+
+    for candidate_id in candidates.values_list("id", flat=True)[:10]:
+        claimed = BackgroundJob.objects.filter(
+            pk=candidate_id, status="QUEUED"
+        ).update(
+            status="RUNNING",
+            locked_by=worker_id,
+            locked_at=now(),
+            attempts=F("attempts") + 1,
+        )
+        if claimed:
+            return BackgroundJob.objects.select_related(
+                "event", "created_by"
+            ).get(pk=candidate_id)
+    return None
+
+
+@contextmanager
+def heartbeat(job, interval=None):
+    """
+    Renew job's lock every interval seconds while the block runs, from a
+    thread of its own, until the lock is found to belong to someone else.
+    """
+    if interval is None:
+        interval = settings.JOB_HEARTBEAT_SECONDS
+    stop = threading.Event()
+
+    def beat():
+        try:
+            while not stop.wait(interval):
+                try:
+                    renewed = BackgroundJob.objects.filter(
+                        pk=job.pk, status="RUNNING", locked_by=job.locked_by
+                    ).update(locked_at=now())
+                except Exception:
+                    logger.warning(
+                        "Error renewing the lock of job %s",
+                        job.pk,
+                        exc_info=True,
+                    )
+                    continue
+                if not renewed:
+                    return
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=beat, daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def _record_outcome(job, worker_id, **fields):
+    """
+    Save the outcome of a run if worker_id still holds the job's lock.
+
+    A job whose lock was lost (re-queued as stale, perhaps running on
+    another worker) is left as it is and reloaded instead.
+    """
+    fields.update(locked_by="", locked_at=None, updated_at=now())
+    recorded = BackgroundJob.objects.filter(
+        pk=job.pk, status="RUNNING", locked_by=worker_id
+    ).update(**fields)
+    if recorded:
+        for name, value in fields.items():
+            setattr(job, name, value)
+    else:
+        job.refresh_from_db()
+    return job
+
+
+def run_job(job, backoff=None, heartbeat_interval=None):
+    """
+    Execute a claimed job and record its outcome.
+
+    ValidationError means the input is bad and is not retried; any other
+    exception re-queues the job after backoff * 2**(attempt - 1) seconds
+    until max_attempts is reached. The job's lock is renewed every
+    heartbeat_interval seconds while it runs.
+    """
+    if backoff is None:
+        backoff = settings.JOB_RETRY_BACKOFF_SECONDS
+    worker_id = job.locked_by
+
+    handler = JOB_HANDLERS.get(job.job_type)
+    try:
+        if handler is None:
+            raise ValidationError(f"Unknown job type: {job.job_type}")
+        with heartbeat(job, heartbeat_interval):
+            result = handler(job)
+    except Exception as e:
+        retryable = not isinstance(e, ValidationError)
+        if isinstance(e, ValidationError):
+            error = "; ".join(e.messages)
+        else:
+            error = traceback.format_exc()
+        if retryable and job.attempts < job.max_attempts:
+            return _record_outcome(
+                job,
+                worker_id,
+                status="QUEUED",
+                error=error,
+                run_after=now()
+                + timedelta(seconds=backoff * 2 ** (job.attempts - 1)),
+            )
+        return _record_outcome(
+            job, worker_id, status="FAILED", error=error, finished_at=now()
+        )
+
+    return _record_outcome(
+        job,
+        worker_id,
+        status="SUCCEEDED",
+        result=result,
+        error="",
+        finished_at=now(),
+    )
+
+
+def _delete_upload(path):
+    try:
+        default_storage.delete(path)
+    except Exception:
+        logger.warning("Error deleting upload %s", path, exc_info=True)
+
+
+def requeue_stale_jobs(lock_timeout=None):
+    """
+    Release jobs whose worker died mid-run (lock older than lock_timeout).
+
+    Jobs out of attempts are failed instead, and their uploaded files
+    (payload["file"]) deleted, as their handler never got to. Returns the
+    number of jobs re-queued.
+    """
+    if lock_timeout is None:
+        lock_timeout = settings.JOB_LOCK_TIMEOUT_SECONDS
+    stale = BackgroundJob.objects.filter(
+        status="RUNNING", locked_at__lt=now() - timedelta(seconds=lock_timeout)
+    )
+    with transaction.atomic():
+        exhausted = list(
+            stale.select_for_update()
+            .filter(attempts__gte=F("max_attempts"))
+            .values_list("id", "payload")
+        )
+        BackgroundJob.objects.filter(
+            id__in=[job_id for job_id, _ in exhausted]
+        ).update(
+            status="FAILED",
+            error="Worker stopped before the job finished.",
+            locked_by="",
+            locked_at=None,
+            finished_at=now(),
+        )
+        for _, payload in exhausted:
+            if payload.get("file"):
+                path = payload["file"]
+                transaction.on_commit(lambda path=path: _delete_upload(path))
+    return stale.update(
+        status="QUEUED", locked_by="", locked_at=None, run_after=now()
+    )
+
+
+# ============================================================================
+# JOB HANDLERS
+# ============================================================================
+
+
+@job_handler("generate_certificates")
+def generate_certificates_job(job):
+    """
+    Render certificates for job.event; payload may carry base_url for
+    email links.
+    """
+    base_url = job.payload.get("base_url", "")
+
+    def certificate_url(cert):
+        if not base_url or not cert.file:
+            return None
+        return urljoin(base_url, cert.file.url)
+
+    run = generate_event_certificates(
+        job.event, user=job.created_by, certificate_url=certificate_url
+    )
+    if job.created_by:
+        AuditLog.objects.create(
+            user=job.created_by,
+            action=(
+                f"Generated {run.done} certificates for event: "
+                f"{job.event.name}"
+            ),
+        )
+    return {
+        "run_id": run.id,
+        "certificate_count": run.done,
+        "errors": run.errors,
+    }
+
+
+@job_handler("upload_attendance")
+def upload_attendance_job(job):
+    """
+    Import an attendance sheet for job.event.
+
+    payload is either {"file": <storage path>, "filename": <original name>}
+    for an uploaded sheet, or {"attendance": [...]} for JSON rows.
+    """
+    payload = job.payload
+    file_path = payload.get("file")
+    # The upload is kept while a failed attempt can still be retried
+    finished = False
+    try:
+        event = Event.objects.get(pk=job.event_id)
+        if file_path:
+            # The sheet is streamed from storage while it is imported
+            with default_storage.open(file_path, "rb") as f:
+                rows = read_attendance_file(
+                    f, payload.get("filename", file_path)
+                )
+                result = import_attendance(event, rows, job.created_by)
+        else:
+            rows = read_attendance_records(payload.get("attendance", []))
+            result = import_attendance(event, rows, job.created_by)
+        finished = True
+    except ValidationError:
+        # Bad input will not improve on retry
+        finished = True
+        raise
+    finally:
+        if file_path and (finished or job.attempts >= job.max_attempts):
+            _delete_upload(file_path)
+    return result
+
+
+@job_handler("provision_users")
+def provision_users_job(job):
+    """
+    Create the accounts of an uploaded roster.
+
+    payload is {"file": <storage path>, "filename": <original name>}. The
+    result is provision_users()'s report, temporary passwords included;
+    /jobs/<id>/credentials/ serves them as CSV.
+    """
+    payload = job.payload
+    file_path = payload["file"]
+    # The upload is kept while a failed attempt can still be retried
+    finished = False
+    try:
+        with default_storage.open(file_path, "rb") as f:
+            rows = read_user_file(f, payload.get("filename", file_path))
+            result = provision_users(rows, job.created_by)
+        finished = True
+    except ValidationError:
+        # Bad input will not improve on retry
+        finished = True
+        raise
+    finally:
+        if finished or job.attempts >= job.max_attempts:
+            _delete_upload(file_path)
+    if job.created_by:
+        AuditLog.objects.create(
+            user=job.created_by,
+            action=(
+                f"Bulk imported {result['created_count']} users "
+                f"({len(result['errors'])} rows rejected)"
+            ),
+        )
+    return result
@@ -0,0 +1,357 @@
+"""
+Email outbox for CertifyTrack.
+
+Emails are normally not sent from request threads. enqueue() stores
+them as EmailOutbox rows in the caller's transaction (so an email is only
+sent if what it announces was saved, and is never lost with a recycled
+web worker); batched() turns a loop of single emails into one bulk
+insert.
+`manage.py deliver_emails` sends them:
+
+- A batch is claimed with a conditional UPDATE from QUEUED to SENDING,
+  so concurrent delivery processes never send the same email twice.
+- The batch goes out over one connection from get_connection(), opened
+  once, instead of one SMTP connection and TLS handshake per email.
+- EMAIL_RATE_LIMIT_PER_MINUTE caps sends to the provider with a
+  per-minute counter in the Django cache. The cap only holds across
+  processes (delivery processes, and web workers calling send_now) when
+  that cache is shared, i.e. Redis with REDIS_URL; with the local-memory
+  cache each process counts on its own (see rate_limit_is_shared).
+- A failed email is retried after EMAIL_RETRY_BACKOFF_SECONDS *
+  2**(attempt - 1) until its max_attempts, then marked FAILED.
+- A delivered email marks its Notification is_email_sent/email_sent_at.
+
+send_now() sends an email a user is waiting on (verification link,
+password reset code) from the request instead, falling back to the queue
+if that fails.
+
+email_metrics() reports queue depth, throughput and failures.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils.timezone import now
+
+from .models import EmailOutbox, Notification
+
+# Rows per INSERT when queueing many emails
+ENQUEUE_BATCH_SIZE = 500
+
+# Emails collected by batched(), per thread
+_batch = threading.local()
+
+
+def outbox_email(
+    to_email,
+    subject,
+    text,
+    html="",
+    user=None,
+    notification=None,
+    email_type="",
+):
+    """An unsaved EmailOutbox row; pass a list of them to enqueue()."""
+    return EmailOutbox(
+        to_email=to_email,
+        subject=subject[:255],
+        body_text=text,
+        body_html=html or "",
+        email_type=email_type,
+        user=user,
+        notification=notification,
+        max_attempts=settings.EMAIL_MAX_ATTEMPTS,
+    )
+
+
+def enqueue(emails):
+    """
+    Queue EmailOutbox rows for delivery. Returns the rows, saved unless
+    they are held by an enclosing batched() block.
+    """
+    emails = [email for email in emails if email.to_email]
+    if not emails:
+        return []
+    pending = getattr(_batch, "emails", None)
+    if pending is not None:
+        pending.extend(emails)
+        return emails
+    return EmailOutbox.objects.bulk_create(
+        emails, batch_size=ENQUEUE_BATCH_SIZE
+    )
+
+
+@contextmanager
+def batched():
+    """
+    Insert the emails queued inside the block together at its end, e.g.
+    around a loop sending one email per registered student.
+    """
+    if getattr(_batch, "emails", None) is not None:
+        yield
+        return
+    _batch.emails = []
+    try:
+        yield
+        emails = _batch.emails
+    finally:
+        _batch.emails = None
+    enqueue(emails)
+
+
+def provider():
+    """The mail provider deliveries are rate limited against."""
+    return settings.EMAIL_HOST or settings.EMAIL_BACKEND
+
+
+def _rate_key(window):
+    return f"mailer:rate:{provider()}:{window}"
+
+
+def rate_limit_is_shared():
+    """Whether the rate limit counter is seen by every process."""
+    backend = settings.CACHES["default"]["BACKEND"]
+    return not backend.endswith(("LocMemCache", "DummyCache"))
+
+
+def acquire_sends(wanted, limit=None):
+    """
+    Reserve up to wanted sends in the current minute under the provider's
+    limit. Returns (granted, seconds until the next minute, window); give
+    back the sends left unused with release_sends(unused, window).
+    """
+    if limit is None:
+        limit = settings.EMAIL_RATE_LIMIT_PER_MINUTE
+    current = time.time()
+    wait = 60 - current % 60
+    if limit <= 0 or wanted <= 0:
+        return wanted, wait, None
+    window = int(current // 60)
+    key = _rate_key(window)
+    cache.add(key, 0, 120)
+    try:
+        used = cache.incr(key, wanted)
+    except ValueError:
+        # Evicted between add() and incr()
+        cache.add(key, wanted, 120)
+        used = wanted
+    granted = max(0, min(wanted, limit - (used - wanted)))
+    if granted < wanted:
+        # Only what was granted counts against the limit
+        release_sends(wanted - granted, window)
+    return granted, wait, window
+
+
+def release_sends(count, window):
+    """Return count sends reserved by acquire_sends() for window."""
+    if count <= 0 or window is None:
+        return
+    try:
+        cache.decr(_rate_key(window), count)
+    except ValueError:
+        # The window's counter has expired
+        pass
+
+
+def claim_batch(worker_id, limit):
+    """Claim up to limit runnable emails for worker_id."""
+    if limit <= 0:
+        return []
+    candidate_ids = list(
+        EmailOutbox.objects.filter(status="QUEUED", run_after__lte=now())
+        .order_by("run_after", "id")
+        .values_list("id", flat=True)[:limit]
+    )
+    if not candidate_ids:
+        return []
+    EmailOutbox.objects.filter(id__in=candidate_ids, status="QUEUED").update(
+        status="SENDING",
+        locked_by=worker_id,
+        locked_at=now(),
+        attempts=F("attempts") + 1,
+    )
+    return list(
+        EmailOutbox.objects.filter(
+            id__in=candidate_ids, status="SENDING", locked_by=worker_id
+        ).order_by("id")
+    )
+
+
+def _message(email, connection):
+    message = EmailMultiAlternatives(
+        email.subject,
+        email.body_text,
+        settings.DEFAULT_FROM_EMAIL,
+        [email.to_email],
+        connection=connection,
+    )
+    if email.body_html:
+        message.attach_alternative(email.body_html, "text/html")
+    return message
+
+
+def send_batch(emails, backoff=None):
+    """
+    Send claimed emails over one connection and record the outcome of each.
+    Returns (sent, failed) counts; failed includes emails re-queued for retry.
+    """
+    if backoff is None:
+        backoff = settings.EMAIL_RETRY_BACKOFF_SECONDS
+    sent_ids = []
+    failures = []  # (email, error)
+
+    try:
+        connection = get_connection(fail_silently=False)
+        connection.open()
+    except Exception as e:
+        failures = [(email, e) for email in emails]
+    else:
+        try:
+            for email in emails:
+                try:
+                    connection.send_messages([_message(email, connection)])
+                    sent_ids.append(email.id)
+                except Exception as e:
+                    failures.append((email, e))
+        finally:
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+    sent_at = now()
+    with transaction.atomic():
+        if sent_ids:
+            EmailOutbox.objects.filter(id__in=sent_ids).update(
+                status="SENT",
+                sent_at=sent_at,
+                locked_by="",
+                locked_at=None,
+                last_error="",
+            )
+            Notification.objects.filter(emails__id__in=sent_ids).update(
+                is_email_sent=True, email_sent_at=sent_at
+            )
+        for email, error in failures:
+            email.last_error = f"{type(error).__name__}: {error}"
+            email.locked_by = ""
+            email.locked_at = None
+            if email.attempts < email.max_attempts:
+                email.status = "QUEUED"
+                email.run_after = sent_at + timedelta(
+                    seconds=backoff * 2 ** (email.attempts - 1)
+                )
+            else:
+                email.status = "FAILED"
+            email.save(
+                update_fields=[
+                    "status",
+                    "run_after",
+                    "locked_by",
+                    "locked_at",
+                    "last_error",
+                ]
+            )
+    return len(sent_ids), len(failures)
+
+
+def send_now(email):
+    """
+    Send an EmailOutbox row someone is waiting on (a verification link, a
+    password reset code) straight away instead of queueing it.
+
+    The row is recorded as SENDING first, so a failed send, or one over
+    the rate limit, is left QUEUED for deliver_emails to retry. Returns
+    True if the email was sent.
+    """
+    if not email.to_email:
+        return False
+    granted, _, _ = acquire_sends(1)
+    if not granted:
+        enqueue([email])
+        return False
+    email.status = "SENDING"
+    email.locked_by = "direct"
+    email.locked_at = now()
+    email.attempts = 1
+    email.save()
+    sent, _ = send_batch([email])
+    return bool(sent)
+
+
+def deliver(worker_id, batch_size=None, backoff=None):
+    """
+    Claim and send one batch within the provider's rate limit.
+
+    Returns (sent, failed, wait): wait is the seconds to pause before the
+    next batch when the rate limit is used up, else 0.
+    """
+    if batch_size is None:
+        batch_size = settings.EMAIL_BATCH_SIZE
+    runnable = EmailOutbox.objects.filter(
+        status="QUEUED", run_after__lte=now()
+    ).count()
+    if not runnable:
+        return 0, 0, 0
+    granted, wait, window = acquire_sends(min(batch_size, runnable))
+    if not granted:
+        return 0, 0, wait
+    emails = claim_batch(worker_id, granted)
+    # Other processes may have claimed some of the runnable emails
+    release_sends(granted - len(emails), window)
+    if not emails:
+        return 0, 0, 0
+    sent, failed = send_batch(emails, backoff)
+    return sent, failed, 0
+
+
+def requeue_stale_emails(lock_timeout=None):
+    """
+    Release emails whose delivery process died mid-batch. They may have
+    been sent already; at-least-once delivery is preferred to losing them.
+    Returns the number of emails re-queued.
+    """
+    if lock_timeout is None:
+        lock_timeout = settings.EMAIL_LOCK_TIMEOUT_SECONDS
+    return EmailOutbox.objects.filter(
+        status="SENDING", locked_at__lt=now() - timedelta(seconds=lock_timeout)
+    ).update(status="QUEUED", locked_by="", locked_at=None, run_after=now())
+
+
+def email_metrics(window_minutes=60):
+    """
+    Outbox counts by status, and sends, failures and throughput (emails per
+    minute) over the last window_minutes.
+    """
+    since = now() - timedelta(minutes=window_minutes)
+    counts = EmailOutbox.objects.aggregate(
+        queued=Count("id", filter=Q(status="QUEUED")),
+        sending=Count("id", filter=Q(status="SENDING")),
+        sent=Count("id", filter=Q(status="SENT")),
+        failed=Count("id", filter=Q(status="FAILED")),
+        retrying=Count("id", filter=Q(status="QUEUED", attempts__gt=0)),
+        sent_recently=Count("id", filter=Q(status="SENT", sent_at__gte=since)),
+    )
+    by_type = {
+        row["email_type"] or "other": row["count"]
+        for row in EmailOutbox.objects.filter(status="FAILED")
+        .values("email_type")
+        .annotate(count=Count("id"))
+        .order_by()
+    }
+    sent_recently = counts.pop("sent_recently")
+    return {
+        "outbox": counts,
+        "window_minutes": window_minutes,
+        "sent_in_window": sent_recently,
+        "per_minute": round(sent_recently / window_minutes, 2),
+        "failed_by_type": by_type,
+        "rate_limit_per_minute": settings.EMAIL_RATE_LIMIT_PER_MINUTE,
+    }
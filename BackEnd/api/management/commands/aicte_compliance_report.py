@@ -1,8 +1,172 @@
-from django.core.management.base import BaseCommand
-from django.db.models import Sum, Count, Q
-from api.models import Student, AICTEPointTransaction, AICTECategory, Event
+"""
+Management command to generate the AICTE compliance report.
+Run with: python manage.py aicte_compliance_report [--format csv|jsonl|parquet]
+
+The report comes from a single grouped query: students left-joined to
+their AICTE transactions and grouped by student and category, with the
+per-status points and counts as conditional aggregates. Rows are read
+with a server-side iterator and written one student at a time, so memory
+stays flat however many students are reported.
+"""
 import csv
-import datetime
+import json
+from itertools import groupby
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, Q, Sum
+
+from api.models import Student
+
+FIELDNAMES = [
+    'usn', 'name', 'department', 'semester', 'admission_type',
+    'current_points', 'required_points', 'points_needed', 'is_completed',
+    'approved_transactions', 'pending_transactions', 'rejected_transactions',
+    'categories_participated', 'top_categories',
+]
+
+ADMISSION_TYPES = dict(Student.ADMISSION_TYPE_CHOICES)
+
+# Points required by admission type (see Student.required_aicte_points)
+REQUIRED_POINTS = {'regular': 100, 'lateral': 75}
+
+
+def _status_filter(status):
+    return Q(aicte_transactions__status=status)
+
+
+def report_rows(students, chunk_size):
+    """
+    Yield one report row per student of the students queryset.
+
+    Students without transactions come back from the LEFT JOIN as a
+    single row with no category and zero totals.
+    """
+    grouped = (
+        students.values(
+            'id', 'usn', 'department', 'semester', 'admission_type',
+            'user__first_name', 'user__last_name', 'user__username',
+            'aicte_transactions__category__name',
+        )
+        .annotate(
+            approved_points=Sum(
+                'aicte_transactions__points_allocated', filter=_status_filter('APPROVED')
+            ),
+            approved=Count('aicte_transactions', filter=_status_filter('APPROVED')),
+            pending=Count('aicte_transactions', filter=_status_filter('PENDING')),
+            rejected=Count('aicte_transactions', filter=_status_filter('REJECTED')),
+        )
+        .order_by('usn', 'id', 'aicte_transactions__category__name')
+    )
+
+    rows = grouped.iterator(chunk_size=chunk_size)
+    for _, categories in groupby(rows, key=lambda row: row['id']):
+        categories = list(categories)
+        student = categories[0]
+
+        category_points = {
+            row['aicte_transactions__category__name']: row['approved_points']
+            for row in categories
+            if row['approved_points']
+        }
+        total_points = sum(category_points.values())
+        required_points = REQUIRED_POINTS.get(student['admission_type'], 75)
+        name = f"{student['user__first_name']} {student['user__last_name']}".strip()
+
+        yield {
+            'usn': student['usn'],
+            'name': name or student['user__username'],
+            'department': student['department'],
+            'semester': student['semester'],
+            'admission_type': ADMISSION_TYPES.get(
+                student['admission_type'], student['admission_type']
+            ),
+            'admission_key': student['admission_type'],
+            'current_points': total_points,
+            'required_points': required_points,
+            'points_needed': max(0, required_points - total_points),
+            'is_completed': total_points >= required_points,
+            'approved_transactions': sum(row['approved'] for row in categories),
+            'pending_transactions': sum(row['pending'] for row in categories),
+            'rejected_transactions': sum(row['rejected'] for row in categories),
+            'categories_participated': len(category_points),
+            'top_categories': ', '.join([
+                f'{cat}: {pts} pts'
+                for cat, pts in sorted(
+                    category_points.items(), key=lambda x: x[1], reverse=True
+                )[:3]
+            ]),
+        }
+
+
+class CSVReportWriter:
+    def __init__(self, path):
+        self.file = open(path, 'w', newline='', encoding='utf-8')
+        self.writer = csv.DictWriter(self.file, fieldnames=FIELDNAMES, extrasaction='ignore')
+        self.writer.writeheader()
+
+    def write(self, row):
+        self.writer.writerow({**row, 'is_completed': 'Yes' if row['is_completed'] else 'No'})
+
+    def close(self):
+        self.file.close()
+
+
+class JSONLReportWriter:
+    def __init__(self, path):
+        self.file = open(path, 'w', encoding='utf-8')
+
+    def write(self, row):
+        self.file.write(json.dumps({field: row[field] for field in FIELDNAMES}))
+        self.file.write('\n')
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetReportWriter:
+    """Writes a row group every batch_size students (requires pyarrow)."""
+
+    def __init__(self, path, batch_size):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise CommandError('Parquet output requires pyarrow (pip install pyarrow)')
+        self.pa = pa
+        self.schema = pa.schema([
+            ('usn', pa.string()),
+            ('name', pa.string()),
+            ('department', pa.string()),
+            ('semester', pa.int32()),
+            ('admission_type', pa.string()),
+            ('current_points', pa.int32()),
+            ('required_points', pa.int32()),
+            ('points_needed', pa.int32()),
+            ('is_completed', pa.bool_()),
+            ('approved_transactions', pa.int32()),
+            ('pending_transactions', pa.int32()),
+            ('rejected_transactions', pa.int32()),
+            ('categories_participated', pa.int32()),
+            ('top_categories', pa.string()),
+        ])
+        self.writer = pq.ParquetWriter(path, self.schema)
+        self.batch_size = batch_size
+        self.batch = []
+
+    def write(self, row):
+        self.batch.append(row)
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.batch:
+            columns = {field: [row[field] for row in self.batch] for field in FIELDNAMES}
+            self.writer.write_table(self.pa.Table.from_pydict(columns, schema=self.schema))
+            self.batch = []
+
+    def close(self):
+        self.flush()
+        self.writer.close()
 
 
 class Command(BaseCommand):
@@ -12,8 +176,13 @@ class Command(BaseCommand):
         parser.add_argument(
             '--output',
             type=str,
-            help='Output CSV file path (default: aicte_compliance_report.csv)',
-            default='aicte_compliance_report.csv'
+            help='Output file path (default: aicte_compliance_report.<format>)',
+        )
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'jsonl', 'parquet'],
+            default='csv',
+            help='Output format (default: csv; parquet requires pyarrow)',
         )
         parser.add_argument(
             '--department',
@@ -25,126 +194,64 @@ class Command(BaseCommand):
             type=int,
             help='Filter by semester'
         )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Rows fetched from the database per round trip (default: 2000)',
+        )
 
     def handle(self, *args, **options):
-        output_file = options['output']
+        output_format = options['format']
+        output_file = options['output'] or f'aicte_compliance_report.{output_format}'
         department_filter = options.get('department')
         semester_filter = options.get('semester')
+        chunk_size = max(1, options['chunk_size'])
 
         # Query students based on filters
-        students_query = Student.objects.all()
+        students = Student.objects.all()
 
         if department_filter:
-            students_query = students_query.filter(department=department_filter)
+            students = students.filter(department=department_filter)
         if semester_filter:
-            students_query = students_query.filter(semester=semester_filter)
+            students = students.filter(semester=semester_filter)
 
-        students = students_query.order_by('usn')
+        if output_format == 'parquet':
+            writer = ParquetReportWriter(output_file, chunk_size)
+        elif output_format == 'jsonl':
+            writer = JSONLReportWriter(output_file)
+        else:
+            writer = CSVReportWriter(output_file)
 
-        # Prepare report data
-        report_data = []
-        total_students = students.count()
-        regular_students = students.filter(admission_type='regular').count()
-        lateral_students = students.filter(admission_type='lateral').count()
+        self.stdout.write('Generating AICTE compliance report...')
 
-        self.stdout.write(f'Generating AICTE compliance report for {total_students} students...')
-
-        # Calculate summary statistics
-        compliance_stats = {
-            'regular_completed': 0,
-            'regular_pending': 0,
-            'lateral_completed': 0,
-            'lateral_pending': 0
-        }
+        # Summary statistics, counted while the rows stream past
+        totals = {'regular': 0, 'lateral': 0}
+        completed = {'regular': 0, 'lateral': 0}
+        try:
+            for row in report_rows(students, chunk_size):
+                writer.write(row)
+                admission = 'regular' if row['admission_key'] == 'regular' else 'lateral'
+                totals[admission] += 1
+                if row['is_completed']:
+                    completed[admission] += 1
+        finally:
+            writer.close()
 
-        for student in students:
-            total_points = student.total_aicte_points
-            required_points = student.required_aicte_points
-            is_completed = student.is_aicte_completed
-
-            # Count approved and pending transactions
-            approved_tx = AICTEPointTransaction.objects.filter(
-                student=student, status='APPROVED'
-            ).aggregate(total_points=Sum('points_allocated'))['total_points'] or 0
-
-            pending_tx = AICTEPointTransaction.objects.filter(
-                student=student, status='PENDING'
-            ).count()
-
-            rejected_tx = AICTEPointTransaction.objects.filter(
-                student=student, status='REJECTED'
-            ).count()
-
-            # Get category breakdown
-            category_breakdown = {}
-            for tx in AICTEPointTransaction.objects.filter(
-                student=student, status='APPROVED'
-            ).select_related('category'):
-                category_name = tx.category.name
-                if category_name not in category_breakdown:
-                    category_breakdown[category_name] = 0
-                category_breakdown[category_name] += tx.points_allocated
-
-            # Update compliance stats
-            if student.admission_type == 'regular':
-                if is_completed:
-                    compliance_stats['regular_completed'] += 1
-                else:
-                    compliance_stats['regular_pending'] += 1
-            else:  # lateral
-                if is_completed:
-                    compliance_stats['lateral_completed'] += 1
-                else:
-                    compliance_stats['lateral_pending'] += 1
-
-            report_data.append({
-                'usn': student.usn,
-                'name': student.user.get_full_name() or student.user.username,
-                'department': student.department,
-                'semester': student.semester,
-                'admission_type': student.get_admission_type_display(),
-                'current_points': total_points,
-                'required_points': required_points,
-                'points_needed': max(0, required_points - total_points),
-                'is_completed': 'Yes' if is_completed else 'No',
-                'approved_transactions': approved_tx,
-                'pending_transactions': pending_tx,
-                'rejected_transactions': rejected_tx,
-                'categories_participated': len(category_breakdown),
-                'top_categories': ', '.join([
-                    f'{cat}: {pts} pts'
-                    for cat, pts in sorted(category_breakdown.items(), key=lambda x: x[1], reverse=True)[:3]
-                ])
-            })
-
-        # Write CSV report
-        fieldnames = [
-            'usn', 'name', 'department', 'semester', 'admission_type',
-            'current_points', 'required_points', 'points_needed', 'is_completed',
-            'approved_transactions', 'pending_transactions', 'rejected_transactions',
-            'categories_participated', 'top_categories'
-        ]
-
-        with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-
-            for row in report_data:
-                writer.writerow(row)
+        total_students = totals['regular'] + totals['lateral']
 
         # Print summary
         self.stdout.write(self.style.SUCCESS(f'AICTE Compliance Report Summary:'))
         self.stdout.write(f'Total Students: {total_students}')
-        self.stdout.write(f'Regular Students: {regular_students} (Req: 100 points)')
-        self.stdout.write(f'  - Completed: {compliance_stats["regular_completed"]}')
-        self.stdout.write(f'  - Pending: {compliance_stats["regular_pending"]}')
-        self.stdout.write(f'Lateral Entry Students: {lateral_students} (Req: 75 points)')
-        self.stdout.write(f'  - Completed: {compliance_stats["lateral_completed"]}')
-        self.stdout.write(f'  - Pending: {compliance_stats["lateral_pending"]}')
+        self.stdout.write(f'Regular Students: {totals["regular"]} (Req: 100 points)')
+        self.stdout.write(f'  - Completed: {completed["regular"]}')
+        self.stdout.write(f'  - Pending: {totals["regular"] - completed["regular"]}')
+        self.stdout.write(f'Lateral Entry Students: {totals["lateral"]} (Req: 75 points)')
+        self.stdout.write(f'  - Completed: {completed["lateral"]}')
+        self.stdout.write(f'  - Pending: {totals["lateral"] - completed["lateral"]}')
 
         overall_completion = (
-            (compliance_stats["regular_completed"] + compliance_stats["lateral_completed"])
-            / total_students * 100
+            (completed['regular'] + completed['lateral']) / total_students * 100
         ) if total_students > 0 else 0
 
         self.stdout.write(f'Overall Completion Rate: {overall_completion:.1f}%')
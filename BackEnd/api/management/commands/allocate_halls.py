@@ -0,0 +1,102 @@
+"""
+Management command to allocate halls to scheduled events in a date range.
+Run with: python manage.py allocate_halls [--start YYYY-MM-DD] [--days 7]
+    [--user USERNAME] [--dry-run]
+
+Places every scheduled event of the range that needs a hall and has none
+(see api.hall_allocation), books the halls and reports the events that
+could not be placed, with suggestions.
+"""
+
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from api.hall_allocation import run_allocation
+
+
+class Command(BaseCommand):
+    help = 'Allocate halls to scheduled events without one'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--start',
+            help='First day of the range, YYYY-MM-DD (default: today)',
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=7,
+            help='Number of days in the range (default: 7)',
+        )
+        parser.add_argument(
+            '--user',
+            help=(
+                'Username to book and approve halls as '
+                '(default: each event\'s creator)'
+            ),
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show the allocation without booking any hall',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            first_day = (
+                datetime.strptime(options['start'], '%Y-%m-%d').date()
+                if options['start']
+                else timezone.localdate()
+            )
+        except ValueError:
+            raise CommandError('--start must be YYYY-MM-DD')
+        if options['days'] < 1:
+            raise CommandError('--days must be at least 1')
+        last_day = first_day + timedelta(days=options['days'] - 1)
+
+        user = None
+        if options['user']:
+            User = get_user_model()
+            try:
+                user = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f"User '{options['user']}' not found")
+
+        dry_run = options['dry_run']
+        allocation = run_allocation(first_day, last_day, user, dry_run=dry_run)
+
+        self.stdout.write(f'Hall allocation for {first_day} to {last_day}')
+        if dry_run:
+            self.stdout.write('DRY RUN - No halls will be booked')
+        report = allocation.as_dict()
+        for row in report['assigned']:
+            self.stdout.write(
+                f"  {row['date']} {row['event_name']} -> {row['hall_name']} "
+                f"({row['preference']})"
+            )
+        for conflict in report['conflicts']:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"  {conflict['date']} {conflict['event_name']}: "
+                    f"{conflict['message']}"
+                )
+            )
+            for suggestion in conflict['suggestions']:
+                self.stdout.write(
+                    f"      try {suggestion['hall_name']} "
+                    f"on {suggestion['date']} "
+                    f"{suggestion['start_time']:%H:%M}-{suggestion['end_time']:%H:%M}"
+                )
+
+        verb = 'would be assigned' if dry_run else 'assigned'
+        summary = (
+            f"{len(report['assigned'])} events {verb}, "
+            f"{len(report['conflicts'])} conflicts"
+        )
+        if report['conflicts']:
+            self.stdout.write(self.style.WARNING(summary))
+        else:
+            self.stdout.write(self.style.SUCCESS(summary))
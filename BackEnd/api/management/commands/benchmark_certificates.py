@@ -0,0 +1,193 @@
+"""
+Management command to benchmark certificate rendering.
+Run with: python manage.py benchmark_certificates [--count 50]
+
+Compares the legacy path (QR PNG written to a temp file, read back and
+deleted) against the current path (layout and images prepared once per
+process by the compiled-template cache; QR drawn in memory as vectors).
+Both compress the background and signatures into every PDF.
+No database access; certificates are rendered and discarded.
+"""
+
+import os
+import time
+from io import BytesIO
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+
+from api.certificate_generator import CertificateGenerator
+
+
+def render_legacy(
+    prepared,
+    readers,
+    student_name,
+    event_name,
+    club_name,
+    date,
+    usn,
+    points,
+    qr_text,
+):
+    """
+    Render a certificate with per-PDF image encoding and a temp-file QR
+    code.
+    """
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=landscape(A4))
+    c.drawImage(
+        readers['background'],
+        0,
+        0,
+        width=prepared.page_width,
+        height=prepared.page_height,
+    )
+
+    layout = prepared.text_layout
+    prepared.draw_text(c, student_name, layout['student_name'])
+    prepared.draw_text(c, event_name, layout['event_name'])
+    prepared.draw_text(c, club_name, layout['club_name'])
+    prepared.draw_text(c, date, layout['date'])
+    prepared.draw_text(c, usn, layout['usn'])
+    if prepared.template_type == 'certificate_aicte':
+        prepared.draw_text(c, str(points), layout['points'])
+
+    qr_image = prepared.generate_qr_code(qr_text)
+    qr_path = os.path.join(prepared.template_dir, 'qr_temp.png')
+    qr_image.save(qr_path)
+    prepared.draw_image(c, qr_path, prepared.qr_layout)
+
+    for key, meta in (
+        ('faculty', prepared.faculty_layout),
+        ('principal', prepared.principal_layout),
+    ):
+        if readers[key] is not None:
+            c.drawImage(
+                readers[key],
+                meta['x'],
+                meta['y'],
+                width=meta['width'],
+                height=meta['height'],
+                preserveAspectRatio=True,
+                mask='auto',
+            )
+
+    if os.path.exists(qr_path):
+        os.remove(qr_path)
+
+    c.showPage()
+    c.save()
+    buffer.seek(0)
+    return buffer
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark per-certificate render time '
+        '(legacy path vs compiled template)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--count',
+            type=int,
+            default=50,
+            help='Number of certificates to render per variant (default: 50)',
+        )
+        parser.add_argument(
+            '--faculty-signature',
+            default='',
+            help='Path to a faculty signature image to include',
+        )
+        parser.add_argument(
+            '--principal-signature',
+            default='',
+            help='Path to a principal signature image to include',
+        )
+        parser.add_argument(
+            '--template',
+            choices=['certificate_aicte', 'certificate_regular'],
+            default='certificate_aicte',
+            help='Template to render (default: certificate_aicte)',
+        )
+
+    def handle(self, *args, **options):
+        count = max(1, options['count'])
+        template_type = options['template']
+
+        template_dir = os.path.join(
+            settings.MEDIA_ROOT, 'certificates', 'templates'
+        )
+        template_path = os.path.join(template_dir, f'{template_type}.png')
+        metadata_path = os.path.join(template_dir, f'{template_type}.json')
+        if not os.path.exists(template_path) or not os.path.exists(
+            metadata_path
+        ):
+            raise CommandError(
+                'Certificate template or metadata file not found: '
+                f'{template_type}'
+            )
+
+        faculty_signature = options['faculty_signature']
+        principal_signature = options['principal_signature']
+        prepared = CertificateGenerator(template_path, metadata_path).prepare(
+            template_type, faculty_signature, principal_signature
+        )
+        readers = {
+            'background': ImageReader(template_path),
+            'faculty': ImageReader(faculty_signature)
+            if faculty_signature
+            else None,
+            'principal': ImageReader(principal_signature)
+            if principal_signature
+            else None,
+        }
+
+        def fields(i):
+            return {
+                'student_name': f'Benchmark Student {i}',
+                'event_name': 'Benchmark Event',
+                'club_name': 'Benchmark Club',
+                'date': '01 Jan 2025',
+                'usn': f'1XX22CS{i:03d}',
+                'points': 5,
+                'qr_text': (
+                    f'Certificate ID: {i}, Student: 1XX22CS{i:03d}, '
+                    'Event: Benchmark Event, Verification Code: ABCD1234'
+                ),
+            }
+
+        # Warm up fonts and the image cache outside the timed loops
+        render_legacy(prepared, readers, **fields(0))
+        prepared.render(**fields(0))
+
+        variants = [
+            (
+                'legacy',
+                lambda i: render_legacy(prepared, readers, **fields(i)),
+            ),
+            ('compiled template', lambda i: prepared.render(**fields(i))),
+        ]
+        timings = {}
+        for label, render in variants:
+            start = time.perf_counter()
+            size = 0
+            for i in range(1, count + 1):
+                size += len(render(i).getvalue())
+            elapsed = time.perf_counter() - start
+            timings[label] = elapsed
+            self.stdout.write(
+                f'{label:<24} {elapsed / count * 1000:8.1f} ms/certificate  '
+                f'{size / count / 1024:8.1f} KiB/certificate'
+            )
+
+        legacy, current = timings.values()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Speedup: {legacy / current:.2f}x over {count} certificates'
+            )
+        )
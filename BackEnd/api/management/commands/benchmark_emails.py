@@ -0,0 +1,203 @@
+"""
+Management command to benchmark queueing mass emails.
+Run with: python manage.py benchmark_emails [--recipients 1000] [--repeat 3]
+
+For an event cancellation and an event reminder to every registered
+student, compares rendering each email and queueing it on its own (one
+INSERT per email) with send_bulk_emails (one INSERT for all). Synthetic
+users and the queued emails are created inside a transaction that is
+rolled back; nothing is kept.
+"""
+
+import io
+import time
+from contextlib import redirect_stdout
+from datetime import date
+from datetime import time as clock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.email_utils import (
+    get_event_cancellation_email_html,
+    get_event_cancellation_email_text,
+    get_event_reminder_email_html,
+    get_event_reminder_email_text,
+    send_bulk_emails,
+    send_notification_email,
+)
+from api.models import Club, EmailOutbox, Event
+
+User = get_user_model()
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark mass email queueing '
+        '(one INSERT per email vs send_bulk_emails)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--recipients',
+            type=int,
+            default=1000,
+            help='Recipients per send (default: 1000)',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='Runs per variant, best is reported (default: 3)',
+        )
+
+    def handle(self, *args, **options):
+        recipient_count = max(1, options['recipients'])
+        self.repeat = max(1, options['repeat'])
+        try:
+            with transaction.atomic():
+                users = User.objects.bulk_create(
+                    User(
+                        username=f'benchmark-email-{i}',
+                        email=f'benchmark-email-{i}@example.com',
+                        first_name='Student',
+                        last_name=str(i),
+                    )
+                    for i in range(recipient_count)
+                )
+                club = Club.objects.create(name='Benchmark emails')
+                event = Event.objects.create(
+                    club=club,
+                    name='Benchmark',
+                    event_date=date(2099, 1, 1),
+                    start_time=clock(9),
+                )
+                self.benchmark(users, event)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def benchmark(self, users, event):
+        names = [user.get_full_name() or user.username for user in users]
+        event_date = event.event_date.strftime('%A, %B %d, %Y')
+        event_time = event.start_time.strftime('%I:%M %p')
+        cancellation = {
+            'event_name': event.name,
+            'event_date': event_date,
+            'club_name': event.club.name,
+            'reason': 'The speaker is unavailable',
+            'frontend_url': settings.FRONTEND_URL,
+        }
+        reminder = {
+            'event_name': event.name,
+            'event_date': event_date,
+            'event_time': event_time,
+            'club_name': event.club.name,
+            'venue': None,
+            'starts_in': '24 hours',
+            'frontend_url': settings.FRONTEND_URL,
+        }
+        sends = [
+            (
+                'Event cancellation',
+                'event_cancellation',
+                cancellation,
+                lambda name: (
+                    get_event_cancellation_email_html(
+                        name,
+                        event.name,
+                        event_date,
+                        event.club.name,
+                        cancellation['reason'],
+                        settings.FRONTEND_URL,
+                    ),
+                    get_event_cancellation_email_text(
+                        name,
+                        event.name,
+                        event_date,
+                        event.club.name,
+                        cancellation['reason'],
+                    ),
+                ),
+            ),
+            (
+                'Event reminder',
+                'event_reminder',
+                reminder,
+                lambda name: (
+                    get_event_reminder_email_html(
+                        name,
+                        event.name,
+                        event_date,
+                        event_time,
+                        event.club.name,
+                        None,
+                        '24 hours',
+                        settings.FRONTEND_URL,
+                    ),
+                    get_event_reminder_email_text(
+                        name,
+                        event.name,
+                        event_date,
+                        event_time,
+                        event.club.name,
+                        None,
+                        '24 hours',
+                    ),
+                ),
+            ),
+        ]
+
+        for label, email_type, context, build in sends:
+            self.stdout.write(f'{label} ({len(users)} recipients)')
+
+            def queue_each():
+                for user, name in zip(users, names):
+                    html, text = build(name)
+                    send_notification_email(
+                        user, label, html, text, email_type=email_type
+                    )
+
+            queue = self.time_variants(
+                [
+                    ('one INSERT each', queue_each),
+                    (
+                        'send_bulk_emails',
+                        lambda: send_bulk_emails(
+                            email_type, context, [(user, {}) for user in users]
+                        ),
+                    ),
+                ],
+                'render and queue',
+            )
+            self.report_speedup(queue, 'one INSERT each', 'send_bulk_emails')
+
+    def time_variants(self, variants, what):
+        timings = {}
+        for label, run in variants:
+            best = None
+            for _ in range(self.repeat):
+                # The email helpers print a line per email queued
+                with transaction.atomic(), redirect_stdout(io.StringIO()):
+                    start = time.perf_counter()
+                    run()
+                    elapsed = time.perf_counter() - start
+                    EmailOutbox.objects.all().delete()
+                best = elapsed if best is None else min(best, elapsed)
+            timings[label] = best
+            self.stdout.write(f'  {what}: {label:<28} {best * 1000:9.1f} ms')
+        return timings
+
+    def report_speedup(self, timings, legacy, current):
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'  Speedup: {timings[legacy] / timings[current]:.1f}x '
+                f'({current} vs {legacy})'
+            )
+        )
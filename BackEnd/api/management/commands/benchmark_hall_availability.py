@@ -0,0 +1,235 @@
+"""
+Management command to benchmark hall availability checks.
+Run with: python manage.py benchmark_hall_availability [--halls 40]
+    [--bookings 2000] [--queries 500]
+
+Compares the legacy queries (a per-check Python loop over the hall's
+bookings, an .exists() overlap query per hall, and the exclude query of
+the available-halls endpoint) against the per-day bitmap index of
+api.hall_availability, built fresh from the database (as write paths use
+it) and read from the cache (as the read endpoints do).
+Synthetic halls and bookings are created inside a transaction that is
+rolled back; nothing is kept.
+"""
+
+import random
+import time
+from datetime import date, timedelta
+from datetime import time as clock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api import hall_availability
+from api.models import Club, Event, Hall, HallBooking
+
+User = get_user_model()
+
+
+def legacy_has_conflict(hall, booking_date, start_time, end_time):
+    """HallBookingViewSet._has_conflict before the availability index."""
+    qs = HallBooking.objects.filter(hall=hall, booking_date=booking_date)
+    qs = qs.filter(booking_status__in=['PENDING', 'APPROVED'])
+    for b in qs:
+        if b.start_time <= end_time and start_time <= b.end_time:
+            return True
+    return False
+
+
+def legacy_is_free(hall, booking_date, start_time, end_time):
+    """Event._is_hall_available before the availability index."""
+    return not HallBooking.objects.filter(
+        hall=hall,
+        booking_date=booking_date,
+        booking_status__in=['APPROVED', 'PENDING'],
+        start_time__lt=end_time,
+        end_time__gt=start_time,
+    ).exists()
+
+
+def legacy_free_halls(booking_date, start_time, end_time):
+    """HallViewSet.available before the availability index."""
+    conflicting_hall_ids = (
+        HallBooking.objects.filter(
+            booking_date=booking_date,
+            booking_status__in=['APPROVED', 'PENDING'],
+            start_time__lt=end_time,
+            end_time__gt=start_time,
+        )
+        .values_list('hall_id', flat=True)
+        .distinct()
+    )
+    return list(
+        Hall.objects.filter(is_available=True).exclude(
+            id__in=conflicting_hall_ids
+        )
+    )
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark hall availability checks '
+        '(legacy queries vs per-day bitmap index)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--halls',
+            type=int,
+            default=40,
+            help='Number of halls (default: 40)',
+        )
+        parser.add_argument(
+            '--bookings',
+            type=int,
+            default=2000,
+            help='Number of bookings (default: 2000)',
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=14,
+            help='Days the bookings are spread over (default: 14)',
+        )
+        parser.add_argument(
+            '--queries',
+            type=int,
+            default=500,
+            help='Checks per variant (default: 500)',
+        )
+        parser.add_argument(
+            '--seed', type=int, default=0, help='Random seed (default: 0)'
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        hall_count = max(1, options['halls'])
+        booking_count = max(0, options['bookings'])
+        day_count = max(1, options['days'])
+        query_count = max(1, options['queries'])
+        first_day = date(2099, 1, 1)
+        days = [first_day + timedelta(days=i) for i in range(day_count)]
+
+        def random_interval():
+            start = rng.randrange(8 * 60, 19 * 60, 15)
+            end = min(start + rng.choice((30, 60, 90, 120, 180)), 23 * 60 + 59)
+            return clock(start // 60, start % 60), clock(end // 60, end % 60)
+
+        try:
+            with transaction.atomic():
+                user = User.objects.create(
+                    username='benchmark-hall-availability'
+                )
+                club = Club.objects.create(name='Benchmark hall availability')
+                event = Event.objects.create(
+                    club=club,
+                    name='Benchmark',
+                    event_date=first_day,
+                    start_time=clock(9),
+                )
+                halls = Hall.objects.bulk_create(
+                    Hall(
+                        name=f'Benchmark hall {i}',
+                        code=f'BENCH-{i}',
+                        capacity=100,
+                    )
+                    for i in range(hall_count)
+                )
+                bookings = []
+                for _ in range(booking_count):
+                    start_time, end_time = random_interval()
+                    bookings.append(
+                        HallBooking(
+                            hall=rng.choice(halls),
+                            event=event,
+                            booked_by=user,
+                            booking_date=rng.choice(days),
+                            start_time=start_time,
+                            end_time=end_time,
+                            booking_status=rng.choice(
+                                ('APPROVED', 'APPROVED', 'PENDING', 'REJECTED')
+                            ),
+                        )
+                    )
+                HallBooking.objects.bulk_create(bookings, batch_size=500)
+
+                checks = [
+                    (rng.choice(halls), rng.choice(days), *random_interval())
+                    for _ in range(query_count)
+                ]
+                self.benchmark(halls, days, checks)
+                raise Rollback
+        except Rollback:
+            pass
+        finally:
+            cache.delete_many(
+                [hall_availability._cache_key(day) for day in days]
+            )
+
+    def benchmark(self, halls, days, checks):
+        cache.delete_many([hall_availability._cache_key(day) for day in days])
+        for day in days:
+            hall_availability.occupancy(day)
+
+        single = [
+            (
+                'legacy loop',
+                lambda h, d, s, e: not legacy_has_conflict(h, d, s, e),
+            ),
+            ('legacy exists()', legacy_is_free),
+            (
+                'index (from database)',
+                lambda h, d, s, e: hall_availability.is_hall_free(
+                    h, d, s, e, use_cache=False
+                ),
+            ),
+            ('index (cached)', hall_availability.is_hall_free),
+        ]
+        self.stdout.write(f'Is hall X free? ({len(checks)} checks)')
+        timings = self.time_variants(single, checks)
+        self.report_speedup(timings, 'legacy exists()', 'index (cached)')
+
+        all_halls = [
+            (
+                'legacy exclude()',
+                lambda h, d, s, e: legacy_free_halls(d, s, e),
+            ),
+            (
+                'index (cached)',
+                lambda h, d, s, e: hall_availability.free_halls(
+                    Hall.objects.filter(is_available=True), d, s, e
+                ),
+            ),
+        ]
+        self.stdout.write(
+            f'Which halls are free? ({len(checks)} checks, {len(halls)} halls)'
+        )
+        timings = self.time_variants(all_halls, checks)
+        self.report_speedup(timings, 'legacy exclude()', 'index (cached)')
+
+    def time_variants(self, variants, checks):
+        timings = {}
+        for label, check in variants:
+            start = time.perf_counter()
+            for hall, day, s, e in checks:
+                check(hall, day, s, e)
+            elapsed = time.perf_counter() - start
+            timings[label] = elapsed
+            self.stdout.write(
+                f'  {label:<24} {elapsed / len(checks) * 1e6:10.1f} us/check'
+            )
+        return timings
+
+    def report_speedup(self, timings, legacy, current):
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'  Speedup: {timings[legacy] / timings[current]:.1f}x '
+                f'({current} vs {legacy})'
+            )
+        )
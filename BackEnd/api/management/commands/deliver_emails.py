@@ -0,0 +1,137 @@
+"""
+Management command to deliver the emails queued in the outbox.
+Run with: python manage.py deliver_emails [--batch-size 50] [--once]
+
+Sends batches over one pooled connection each, within
+EMAIL_RATE_LIMIT_PER_MINUTE, and retries failed emails with backoff
+(see api.mailer). Several can run at once; each claims its own batches.
+"""
+
+import os
+import signal
+import socket
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from api.mailer import deliver, rate_limit_is_shared, requeue_stale_emails
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued emails in batches over pooled connections'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.EMAIL_BATCH_SIZE,
+            help='Emails sent per connection (default: EMAIL_BATCH_SIZE)',
+        )
+        parser.add_argument(
+            '--backoff',
+            type=int,
+            default=settings.EMAIL_RETRY_BACKOFF_SECONDS,
+            help=(
+                'Base retry delay in seconds, doubled on every failed attempt'
+            ),
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=int,
+            default=settings.EMAIL_POLL_INTERVAL_SECONDS,
+            help=(
+                'Seconds to wait between database polls when the '
+                'outbox is empty'
+            ),
+        )
+        parser.add_argument(
+            '--lock-timeout',
+            type=int,
+            default=settings.EMAIL_LOCK_TIMEOUT_SECONDS,
+            help=(
+                'Seconds after which a SENDING email is assumed '
+                'abandoned and re-queued'
+            ),
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help=(
+                'Send every runnable email and exit instead of '
+                'waiting for more'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        lock_timeout = options['lock_timeout']
+        stop = threading.Event()
+
+        def request_stop(signum, frame):
+            self.stdout.write("Stopping after the current batch...")
+            stop.set()
+
+        signal.signal(signal.SIGTERM, request_stop)
+        signal.signal(signal.SIGINT, request_stop)
+
+        worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.stdout.write(
+            f"Delivering emails ({worker_id}, batches of {batch_size})"
+        )
+        if settings.EMAIL_RATE_LIMIT_PER_MINUTE and not rate_limit_is_shared():
+            self.stdout.write(
+                self.style.WARNING(
+                    "The email rate limit is counted per process: without "
+                    "REDIS_URL each delivery process and web worker may send "
+                    f"{settings.EMAIL_RATE_LIMIT_PER_MINUTE} emails a minute"
+                )
+            )
+
+        total_sent = total_failed = 0
+        last_sweep = None
+        while not stop.is_set():
+            close_old_connections()
+            # Release emails whose delivery process died mid-batch
+            if last_sweep is None or time.monotonic() - last_sweep >= min(
+                60, lock_timeout
+            ):
+                last_sweep = time.monotonic()
+                requeued = requeue_stale_emails(lock_timeout)
+                if requeued:
+                    self.stdout.write(
+                        self.style.WARNING(
+                            f"Re-queued {requeued} abandoned emails"
+                        )
+                    )
+
+            started = time.perf_counter()
+            sent, failed, wait = deliver(
+                worker_id, batch_size, options['backoff']
+            )
+            elapsed = time.perf_counter() - started
+            total_sent += sent
+            total_failed += failed
+
+            if sent or failed:
+                self.stdout.write(
+                    f"Sent {sent}, failed {failed} in {elapsed:.2f}s "
+                    f"({sent / elapsed if elapsed else 0:.1f} emails/s)"
+                )
+                continue
+            if wait:
+                self.stdout.write(f"Rate limit reached, waiting {wait:.0f}s")
+                stop.wait(wait)
+                continue
+            if options['once']:
+                break
+            stop.wait(options['poll_interval'])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Email delivery stopped: {total_sent} sent, "
+                f"{total_failed} failed"
+            )
+        )
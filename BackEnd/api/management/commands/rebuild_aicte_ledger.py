@@ -0,0 +1,39 @@
+"""
+Management command to reconcile the AICTE points ledger with the transactions.
+Run with: python manage.py rebuild_aicte_ledger [--dry-run]
+
+The ledger (Student.aicte_*_points and AICTEPointLedger) is updated
+incrementally as transactions change. Writes that bypass model signals,
+e.g. QuerySet.update() on AICTEPointTransaction, can make it drift; this
+command recomputes it and fixes the rows that differ.
+"""
+
+from django.core.management.base import BaseCommand
+
+from api.aicte_ledger import rebuild_ledger
+
+
+class Command(BaseCommand):
+    help = 'Recompute per-student AICTE point totals from the transactions'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report how many rows are out of date without changing them',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        ledger_fixed, students_fixed = rebuild_ledger(dry_run=dry_run)
+
+        verb = 'would be fixed' if dry_run else 'fixed'
+        if ledger_fixed or students_fixed:
+            self.stdout.write(
+                self.style.WARNING(
+                    f'{ledger_fixed} category ledger rows and '
+                    f'{students_fixed} student totals {verb}'
+                )
+            )
+        else:
+            self.stdout.write(self.style.SUCCESS('AICTE ledger is up to date'))
@@ -0,0 +1,40 @@
+"""
+Management command to reconcile the dashboard counters with the tables.
+Run with: python manage.py reconcile_stats [--dry-run]
+
+The counters (StatCounter) are updated incrementally as users, events,
+certificates, registrations, hall bookings and AICTE transactions change.
+Writes that bypass model signals, e.g. QuerySet.update(status=...), can
+make them drift; schedule this command (e.g. nightly from cron) to
+recompute them and fix the counters that differ.
+"""
+
+from django.core.management.base import BaseCommand
+
+from api.stats import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute the materialised dashboard counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help=(
+                'Report how many counters are out of date without '
+                'changing them'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        fixed = reconcile_counters(dry_run=dry_run)
+
+        if fixed:
+            verb = 'would be fixed' if dry_run else 'fixed'
+            self.stdout.write(self.style.WARNING(f'{fixed} counters {verb}'))
+        else:
+            self.stdout.write(
+                self.style.SUCCESS('Dashboard counters are up to date')
+            )
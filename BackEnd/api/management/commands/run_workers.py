@@ -0,0 +1,169 @@
+"""
+Management command to run background job workers.
+Run with: python manage.py run_workers [--concurrency N]
+"""
+
+import os
+import signal
+import socket
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from api.jobs import claim_job, requeue_stale_jobs, run_job, wait_for_job
+
+
+class Command(BaseCommand):
+    help = (
+        'Run background job workers '
+        '(certificate generation, attendance import, ...)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=settings.JOB_WORKER_CONCURRENCY,
+            help='Number of worker threads (default: JOB_WORKER_CONCURRENCY)',
+        )
+        parser.add_argument(
+            '--backoff',
+            type=int,
+            default=settings.JOB_RETRY_BACKOFF_SECONDS,
+            help=(
+                'Base retry delay in seconds, doubled on every failed attempt'
+            ),
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=int,
+            default=settings.JOB_POLL_INTERVAL_SECONDS,
+            help=(
+                'Seconds to wait between database polls when the '
+                'queue is empty'
+            ),
+        )
+        parser.add_argument(
+            '--lock-timeout',
+            type=int,
+            default=settings.JOB_LOCK_TIMEOUT_SECONDS,
+            help=(
+                'Seconds after which a RUNNING job is assumed '
+                'abandoned and re-queued'
+            ),
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help=(
+                'Process every runnable job and exit instead of '
+                'waiting for more'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        concurrency = max(1, options['concurrency'])
+        self.backoff = options['backoff']
+        self.poll_interval = options['poll_interval']
+        self.lock_timeout = options['lock_timeout']
+        # Renew locks well before they would be taken for abandoned
+        self.heartbeat = max(
+            1, min(settings.JOB_HEARTBEAT_SECONDS, self.lock_timeout // 3)
+        )
+        self.once = options['once']
+        self.stop = threading.Event()
+
+        def request_stop(signum, frame):
+            self.stdout.write("Stopping workers after their current job...")
+            self.stop.set()
+
+        signal.signal(signal.SIGTERM, request_stop)
+        signal.signal(signal.SIGINT, request_stop)
+
+        requeued = requeue_stale_jobs(self.lock_timeout)
+        if requeued:
+            self.stdout.write(
+                self.style.WARNING(f"Re-queued {requeued} abandoned jobs")
+            )
+
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        threads = [
+            threading.Thread(
+                target=self.work, args=(f"{prefix}:{i}",), daemon=True
+            )
+            for i in range(concurrency)
+        ]
+        self.stdout.write(f"Starting {concurrency} job workers ({prefix})")
+        for thread in threads:
+            thread.start()
+
+        # Periodically release jobs whose worker died mid-run
+        last_sweep = time.monotonic()
+        while any(thread.is_alive() for thread in threads):
+            if self.stop.wait(1):
+                break
+            if time.monotonic() - last_sweep >= min(60, self.lock_timeout):
+                last_sweep = time.monotonic()
+                requeued = requeue_stale_jobs(self.lock_timeout)
+                if requeued:
+                    self.stdout.write(
+                        self.style.WARNING(
+                            f"Re-queued {requeued} abandoned jobs"
+                        )
+                    )
+
+        for thread in threads:
+            thread.join()
+        self.stdout.write(self.style.SUCCESS("Job workers stopped"))
+
+    def work(self, worker_id):
+        hinted_job_id = None
+        try:
+            while not self.stop.is_set():
+                close_old_connections()
+                job = claim_job(worker_id, hinted_job_id) or (
+                    claim_job(worker_id) if hinted_job_id else None
+                )
+                hinted_job_id = None
+
+                if job is None:
+                    if self.once:
+                        break
+                    hinted_job_id = wait_for_job(self.poll_interval)
+                    continue
+
+                self.stdout.write(
+                    f"[{worker_id}] Running job {job.id} ({job.job_type})"
+                )
+                job = run_job(job, self.backoff, self.heartbeat)
+                if job.status == 'SUCCEEDED':
+                    self.stdout.write(
+                        self.style.SUCCESS(
+                            f"[{worker_id}] Job {job.id} succeeded"
+                        )
+                    )
+                elif job.locked_by and job.locked_by != worker_id:
+                    self.stdout.write(
+                        self.style.WARNING(
+                            f"[{worker_id}] Job {job.id} was taken over by "
+                            f"{job.locked_by}; its outcome was discarded"
+                        )
+                    )
+                elif job.status == 'QUEUED':
+                    self.stdout.write(
+                        self.style.WARNING(
+                            f"[{worker_id}] Job {job.id} failed "
+                            f"(attempt {job.attempts}/{job.max_attempts}), "
+                            f"retrying at {job.run_after}"
+                        )
+                    )
+                else:
+                    last_line = (job.error.strip().splitlines() or [''])[-1]
+                    self.stderr.write(
+                        f"[{worker_id}] Job {job.id} failed: {last_line}"
+                    )
+        finally:
+            connection.close()
@@ -0,0 +1,89 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Q, Sum
+
+STATUS_FIELDS = {
+    'APPROVED': 'approved_points',
+    'PENDING': 'pending_points',
+    'REJECTED': 'rejected_points',
+}
+
+
+def populate_ledger(apps, schema_editor):
+    """Fill the ledger and the student totals from existing transactions."""
+    AICTEPointTransaction = apps.get_model('api', 'AICTEPointTransaction')
+    AICTEPointLedger = apps.get_model('api', 'AICTEPointLedger')
+    Student = apps.get_model('api', 'Student')
+
+    sums = {
+        field: Sum('points_allocated', filter=Q(status=status))
+        for status, field in STATUS_FIELDS.items()
+    }
+    rows = (
+        AICTEPointTransaction.objects.values('student_id', 'category_id')
+        .annotate(**sums)
+        .order_by()
+    )
+    entries = []
+    totals = {}
+    for row in rows.iterator(chunk_size=2000):
+        values = {field: row[field] or 0 for field in STATUS_FIELDS.values()}
+        entries.append(AICTEPointLedger(
+            student_id=row['student_id'], category_id=row['category_id'], **values
+        ))
+        student_totals = totals.setdefault(row['student_id'], dict.fromkeys(values, 0))
+        for field, value in values.items():
+            student_totals[field] += value
+    AICTEPointLedger.objects.bulk_create(entries, batch_size=500)
+
+    students = []
+    for student in Student.objects.filter(id__in=list(totals)).iterator(chunk_size=2000):
+        for field, value in totals[student.id].items():
+            setattr(student, f'aicte_{field}', value)
+        students.append(student)
+    Student.objects.bulk_update(
+        students, [f'aicte_{field}' for field in STATUS_FIELDS.values()], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_backgroundjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='aicte_approved_points',
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='aicte_pending_points',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='aicte_rejected_points',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='AICTEPointLedger',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('approved_points', models.IntegerField(default=0)),
+                ('pending_points', models.IntegerField(default=0)),
+                ('rejected_points', models.IntegerField(default=0)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ledger_entries', to='api.aictecategory')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aicte_ledger', to='api.student')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['category', 'approved_points'], name='api_aictepo_categor_7845e4_idx')],
+                'unique_together': {('student', 'category')},
+            },
+        ),
+        migrations.RunPython(populate_ledger, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.6 on 2026-10-18 16:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_aicte_point_ledger'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='aictepointtransaction',
+            index=models.Index(fields=['-created_at'], name='api_aictepo_created_b0f612_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='aictepointtransaction',
+            index=models.Index(fields=['student', '-created_at'], name='api_aictepo_student_323476_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['-timestamp'], name='api_auditlo_timesta_96ac8f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['user', '-timestamp'], name='api_auditlo_user_id_6b4e90_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='certificate',
+            index=models.Index(fields=['-issue_date'], name='api_certifi_issue_d_3807a8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='certificate',
+            index=models.Index(fields=['student', '-issue_date'], name='api_certifi_student_622347_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['-event_date', '-start_time'], name='api_event_event_d_56e51d_idx'),
+        ),
+    ]
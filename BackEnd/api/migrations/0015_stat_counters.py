@@ -0,0 +1,38 @@
+# Generated by Django 5.2.6 on 2026-10-18 16:05
+
+from django.db import migrations, models
+
+
+def populate_counters(apps, schema_editor):
+    """Count the existing rows, so the dashboards are right from the start."""
+    from api.stats import expected_counters
+
+    StatCounter = apps.get_model('api', 'StatCounter')
+    StatCounter.objects.bulk_create(
+        [
+            StatCounter(key=key, value=value)
+            for key, value in expected_counters(apps).items()
+            if value
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_list_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=100, unique=True)),
+                ('value', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
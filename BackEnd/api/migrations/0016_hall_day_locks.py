@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-18 16:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_stat_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HallDayLock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('hall', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='day_locks', to='api.hall')),
+            ],
+            options={
+                'unique_together': {('hall', 'day')},
+            },
+        ),
+    ]
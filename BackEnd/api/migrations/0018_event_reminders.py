@@ -0,0 +1,51 @@
+# Generated by Django 5.2.6 on 2026-10-18 16:30
+
+from datetime import datetime
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.utils.timezone import make_aware
+
+
+def populate_starts_at(apps, schema_editor):
+    """Combine the date and start time (in TIME_ZONE) of the existing events."""
+    Event = apps.get_model('api', 'Event')
+    events = list(Event.objects.only('id', 'event_date', 'start_time'))
+    for event in events:
+        if event.event_date is not None and event.start_time is not None:
+            event.starts_at = make_aware(
+                datetime.combine(event.event_date, event.start_time)
+            )
+    Event.objects.bulk_update(events, ['starts_at'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_email_outbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='starts_at',
+            field=models.DateTimeField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.CreateModel(
+            name='EventReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=10)),
+                ('batch_id', models.CharField(blank=True, db_index=True, max_length=32)),
+                ('skipped', models.BooleanField(default=False, help_text='Superseded by a closer reminder when due')),
+                ('sent_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='api.event')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='event_reminders', to='api.student')),
+            ],
+            options={
+                'unique_together': {('event', 'student', 'kind')},
+            },
+        ),
+        migrations.RunPython(populate_starts_at, migrations.RunPython.noop),
+    ]
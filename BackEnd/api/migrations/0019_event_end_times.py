@@ -0,0 +1,45 @@
+# Generated by Django 5.2.6 on 2026-10-18 16:32
+
+from datetime import datetime, time, timedelta
+
+from django.db import migrations, models
+from django.utils.timezone import make_aware
+
+
+def populate_ends_at(apps, schema_editor):
+    """
+    Combine the end date and time (in TIME_ZONE) of the existing events:
+    their last day at end_time, or the midnight after it without one.
+    """
+    Event = apps.get_model('api', 'Event')
+    events = list(Event.objects.only('id', 'event_date', 'end_date', 'end_time'))
+    for event in events:
+        last_day = event.end_date or event.event_date
+        if last_day is None:
+            continue
+        if event.end_time is None:
+            ends_at = datetime.combine(last_day + timedelta(days=1), time.min)
+        else:
+            ends_at = datetime.combine(last_day, event.end_time)
+        event.ends_at = make_aware(ends_at)
+    Event.objects.bulk_update(events, ['ends_at'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_event_reminders'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='ends_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['status', 'ends_at'], name='api_event_status_fea7ea_idx'),
+        ),
+        migrations.RunPython(populate_ends_at, migrations.RunPython.noop),
+    ]
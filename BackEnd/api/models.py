@@ -1,11 +1,12 @@
 import os
 import re
 import uuid
+from datetime import datetime, time, timedelta
 
 from django.contrib.auth.models import AbstractUser
 from django.core.exceptions import ValidationError
 from django.db import models
-from django.utils.timezone import now
+from django.utils.timezone import make_aware, now
 
 # ============================================
 # VALIDATION FUNCTIONS
@@ -249,6 +250,11 @@ class Student(models.Model):
         blank=True,
         related_name="mentees",
     )
+    # AICTE point totals by transaction status, kept in step with the
+    # student's AICTEPointTransactions by api.aicte_ledger
+    aicte_approved_points = models.IntegerField(default=0, db_index=True)
+    aicte_pending_points = models.IntegerField(default=0)
+    aicte_rejected_points = models.IntegerField(default=0)
 
     def __str__(self):
         return (
@@ -257,12 +263,7 @@ class Student(models.Model):
 
     @property
     def total_aicte_points(self):
-        return (
-            self.aicte_transactions.filter(status="APPROVED").aggregate(
-                total=models.Sum("points_allocated")
-            )["total"]
-            or 0
-        )
+        return self.aicte_approved_points
 
     @property
     def required_aicte_points(self):
@@ -463,9 +464,48 @@ class HallBooking(models.Model):
         return f"Booking {self.id} - {self.hall.name} on {self.booking_date}"
 
 
+class HallDayLock(models.Model):
+    """
+    One row per hall and day, locked (SELECT ... FOR UPDATE) while a
+    booking of that hall and day is checked and written, so concurrent
+    bookings of the same slot are serialised (see api.hall_availability).
+    """
+
+    hall = models.ForeignKey(
+        Hall, on_delete=models.CASCADE, related_name="day_locks"
+    )
+    day = models.DateField()
+
+    class Meta:
+        unique_together = ("hall", "day")
+
+    def __str__(self):
+        return f"Lock {self.hall_id} on {self.day}"
+
+
 # ============================================
 # EVENT MANAGEMENT MODELS
 # ============================================
+def event_start(event_date, start_time):
+    """An event's date and start time (in TIME_ZONE) as an aware datetime."""
+    if event_date is None or start_time is None:
+        return None
+    return make_aware(datetime.combine(event_date, start_time))
+
+
+def event_end(event_date, end_date, end_time):
+    """
+    When an event ends, as an aware datetime: its last day (end_date, or
+    event_date) at end_time, or the midnight after it without an end time.
+    """
+    last_day = end_date or event_date
+    if last_day is None:
+        return None
+    if end_time is None:
+        return make_aware(datetime.combine(last_day + timedelta(days=1), time.min))
+    return make_aware(datetime.combine(last_day, end_time))
+
+
 class Event(models.Model):
     STATUS_CHOICES = (
         ("draft", "Draft"),
@@ -546,12 +586,37 @@ class Event(models.Model):
         User, on_delete=models.SET_NULL, null=True, blank=True
     )
 
+    # The date and time fields as aware datetimes, kept up to date by
+    # save(), for indexed "starting/ending before" queries (see
+    # api.event_reminders and api.event_status)
+    starts_at = models.DateTimeField(
+        blank=True, null=True, editable=False, db_index=True
+    )
+    ends_at = models.DateTimeField(blank=True, null=True, editable=False)
+
     class Meta:
         ordering = ["-event_date", "-start_time"]
+        indexes = [
+            models.Index(fields=["-event_date", "-start_time"]),
+            models.Index(fields=["status", "ends_at"]),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.event_date})"
 
+    def save(self, *args, **kwargs):
+        self.starts_at = event_start(self.event_date, self.start_time)
+        self.ends_at = event_end(self.event_date, self.end_date, self.end_time)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {
+            "event_date",
+            "start_time",
+            "end_date",
+            "end_time",
+        } & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, "starts_at", "ends_at"}
+        super().save(*args, **kwargs)
+
     def clean(self):
         if self.end_date and self.end_date < self.event_date:
             raise ValidationError(
@@ -588,13 +653,15 @@ class Event(models.Model):
         """
         Check if a hall is available for this event's date and time.
         """
-        return not HallBooking.objects.filter(
-            hall=hall,
-            booking_date=self.event_date,
-            booking_status__in=["APPROVED", "PENDING"],
-            start_time__lt=self.end_time or self.start_time,
-            end_time__gt=self.start_time,
-        ).exists()
+        from .hall_availability import is_hall_free
+
+        return is_hall_free(
+            hall,
+            self.event_date,
+            self.start_time,
+            self.end_time or self.start_time,
+            use_cache=False,
+        )
 
 
 class EventAttendance(models.Model):
@@ -649,6 +716,34 @@ class EventRegistration(models.Model):
         return f"{self.student.usn} registered for {self.event.name}"
 
 
+class EventReminder(models.Model):
+    """
+    A reminder of an event sent (or skipped as superseded) to a student,
+    one per reminder kind ("24h", "1h", see EVENT_REMINDER_OFFSETS), so
+    `manage.py send_event_reminders` never sends one twice.
+    """
+
+    event = models.ForeignKey(
+        Event, on_delete=models.CASCADE, related_name="reminders"
+    )
+    student = models.ForeignKey(
+        Student, on_delete=models.CASCADE, related_name="event_reminders"
+    )
+    kind = models.CharField(max_length=10)
+    # The run that claimed the reminder
+    batch_id = models.CharField(max_length=32, blank=True, db_index=True)
+    skipped = models.BooleanField(
+        default=False, help_text="Superseded by a closer reminder when due"
+    )
+    sent_at = models.DateTimeField(default=now)
+
+    class Meta:
+        unique_together = ("event", "student", "kind")
+
+    def __str__(self):
+        return f"{self.kind} reminder of {self.event.name} to {self.student.usn}"
+
+
 # ============================================
 # CERTIFICATE TEMPLATE MANAGEMENT
 # ============================================
@@ -734,10 +829,49 @@ class Certificate(models.Model):
     )
     issue_date = models.DateTimeField(default=now)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["-issue_date"]),
+            models.Index(fields=["student", "-issue_date"]),
+        ]
+
     def __str__(self):
         return f"Certificate for {self.student.usn} - Event {getattr(self.event, 'id', 'N/A')}"
 
 
+class CertificateGenerationRun(models.Model):
+    """Progress of one generate-certificates run for an event."""
+
+    RUN_STATUS_CHOICES = (
+        ("RUNNING", "Running"),
+        ("COMPLETED", "Completed"),
+        ("FAILED", "Failed"),
+    )
+
+    event = models.ForeignKey(
+        Event, on_delete=models.CASCADE, related_name="certificate_runs"
+    )
+    started_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True
+    )
+    status = models.CharField(
+        max_length=20, choices=RUN_STATUS_CHOICES, default="RUNNING"
+    )
+    total = models.IntegerField(default=0)
+    done = models.IntegerField(default=0)
+    failed = models.IntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ["-started_at"]
+        indexes = [models.Index(fields=["event", "-started_at"])]
+
+    def __str__(self):
+        return f"Certificate run {self.id} - Event {self.event_id} ({self.status})"
+
+
 # ============================================
 # AICTE POINTS MANAGEMENT MODELS
 # ============================================
@@ -802,6 +936,8 @@ class AICTEPointTransaction(models.Model):
         indexes = [
             models.Index(fields=["student", "status"]),
             models.Index(fields=["event", "category"]),
+            models.Index(fields=["-created_at"]),
+            models.Index(fields=["student", "-created_at"]),
         ]
         unique_together = ("student", "event")
         ordering = ["-created_at"]
@@ -820,6 +956,33 @@ class AICTEPointTransaction(models.Model):
                 )
 
 
+class AICTEPointLedger(models.Model):
+    """
+    A student's AICTE point totals in one category, by transaction status.
+
+    Maintained incrementally by api.aicte_ledger whenever a transaction is
+    created, changes status or is deleted; `manage.py rebuild_aicte_ledger`
+    recomputes it from the transactions.
+    """
+
+    student = models.ForeignKey(
+        Student, on_delete=models.CASCADE, related_name="aicte_ledger"
+    )
+    category = models.ForeignKey(
+        AICTECategory, on_delete=models.CASCADE, related_name="ledger_entries"
+    )
+    approved_points = models.IntegerField(default=0)
+    pending_points = models.IntegerField(default=0)
+    rejected_points = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ("student", "category")
+        indexes = [models.Index(fields=["category", "approved_points"])]
+
+    def __str__(self):
+        return f"{self.student.usn} - {self.category.name}: {self.approved_points}"
+
+
 # ============================================
 # AUDIT LOGGING MODELS
 # ============================================
@@ -828,6 +991,12 @@ class AuditLog(models.Model):
     action = models.CharField(max_length=255)
     timestamp = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["-timestamp"]),
+            models.Index(fields=["user", "-timestamp"]),
+        ]
+
 
 # ============================================
 # NOTIFICATION MANAGEMENT MODELS
@@ -913,3 +1082,136 @@ class UserNotificationPreferences(models.Model):
 
     def __str__(self):
         return f"Notification preferences for {self.user.username}"
+
+
+class EmailOutbox(models.Model):
+    """
+    An email waiting for, or done with, delivery by `manage.py
+    deliver_emails` (see api.mailer).
+    """
+
+    STATUS_CHOICES = (
+        ("QUEUED", "Queued"),
+        ("SENDING", "Sending"),
+        ("SENT", "Sent"),
+        ("FAILED", "Failed"),
+    )
+
+    to_email = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body_text = models.TextField()
+    body_html = models.TextField(blank=True)
+    email_type = models.CharField(max_length=50, blank=True)
+    user = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="outbox_emails",
+    )
+    # Marked is_email_sent once the email is delivered
+    notification = models.ForeignKey(
+        Notification,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="emails",
+    )
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default="QUEUED"
+    )
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=5)
+    run_after = models.DateTimeField(default=now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "run_after"]),
+            models.Index(fields=["status", "sent_at"]),
+        ]
+
+    def __str__(self):
+        return f"Email {self.id} to {self.to_email} ({self.status})"
+
+
+# ============================================
+# BACKGROUND JOB MODELS
+# ============================================
+class BackgroundJob(models.Model):
+    """
+    A unit of deferred work (certificate generation, attendance import, ...)
+    picked up by `manage.py run_workers`.
+    """
+
+    JOB_STATUS_CHOICES = (
+        ("QUEUED", "Queued"),
+        ("RUNNING", "Running"),
+        ("SUCCEEDED", "Succeeded"),
+        ("FAILED", "Failed"),
+    )
+
+    job_type = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(
+        max_length=20, choices=JOB_STATUS_CHOICES, default="QUEUED"
+    )
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=3)
+    run_after = models.DateTimeField(default=now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(blank=True, null=True)
+    result = models.JSONField(blank=True, null=True)
+    error = models.TextField(blank=True)
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="background_jobs",
+    )
+    event = models.ForeignKey(
+        Event,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="background_jobs",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "run_after"]),
+            models.Index(fields=["event", "job_type"]),
+        ]
+
+    def __str__(self):
+        return f"Job {self.id} {self.job_type} ({self.status})"
+
+
+# ============================================
+# STATISTICS MODELS
+# ============================================
+class StatCounter(models.Model):
+    """
+    A materialised count behind the dashboards, e.g. "users:student",
+    "events:scheduled" or "mentor:12:pending_approvals".
+
+    Maintained incrementally by api.stats as the counted rows are created,
+    change or are deleted; `manage.py reconcile_stats` recomputes every
+    counter from the source tables.
+    """
+
+    key = models.CharField(max_length=100, unique=True)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.key} = {self.value}"
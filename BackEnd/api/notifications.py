@@ -0,0 +1,144 @@
+"""
+Notification fan-out for CertifyTrack.
+
+notify() tells an audience of users about something that happened: an
+in-app Notification for each user who accepts them, and an email for
+each user who opted into that kind of email, according to their
+UserNotificationPreferences (users without a preferences row get the
+model defaults, i.e. everything).
+
+However large the audience, this costs one query for the preferences,
+bulk INSERTs of the Notification rows and one INSERT into the email
+outbox (see api.email_utils.send_bulk_emails and api.mailer), instead
+of an insert and an email per user. The emails are linked to their
+Notification, which is marked is_email_sent once delivered.
+
+Account emails (verification, password reset, lockout, welcome) are not
+notifications and are always sent; see api.email_utils.
+"""
+
+from django.db.models import QuerySet
+
+from .email_utils import send_bulk_emails
+from .models import Notification, UserNotificationPreferences
+
+# Rows per INSERT
+BULK_BATCH_SIZE = 500
+
+# Notification type -> the UserNotificationPreferences flag for its email
+EMAIL_PREFERENCES = {
+    "event_registration": "email_event_registrations",
+    "event_reminder": "email_event_reminders",
+    "event_cancellation": "email_event_cancellations",
+    "certificate_generated": "email_certificate_generation",
+    "points_approved": "email_aicte_points",
+    "points_rejected": "email_aicte_points",
+    "hall_booking_approved": "email_hall_bookings",
+    "hall_booking_rejected": "email_hall_bookings",
+}
+
+# Notification types muted by in_app_event_notifications
+EVENT_NOTIFICATION_TYPES = {
+    "event_registration",
+    "event_reminder",
+    "event_cancellation",
+    "certificate_generated",
+}
+
+# A user without stored preferences gets the defaults
+DEFAULT_PREFERENCES = UserNotificationPreferences()
+
+
+def load_preferences(users):
+    """{user id: UserNotificationPreferences} for users, in one query."""
+    stored = {
+        preferences.user_id: preferences
+        for preferences in UserNotificationPreferences.objects.filter(
+            user_id__in=[user.id for user in users]
+        )
+    }
+    return {
+        user.id: stored.get(user.id, DEFAULT_PREFERENCES) for user in users
+    }
+
+
+def wants_in_app(preferences, notification_type):
+    if not preferences.in_app_enabled:
+        return False
+    if notification_type in EVENT_NOTIFICATION_TYPES:
+        return preferences.in_app_event_notifications
+    return True
+
+
+def wants_email(preferences, notification_type):
+    flag = EMAIL_PREFERENCES.get(notification_type)
+    return bool(
+        flag and preferences.email_enabled and getattr(preferences, flag)
+    )
+
+
+def notify(
+    audience,
+    notification_type,
+    title,
+    message,
+    email=None,
+    email_fields=None,
+    **related,
+):
+    """
+    Notify every user of audience (a User queryset or a list of users).
+
+    Args:
+        audience: The users to notify
+        notification_type: One of Notification.NOTIFICATION_TYPES
+        title, message: The in-app notification
+        email: Optional (email type, shared context) for send_bulk_emails,
+            sent to the users who opted into notification_type's email
+        email_fields: Optional {user id: fields} for per-user email fields
+        related: event, aiCTE_transaction or hall_booking of the Notification
+
+    Returns (notifications created, emails queued).
+    """
+    if isinstance(audience, QuerySet):
+        audience = audience.order_by()
+    users = list(audience)
+    if not users:
+        return [], 0
+    preferences = load_preferences(users)
+
+    notifications = Notification.objects.bulk_create(
+        [
+            Notification(
+                user=user,
+                notification_type=notification_type,
+                title=title,
+                message=message,
+                **related,
+            )
+            for user in users
+            if wants_in_app(preferences[user.id], notification_type)
+        ],
+        batch_size=BULK_BATCH_SIZE,
+    )
+
+    emailed = 0
+    if email is not None:
+        email_type, context = email
+        email_fields = email_fields or {}
+        emailed = send_bulk_emails(
+            email_type,
+            context,
+            [
+                (user, email_fields.get(user.id, {}))
+                for user in users
+                if wants_email(preferences[user.id], notification_type)
+            ],
+            # Ids are only returned by bulk_create on some databases
+            notifications={
+                notification.user_id: notification
+                for notification in notifications
+                if notification.pk
+            },
+        )
+    return notifications, emailed
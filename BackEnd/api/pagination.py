@@ -0,0 +1,109 @@
+"""
+Keyset (cursor) pagination for CertifyTrack list endpoints.
+
+Paging is opt-in: a request without ?cursor= or ?page_size= gets the
+whole list, as before, so clients that do not follow cursors (the
+frontend) never see a silently truncated list. A client asks for the
+first page with ?page_size= (up to API_MAX_PAGE_SIZE) and follows the
+cursors from there.
+
+Pages are fetched with WHERE <ordering field> < <last seen value> on an
+indexed ordering instead of OFFSET, so the cost of a page does not grow
+with the table. The response body stays a plain JSON list; the cursors
+travel in headers:
+
+    Link: <...?cursor=cD0y...>; rel="next", <...?cursor=cj0x...>; rel="prev"
+    X-Next-Cursor: cD0y...
+    X-Previous-Cursor: cj0x...
+
+Clients page by following rel="next" (or by passing ?cursor=) until the
+header is missing.
+"""
+
+from urllib.parse import parse_qs, urlparse
+
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+
+class HeaderCursorPagination(CursorPagination):
+    """
+    Cursor pagination with a plain list body and the cursors in headers.
+
+    The ordering comes from the view's cursor_ordering attribute (falling
+    back to the class ordering). Its first field should be indexed and
+    rarely change; the last should be unique (normally "-id") so that rows
+    sharing a timestamp still come back in a stable order.
+    """
+
+    ordering = ("-created_at", "-id")
+    page_size_query_param = "page_size"
+
+    def __init__(self, ordering=None):
+        self.page_size = settings.API_PAGE_SIZE
+        self.max_page_size = settings.API_MAX_PAGE_SIZE
+        if ordering is not None:
+            self.ordering = ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        # Only clients that ask for pages get them
+        params = request.query_params
+        if (
+            self.cursor_query_param not in params
+            and self.page_size_query_param not in params
+        ):
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, "cursor_ordering", None) or self.ordering
+        if isinstance(ordering, str):
+            return (ordering,)
+        return tuple(ordering)
+
+    def _cursor(self, url):
+        if url is None:
+            return None
+        return parse_qs(urlparse(url).query).get(
+            self.cursor_query_param, [None]
+        )[0]
+
+    def get_paginated_response(self, data):
+        next_url = self.get_next_link()
+        previous_url = self.get_previous_link()
+
+        response = Response(data)
+        links = []
+        if next_url:
+            links.append(f'<{next_url}>; rel="next"')
+            response["X-Next-Cursor"] = self._cursor(next_url)
+        if previous_url:
+            links.append(f'<{previous_url}>; rel="prev"')
+            response["X-Previous-Cursor"] = self._cursor(previous_url)
+        if links:
+            response["Link"] = ", ".join(links)
+        return response
+
+    def get_paginated_response_schema(self, schema):
+        return schema
+
+
+def paginate(request, queryset, serializer_class, ordering, context=None):
+    """
+    Serialize one cursor page of queryset, or all of it if the client did
+    not ask for pages, for views that are not generic (e.g. @action
+    methods on a plain ViewSet).
+    """
+    paginator = HeaderCursorPagination(ordering=ordering)
+    page = paginator.paginate_queryset(queryset, request)
+    context = {"request": request, **(context or {})}
+    if page is None:
+        rows = queryset.order_by(
+            *paginator.get_ordering(request, queryset, None)
+        )
+        return Response(
+            serializer_class(rows, many=True, context=context).data
+        )
+    serializer = serializer_class(page, many=True, context=context)
+    return paginator.get_paginated_response(serializer.data)
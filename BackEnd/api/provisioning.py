@@ -0,0 +1,305 @@
+"""
+Bulk user provisioning for CertifyTrack.
+
+Creates accounts (and their Student/Mentor profiles) from an uploaded
+roster. The whole sheet is validated before anything is written:
+per-row field checks, duplicates inside the sheet, and clashes with
+existing accounts (one query per unique key). Temporary passwords are
+hashed in a process pool and users, profiles and audit entries are
+inserted with bulk_create, so onboarding thousands of students takes
+seconds of database time rather than one round trip chain per row.
+"""
+
+import csv
+import io
+import secrets
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models.functions import Lower
+
+from . import stats
+from .importers import (
+    ImportField,
+    ImportSchema,
+    RowError,
+    RowReader,
+    parse_int,
+)
+from .models import AuditLog, Mentor, Student, User
+from .password_hashing import hash_passwords
+
+USER_TYPES = {choice for choice, _ in User.USER_TYPE_CHOICES}
+
+
+def _parse_username(value):
+    username = str(value).strip()
+    try:
+        User.username_validator(username)
+    except ValidationError:
+        raise ValueError(f"Invalid username: {username}")
+    return username
+
+
+def _parse_email(value):
+    email = str(value).strip()
+    try:
+        validate_email(email)
+    except ValidationError:
+        raise ValueError(f"Invalid email: {email}")
+    return email
+
+
+def _parse_user_type(value):
+    user_type = str(value).strip().lower()
+    if user_type not in USER_TYPES:
+        raise ValueError(f"Invalid user_type: {value}")
+    return user_type
+
+
+def _check_user_row(data):
+    if not all([data["username"], data["email"], data["user_type"]]):
+        raise ValueError("Missing required fields")
+    if data["user_type"] == "student" and not data["usn"]:
+        raise ValueError("USN required for student")
+    if data["user_type"] == "mentor" and not all(
+        [data["employee_id"], data["designation"]]
+    ):
+        raise ValueError("Employee ID and Designation required for mentor")
+
+
+USER_IMPORT_SCHEMA = ImportSchema(
+    [
+        ImportField("username", parse=_parse_username, default=""),
+        ImportField("email", parse=_parse_email, default=""),
+        ImportField("first_name", default=""),
+        ImportField("last_name", default=""),
+        ImportField("user_type", parse=_parse_user_type, default=""),
+        ImportField("department", default=""),
+        ImportField("usn", default=""),
+        ImportField("semester", parse=parse_int, default=1),
+        ImportField("employee_id", default=""),
+        ImportField("designation", default=""),
+    ],
+    validate=_check_user_row,
+)
+
+# (label, key of a row or None if the row has no value for it)
+UNIQUE_KEYS = [
+    ("Username", lambda row: row["username"]),
+    ("Email", lambda row: row["email"].lower()),
+    ("USN", lambda row: row["usn"] if row["user_type"] == "student" else None),
+    (
+        "Employee ID",
+        lambda row: (
+            row["employee_id"] if row["user_type"] == "mentor" else None
+        ),
+    ),
+]
+
+
+def read_user_file(file_obj, filename):
+    """Stream the rows of a user roster (.csv or .xlsx)."""
+    return RowReader.from_file(file_obj, filename, USER_IMPORT_SCHEMA)
+
+
+def _existing_values(label, values):
+    """Return which of values are already taken, with one query."""
+    if not values:
+        return set()
+    if label == "Username":
+        queryset = User.objects.filter(username__in=values).values_list(
+            "username", flat=True
+        )
+    elif label == "Email":
+        queryset = (
+            User.objects.annotate(email_lower=Lower("email"))
+            .filter(email_lower__in=values)
+            .values_list("email_lower", flat=True)
+        )
+    elif label == "USN":
+        queryset = Student.objects.filter(usn__in=values).values_list(
+            "usn", flat=True
+        )
+    else:
+        queryset = Mentor.objects.filter(employee_id__in=values).values_list(
+            "employee_id", flat=True
+        )
+    return set(queryset)
+
+
+def validate_users(rows):
+    """
+    Validate a whole roster up front.
+
+    Returns (accepted, errors): accepted is a list of (row_number, data)
+    for rows that can be created, errors a list of RowError sorted by row.
+    A value used by more than one row is accepted for the first row only.
+    """
+    candidates = list(rows)
+    errors = list(rows.errors)
+
+    # Duplicates inside the sheet
+    first_seen = {label: {} for label, _ in UNIQUE_KEYS}
+    accepted = []
+    for row_number, data in candidates:
+        clash = None
+        for label, key in UNIQUE_KEYS:
+            value = key(data)
+            if value and value in first_seen[label]:
+                clash = (
+                    f"{label} {value} duplicates row "
+                    f"{first_seen[label][value]}"
+                )
+                break
+        if clash:
+            errors.append(RowError(row_number, clash))
+            continue
+        for label, key in UNIQUE_KEYS:
+            value = key(data)
+            if value:
+                first_seen[label][value] = row_number
+        accepted.append((row_number, data))
+
+    # Clashes with existing accounts: one query per key
+    taken = {
+        label: _existing_values(label, list(first_seen[label]))
+        for label, _ in UNIQUE_KEYS
+    }
+    valid = []
+    for row_number, data in accepted:
+        clash = None
+        for label, key in UNIQUE_KEYS:
+            value = key(data)
+            if value and value in taken[label]:
+                clash = f"{label} {value} already exists"
+                break
+        if clash:
+            errors.append(RowError(row_number, clash))
+        else:
+            valid.append((row_number, data))
+
+    errors.sort(key=lambda error: error.row)
+    return valid, errors
+
+
+def provision_users(rows, created_by, dry_run=False, workers=None):
+    """
+    Create every valid user of a roster and their role profile.
+
+    rows is a RowReader from read_user_file. Rows that fail validation are
+    reported and skipped; the rest are created in one transaction. With
+    dry_run nothing is written and no passwords are generated.
+
+    Returns a dict with created_count, created_users (username, email,
+    user_type and, unless dry_run, temporary_password), errors as
+    "Row N: ..." strings and dry_run.
+    """
+    valid, errors = validate_users(rows)
+    result = {
+        "dry_run": dry_run,
+        "created_count": len(valid),
+        "created_users": [
+            {
+                "username": data["username"],
+                "email": data["email"],
+                "user_type": data["user_type"],
+            }
+            for _, data in valid
+        ],
+        "errors": [str(error) for error in errors],
+    }
+    if dry_run or not valid:
+        return result
+
+    passwords = [secrets.token_urlsafe(12) for _ in valid]
+    hashes = hash_passwords(passwords, workers)
+    batch_size = settings.IMPORT_BATCH_SIZE
+
+    with transaction.atomic():
+        users = User.objects.bulk_create(
+            [
+                User(
+                    username=data["username"],
+                    email=data["email"],
+                    first_name=data["first_name"],
+                    last_name=data["last_name"],
+                    user_type=data["user_type"],
+                    is_email_verified=True,
+                    password=encoded,
+                )
+                for (_, data), encoded in zip(valid, hashes)
+            ],
+            batch_size=batch_size,
+        )
+        if not all(user.pk for user in users):
+            # Bulk-created rows only get their ids back on some databases
+            ids = dict(
+                User.objects.filter(
+                    username__in=[user.username for user in users]
+                ).values_list("username", "id")
+            )
+            for user in users:
+                user.pk = ids[user.username]
+
+        students = Student.objects.bulk_create(
+            [
+                Student(
+                    user=user,
+                    usn=data["usn"],
+                    department=data["department"],
+                    semester=data["semester"],
+                )
+                for (_, data), user in zip(valid, users)
+                if data["user_type"] == "student"
+            ],
+            batch_size=batch_size,
+        )
+        mentors = Mentor.objects.bulk_create(
+            [
+                Mentor(
+                    user=user,
+                    employee_id=data["employee_id"],
+                    department=data["department"],
+                    designation=data["designation"],
+                )
+                for (_, data), user in zip(valid, users)
+                if data["user_type"] == "mentor"
+            ],
+            batch_size=batch_size,
+        )
+        for created in (users, students, mentors):
+            stats.record_created(created)
+        AuditLog.objects.bulk_create(
+            [
+                AuditLog(
+                    user=created_by,
+                    action=f"Created user via bulk import: {user.username}",
+                )
+                for user in users
+            ],
+            batch_size=batch_size,
+        )
+
+    for entry, password in zip(result["created_users"], passwords):
+        entry["temporary_password"] = password
+    return result
+
+
+def credentials_csv(created_users):
+    """Render the created accounts and their temporary passwords as CSV."""
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(["username", "email", "user_type", "temporary_password"])
+    for entry in created_users:
+        writer.writerow(
+            [
+                entry["username"],
+                entry["email"],
+                entry["user_type"],
+                entry.get("temporary_password", ""),
+            ]
+        )
+    return output.getvalue()
@@ -10,12 +10,36 @@ from .models import (
     Hall, HallBooking, AICTECategory, AICTEPointTransaction,
     Notification, AuditLog, ClubMember, ClubRole, EventAttendance,
     CertificateTemplate, UserNotificationPreferences, PrincipalSignature,
+    CertificateGenerationRun, BackgroundJob,
     validate_usn_format, validate_employee_id_format, validate_email_domain,
     DEPARTMENT_BRANCH_MAPPING
 )
 from .email_utils import send_verification_email, send_password_reset_email
 
 
+class SparseFieldsetMixin:
+    """
+    Lets GET requests pick the fields they need with ?fields=id,name,status.
+
+    Unknown names are ignored and without ?fields= every field is returned.
+    Only the top-level serializer of a response is trimmed; fields left out
+    are never read, so leaving out e.g. nested registrations also skips
+    loading them.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method != 'GET':
+            return
+        requested = request.query_params.get('fields')
+        if not requested:
+            return
+        keep = {name.strip() for name in requested.split(',') if name.strip()}
+        for name in set(self.fields) - keep:
+            self.fields.pop(name)
+
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -502,8 +526,29 @@ class EventRegistrationSerializer(serializers.ModelSerializer):
         fields = ['id', 'event', 'event_name', 'student', 'student_usn', 'registration_date', 'status']
 
 
-class EventSerializer(serializers.ModelSerializer):
+class EventRegistrationsMixin:
+    """
+    Registration data shared by the event serializers.
+
+    registration_count reads the registration_count annotation added by
+    EventViewSet. Nested registrations are only serialized when the view
+    asks for them with context['include_registrations'] (detail and
+    ?expand=registrations); other callers keep getting them by default.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if not self.context.get('include_registrations', True):
+            self.fields.pop('registrations', None)
+
+    def get_registration_count(self, obj):
+        count = getattr(obj, 'registration_count', None)
+        return obj.registrations.count() if count is None else count
+
+
+class EventSerializer(EventRegistrationsMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     registrations = EventRegistrationSerializer(many=True, read_only=True)
+    registration_count = serializers.SerializerMethodField()
     created_by_username = serializers.CharField(source='created_by.username', read_only=True)
     aicte_category_name = serializers.CharField(source='aicte_category.name', read_only=True, allow_null=True)
     primary_hall_name = serializers.CharField(source='primary_hall.name', read_only=True, allow_null=True)
@@ -521,13 +566,14 @@ class EventSerializer(serializers.ModelSerializer):
             'primary_hall', 'primary_hall_name', 'secondary_hall', 'secondary_hall_name',
             'assigned_hall', 'assigned_hall_name', 'hall_assigned_at',
             'created_at', 'updated_at', 'created_by', 'created_by_username',
-            'registrations'
+            'registration_count', 'registrations'
         ]
         read_only_fields = ['created_at', 'updated_at', 'assigned_hall', 'hall_assigned_at']
 
 
-class StudentEventSerializer(serializers.ModelSerializer):
+class StudentEventSerializer(EventRegistrationsMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     registrations = EventRegistrationSerializer(many=True, read_only=True)
+    registration_count = serializers.SerializerMethodField()
     created_by_username = serializers.CharField(source='created_by.username', read_only=True)
     aicte_category_name = serializers.CharField(source='aicte_category.name', read_only=True, allow_null=True)
     primary_hall_name = serializers.CharField(source='primary_hall.name', read_only=True, allow_null=True)
@@ -538,6 +584,9 @@ class StudentEventSerializer(serializers.ModelSerializer):
 
     def get_registration_status(self, obj):
         """Get registration status for the current user"""
+        if hasattr(obj, 'my_registration_status'):
+            # Annotated by EventViewSet in the same query as the event
+            return obj.my_registration_status
         request = self.context.get('request')
         if request and hasattr(request.user, 'student_profile'):
             registration = obj.registrations.filter(student=request.user.student_profile).first()
@@ -554,7 +603,7 @@ class StudentEventSerializer(serializers.ModelSerializer):
             'primary_hall', 'primary_hall_name', 'secondary_hall', 'secondary_hall_name',
             'assigned_hall', 'assigned_hall_name', 'hall_assigned_at',
             'created_at', 'updated_at', 'created_by', 'created_by_username',
-            'registrations', 'registration_status'
+            'registration_count', 'registrations', 'registration_status'
         ]
         read_only_fields = ['created_at', 'updated_at', 'assigned_hall', 'hall_assigned_at']
     
@@ -622,7 +671,7 @@ class PrincipalSignatureSerializer(serializers.ModelSerializer):
         read_only_fields = ['uploaded_at', 'updated_at']
 
 
-class CertificateSerializer(serializers.ModelSerializer):
+class CertificateSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     student_usn = serializers.CharField(source='student.usn', read_only=True)
     event_name = serializers.CharField(source='event.name', read_only=True)
 
@@ -635,6 +684,26 @@ class CertificateSerializer(serializers.ModelSerializer):
         read_only_fields = ['file', 'file_hash', 'issue_date']
 
 
+class CertificateGenerationRunSerializer(serializers.ModelSerializer):
+    started_by_username = serializers.CharField(source='started_by.username', read_only=True, allow_null=True)
+    progress = serializers.SerializerMethodField()
+
+    class Meta:
+        model = CertificateGenerationRun
+        fields = [
+            'id', 'event', 'started_by', 'started_by_username', 'status',
+            'total', 'done', 'failed', 'progress', 'errors',
+            'started_at', 'finished_at'
+        ]
+        read_only_fields = fields
+
+    def get_progress(self, obj):
+        """Percentage of attendees processed so far (generated or failed)."""
+        if not obj.total:
+            return 100
+        return round((obj.done + obj.failed) * 100 / obj.total)
+
+
 class HallSerializer(serializers.ModelSerializer):
     class Meta:
         model = Hall
@@ -673,7 +742,7 @@ class AICTECategorySerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class AICTEPointTransactionSerializer(serializers.ModelSerializer):
+class AICTEPointTransactionSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     student_usn = serializers.CharField(source='student.usn', read_only=True)
     student_name = serializers.SerializerMethodField()
     event_name = serializers.CharField(source='event.name', read_only=True)
@@ -705,7 +774,7 @@ class AICTEPointTransactionSerializer(serializers.ModelSerializer):
         return data
 
 
-class NotificationSerializer(serializers.ModelSerializer):
+class NotificationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Notification
         fields = '__all__'
@@ -726,10 +795,24 @@ class UserNotificationPreferencesSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at', 'updated_at']
 
 
-class AuditLogSerializer(serializers.ModelSerializer):
+class AuditLogSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     user_username = serializers.CharField(source='user.username', read_only=True)
 
     class Meta:
         model = AuditLog
         fields = ['id', 'user', 'user_username', 'action', 'timestamp']
         read_only_fields = ['timestamp']
+
+
+class BackgroundJobSerializer(serializers.ModelSerializer):
+    created_by_username = serializers.CharField(source='created_by.username', read_only=True, allow_null=True)
+    event_name = serializers.CharField(source='event.name', read_only=True, allow_null=True)
+
+    class Meta:
+        model = BackgroundJob
+        fields = [
+            'id', 'job_type', 'status', 'attempts', 'max_attempts',
+            'event', 'event_name', 'created_by', 'created_by_username',
+            'result', 'error', 'run_after', 'created_at', 'updated_at', 'finished_at'
+        ]
+        read_only_fields = fields
@@ -1,16 +1,30 @@
 import hashlib
 
 from django.core.exceptions import ValidationError
-from django.db.models.signals import post_save, pre_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
+from . import aicte_ledger, caching, event_status, hall_availability, stats
+from .certificate_generator import clear_template_cache
+from .email_utils import points_decision_context
 from .models import (
     AICTEPointTransaction,
     AuditLog,
     Certificate,
-    Notification,
+    CertificateTemplate,
+    Event,
+    HallBooking,
+    PrincipalSignature,
     User,
 )
+from .notifications import notify
+
+# AICTE transaction status -> Notification type
+DECISION_NOTIFICATION_TYPES = {
+    "APPROVED": "points_approved",
+    "REJECTED": "points_rejected",
+}
 
 
 @receiver(pre_save, sender=Certificate)
@@ -74,12 +88,59 @@ def notify_on_transaction_status_change(sender, instance, created, **kwargs):
     title = f"AICTE points {status.lower()}"
     message = f"Your AICTE points for event '{instance.event.name}' (category: {instance.category.name}) are now: {status}. Allocated points: {instance.points_allocated}."
 
-    Notification.objects.create(user=user, title=title, message=message)
+    # A decision also gets an email, once, if the student wants them
+    previous = getattr(instance, "_ledger_previous", None)
+    decided = status in ("APPROVED", "REJECTED") and (
+        previous is None or previous[2] != status
+    )
+    notify(
+        [user],
+        DECISION_NOTIFICATION_TYPES.get(status, "info"),
+        title,
+        message,
+        email=(
+            (
+                "points_decision",
+                points_decision_context(
+                    instance.event,
+                    instance.points_allocated,
+                    status.lower(),
+                    instance.rejection_reason if status == "REJECTED" else None,
+                ),
+            )
+            if decided
+            else None
+        ),
+        aiCTE_transaction=instance,
+    )
     AuditLog.objects.create(
         user=user, action=f"AICTE transaction {instance.id} status {status}"
     )
 
 
+@receiver(pre_save, sender=AICTEPointTransaction)
+def remember_ledger_state(sender, instance, raw=False, **kwargs):
+    """
+    Keep the stored state of a transaction that is about to change so the
+    ledger can move its points out of the old status afterwards.
+    """
+    instance._ledger_previous = (
+        aicte_ledger.previous_state(instance.pk) if instance.pk and not raw else None
+    )
+
+
+@receiver(post_save, sender=AICTEPointTransaction)
+def update_ledger_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    aicte_ledger.record_saved(instance, getattr(instance, "_ledger_previous", None))
+
+
+@receiver(post_delete, sender=AICTEPointTransaction)
+def update_ledger_on_delete(sender, instance, **kwargs):
+    aicte_ledger.record_deleted(instance)
+
+
 @receiver(post_save, sender=User)
 def set_admin_user_type(sender, instance, created, **kwargs):
     """
@@ -87,3 +148,81 @@ def set_admin_user_type(sender, instance, created, **kwargs):
     """
     if instance.is_superuser and instance.user_type != "admin":
         User.objects.filter(pk=instance.pk).update(user_type="admin")
+        instance.user_type = "admin"
+
+
+@receiver(pre_save, sender=HallBooking)
+def remember_booking_date(sender, instance, raw=False, **kwargs):
+    """Keep the stored date of a booking that may be moving to another day."""
+    instance._availability_previous_date = (
+        sender.objects.filter(pk=instance.pk)
+        .values_list("booking_date", flat=True)
+        .first()
+        if instance.pk and not raw
+        else None
+    )
+
+
+@receiver(post_save, sender=HallBooking)
+@receiver(post_delete, sender=HallBooking)
+def invalidate_hall_availability(sender, instance, **kwargs):
+    """Drop the availability index of the days a booking was written on."""
+    hall_availability.invalidate(
+        instance.booking_date,
+        getattr(instance, "_availability_previous_date", None),
+    )
+
+
+@receiver(post_save, sender=Event)
+def wake_event_status_daemon(sender, instance, raw=False, **kwargs):
+    """A saved event may change status sooner than the daemon expects."""
+    if raw:
+        return
+    transaction.on_commit(event_status.wake_daemon)
+
+
+@receiver(post_save, sender=CertificateTemplate)
+@receiver(post_delete, sender=CertificateTemplate)
+@receiver(post_save, sender=PrincipalSignature)
+@receiver(post_delete, sender=PrincipalSignature)
+def invalidate_compiled_templates(sender, instance, **kwargs):
+    """
+    Drop compiled certificate templates when a template or principal
+    signature is uploaded, changed or removed.
+    """
+    clear_template_cache()
+
+
+# Dashboard counters. Connected after set_admin_user_type so superusers
+# are counted as admins.
+def remember_stats_state(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Keep the stored state of a counted row that is about to change."""
+    instance._stats_previous = (
+        None if raw else stats.previous_state(instance, update_fields)
+    )
+
+
+def update_stats_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    stats.record_saved(instance, getattr(instance, "_stats_previous", None))
+
+
+def update_stats_on_delete(sender, instance, **kwargs):
+    stats.record_deleted(instance)
+
+
+for model_label in stats.COUNTED:
+    pre_save.connect(remember_stats_state, sender=model_label)
+    post_save.connect(update_stats_on_save, sender=model_label)
+    post_delete.connect(update_stats_on_delete, sender=model_label)
+
+
+# Cached API responses built from these models (api.caching)
+def invalidate_cached_responses(sender, instance, **kwargs):
+    caching.invalidate_tags(*caching.tags_for_model(sender))
+
+
+for model_label in caching.MODEL_TAGS:
+    post_save.connect(invalidate_cached_responses, sender=model_label)
+    post_delete.connect(invalidate_cached_responses, sender=model_label)
@@ -0,0 +1,415 @@
+"""
+Materialised dashboard statistics for CertifyTrack.
+
+Dashboard numbers (users by type, events by status, certificates issued,
+pending approvals per mentor and student, ...) are kept as StatCounter
+rows instead of being counted on every page load. A dashboard reads its
+handful of counters from the cache, or with one query on a miss.
+
+Counters are adjusted by deltas: COUNTED declares, for every counted
+model, which counters a row contributes to given a few of its fields.
+The signals in api.signals record saves and deletes, and code that writes
+rows in bulk (bulk_create/bulk_update send no signals) calls
+record_created or record_mentor_changes itself. `manage.py
+reconcile_stats` recomputes every counter from the tables and repairs
+any drift.
+"""
+
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.apps import apps as django_apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+from django.db.models import Count, F, prefetch_related_objects
+from django.utils.timezone import now
+
+from .models import AICTEPointTransaction, StatCounter
+
+CACHE_PREFIX = "stats:"
+
+# Keys per IN (...) clause of the grouped updates
+UPDATE_BATCH_SIZE = 500
+
+_batch = threading.local()
+
+
+def student_key(student_id, name):
+    return f"student:{student_id}:{name}"
+
+
+def mentor_key(mentor_id, name):
+    return f"mentor:{mentor_id}:{name}"
+
+
+def _user_keys(state):
+    return ["users", f"users:{state['user_type']}"]
+
+
+def _student_keys(state):
+    keys = ["students"]
+    if state["mentor_id"]:
+        keys.append(mentor_key(state["mentor_id"], "mentees"))
+    return keys
+
+
+def _event_keys(state):
+    return ["events", f"events:{state['status']}"]
+
+
+def _certificate_keys(state):
+    return ["certificates", student_key(state["student_id"], "certificates")]
+
+
+def _registration_keys(state):
+    return [student_key(state["student_id"], "registrations")]
+
+
+def _booking_keys(state):
+    return [f"hall_bookings:{state['booking_status']}"]
+
+
+def _transaction_keys(state):
+    if state["status"] != "PENDING":
+        return []
+    keys = [
+        "pending_approvals",
+        student_key(state["student_id"], "pending_approvals"),
+    ]
+    if state["student__mentor_id"]:
+        keys.append(
+            mentor_key(state["student__mentor_id"], "pending_approvals")
+        )
+    return keys
+
+
+# model label -> (fields the counters depend on, whether those fields can
+# change after the row is created, counter keys of a row in that state)
+COUNTED = {
+    "api.User": (("user_type",), True, _user_keys),
+    "api.Student": (("mentor_id",), True, _student_keys),
+    "api.Mentor": ((), False, lambda state: ["mentors"]),
+    "api.Club": ((), False, lambda state: ["clubs"]),
+    "api.Event": (("status",), True, _event_keys),
+    "api.Certificate": (("student_id",), False, _certificate_keys),
+    "api.EventRegistration": (("student_id",), False, _registration_keys),
+    "api.HallBooking": (("booking_status",), True, _booking_keys),
+    "api.AICTEPointTransaction": (
+        ("status", "student_id", "student__mentor_id"),
+        True,
+        _transaction_keys,
+    ),
+}
+
+
+def is_counted(model):
+    return model._meta.label in COUNTED
+
+
+def _read(instance, field):
+    """Follow field ("status", "student__mentor_id") on a model instance."""
+    value = instance
+    for part in field.split("__"):
+        if value is None:
+            return None
+        try:
+            value = getattr(value, part)
+        except ObjectDoesNotExist:
+            return None
+    return value
+
+
+def state_of(instance):
+    fields, _, _ = COUNTED[instance._meta.label]
+    return {field: _read(instance, field) for field in fields}
+
+
+def previous_state(instance, update_fields=None):
+    """
+    The stored state of instance, or None if it is not saved yet. Saves
+    that cannot change the counted fields (immutable fields, or
+    update_fields without them) are not looked up.
+    """
+    if instance._state.adding or instance.pk is None:
+        return None
+    fields, mutable, _ = COUNTED[instance._meta.label]
+    if not mutable:
+        return state_of(instance)
+    if update_fields is not None:
+        columns = {
+            field.split("__")[0].removesuffix("_id") for field in fields
+        }
+        if not columns & set(update_fields):
+            return state_of(instance)
+    return (
+        type(instance)
+        ._default_manager.filter(pk=instance.pk)
+        .values(*fields)
+        .first()
+    )
+
+
+def _keys(instance, state):
+    return COUNTED[instance._meta.label][2](state)
+
+
+def _chunks(keys):
+    keys = sorted(keys)
+    for i in range(0, len(keys), UPDATE_BATCH_SIZE):
+        yield keys[i : i + UPDATE_BATCH_SIZE]
+
+
+def invalidate(keys):
+    """Drop cached counter values once the current transaction commits."""
+    keys = [CACHE_PREFIX + key for key in keys]
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def apply_changes(changes):
+    """
+    Add signed deltas ({key: delta}) to the counters.
+
+    Keys receiving the same delta are updated together, so a bulk import
+    costs a handful of UPDATEs rather than one per row.
+    """
+    pending = getattr(_batch, "changes", None)
+    if pending is not None:
+        for key, delta in changes.items():
+            pending[key] += delta
+        return
+
+    changes = {key: delta for key, delta in changes.items() if delta}
+    if not changes:
+        return
+
+    groups = defaultdict(list)  # delta -> keys
+    for key, delta in changes.items():
+        groups[delta].append(key)
+
+    with transaction.atomic():
+        StatCounter.objects.bulk_create(
+            [StatCounter(key=key) for key in changes],
+            batch_size=UPDATE_BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+        for delta, keys in groups.items():
+            for chunk in _chunks(keys):
+                StatCounter.objects.filter(key__in=chunk).update(
+                    value=F("value") + delta, updated_at=now()
+                )
+        invalidate(changes)
+
+
+@contextmanager
+def batched():
+    """
+    Apply the counter changes made inside the block together at its end,
+    e.g. around a QuerySet.delete() that sends one signal per row.
+    """
+    if getattr(_batch, "changes", None) is not None:
+        yield
+        return
+    _batch.changes = defaultdict(int)
+    try:
+        yield
+        changes = _batch.changes
+    finally:
+        _batch.changes = None
+    apply_changes(changes)
+
+
+def record_saved(instance, previous):
+    """Record a save; previous is its previous_state() or None."""
+    current = state_of(instance)
+    if previous == current:
+        return
+    changes = defaultdict(int)
+    for key in _keys(instance, current):
+        changes[key] += 1
+    if previous is not None:
+        for key in _keys(instance, previous):
+            changes[key] -= 1
+        if instance._meta.label == "api.Student":
+            # Pending approvals follow the student to the new mentor
+            _move_pending(
+                [(instance.pk, previous["mentor_id"], current["mentor_id"])],
+                changes,
+            )
+    apply_changes(changes)
+
+
+def record_deleted(instance):
+    changes = defaultdict(int)
+    for key in _keys(instance, state_of(instance)):
+        changes[key] -= 1
+    apply_changes(changes)
+    if instance._meta.label == "api.Mentor":
+        # Mentees were detached with an UPDATE (SET_NULL), without signals
+        counters = StatCounter.objects.filter(
+            key__startswith=mentor_key(instance.pk, "")
+        )
+        invalidate(list(counters.values_list("key", flat=True)))
+        counters.delete()
+
+
+def record_created(instances):
+    """Record rows of one model inserted without signals (e.g. bulk_create)."""
+    instances = list(instances)
+    if not instances:
+        return
+    fields = COUNTED[instances[0]._meta.label][0]
+    relations = {field.rsplit("__", 1)[0] for field in fields if "__" in field}
+    if relations:
+        # e.g. each transaction's student (for its mentor) in one query
+        prefetch_related_objects(instances, *relations)
+    changes = defaultdict(int)
+    for instance in instances:
+        for key in _keys(instance, state_of(instance)):
+            changes[key] += 1
+    apply_changes(changes)
+
+
+def _move_pending(moves, changes):
+    """Add the mentor counter changes of students moving between mentors."""
+    moves = [move for move in moves if move[1] != move[2]]
+    student_ids = [student_id for student_id, _, _ in moves]
+    pending = {}
+    for chunk in _chunks(student_ids):
+        pending.update(
+            AICTEPointTransaction.objects.filter(
+                student_id__in=chunk, status="PENDING"
+            )
+            .values("student_id")
+            .annotate(count=Count("id"))
+            .order_by()
+            .values_list("student_id", "count")
+        )
+    for student_id, old_mentor_id, new_mentor_id in moves:
+        count = pending.get(student_id, 0)
+        if old_mentor_id:
+            changes[mentor_key(old_mentor_id, "pending_approvals")] -= count
+        if new_mentor_id:
+            changes[mentor_key(new_mentor_id, "pending_approvals")] += count
+
+
+def record_mentor_changes(moves):
+    """
+    Record mentor reassignments saved without signals (e.g. bulk_update).
+
+    moves is an iterable of (student_id, old_mentor_id, new_mentor_id).
+    """
+    moves = [move for move in moves if move[1] != move[2]]
+    changes = defaultdict(int)
+    for _, old_mentor_id, new_mentor_id in moves:
+        if old_mentor_id:
+            changes[mentor_key(old_mentor_id, "mentees")] -= 1
+        if new_mentor_id:
+            changes[mentor_key(new_mentor_id, "mentees")] += 1
+    _move_pending(moves, changes)
+    apply_changes(changes)
+
+
+def get_counters(keys):
+    """
+    Return {key: value} for keys, from the cache or with one query.
+
+    Counters that were never incremented are 0.
+    """
+    keys = list(keys)
+    cached = cache.get_many([CACHE_PREFIX + key for key in keys])
+    values = {
+        key: cached[CACHE_PREFIX + key]
+        for key in keys
+        if CACHE_PREFIX + key in cached
+    }
+    missing = [key for key in keys if key not in values]
+    if missing:
+        stored = dict(
+            StatCounter.objects.filter(key__in=missing).values_list(
+                "key", "value"
+            )
+        )
+        fresh = {key: stored.get(key, 0) for key in missing}
+        cache.set_many(
+            {CACHE_PREFIX + key: value for key, value in fresh.items()},
+            settings.STATS_CACHE_TIMEOUT,
+        )
+        values.update(fresh)
+    return values
+
+
+def expected_counters(apps=django_apps):
+    """
+    Count every counter from the source tables: one grouped query per
+    counted model. apps lets migrations pass their historical models.
+    """
+    counts = defaultdict(int)
+    for label, (fields, _, keys) in COUNTED.items():
+        try:
+            model = apps.get_model(label)
+        except LookupError:
+            continue
+        if fields:
+            rows = (
+                model._default_manager.values(*fields)
+                .annotate(row_count=Count("pk"))
+                .order_by()
+            )
+        else:
+            rows = [{"row_count": model._default_manager.count()}]
+        for row in rows:
+            for key in keys(row):
+                counts[key] += row["row_count"]
+    return counts
+
+
+def reconcile_counters(dry_run=False):
+    """
+    Recompute every counter and repair the ones that differ.
+
+    Returns the number of counters that were (or, with dry_run, would be)
+    fixed.
+    """
+    with transaction.atomic():
+        expected = expected_counters()
+
+        to_update = []
+        stale_ids = []
+        fixed = []
+        for counter in StatCounter.objects.select_for_update().iterator(
+            chunk_size=2000
+        ):
+            value = expected.pop(counter.key, 0)
+            if counter.value == value:
+                continue
+            fixed.append(counter.key)
+            if value:
+                counter.value = value
+                counter.updated_at = now()
+                to_update.append(counter)
+            else:
+                stale_ids.append(counter.id)
+        to_create = [
+            StatCounter(key=key, value=value)
+            for key, value in expected.items()
+            if value
+        ]
+        fixed.extend(counter.key for counter in to_create)
+
+        if not dry_run:
+            StatCounter.objects.bulk_update(
+                to_update,
+                ["value", "updated_at"],
+                batch_size=UPDATE_BATCH_SIZE,
+            )
+            for chunk in _chunks(stale_ids):
+                StatCounter.objects.filter(id__in=chunk).delete()
+            StatCounter.objects.bulk_create(
+                to_create, batch_size=UPDATE_BATCH_SIZE
+            )
+            invalidate(fixed)
+
+    return len(fixed)
@@ -1,3 +1,776 @@
-from django.test import TestCase
+import datetime
+import threading
+from unittest import mock
 
-# Create your tests here.
+from django.core import mail
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import localtime, make_aware, now
+from rest_framework.test import APIClient
+
+from . import aicte_ledger, event_reminders, hall_allocation, jobs, mailer
+from .models import (
+    AICTECategory,
+    AICTEPointLedger,
+    AICTEPointTransaction,
+    BackgroundJob,
+    Certificate,
+    Club,
+    EmailOutbox,
+    Event,
+    EventAttendance,
+    EventRegistration,
+    EventReminder,
+    Hall,
+    HallBooking,
+    Notification,
+    Student,
+    User,
+)
+
+
+class StudentDetailQueryCountTests(TestCase):
+    """GET /api/students/<id>/ must cost the same few queries for any history."""
+
+    # student (+user), attendance, registrations, certificates, pending points
+    MAX_QUERIES = 5
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            "admin", "admin@example.com", "password", user_type="admin"
+        )
+        cls.club = Club.objects.create(name="Coding Club")
+        cls.category = AICTECategory.objects.create(name="Technical")
+
+    def make_student(self, usn, history):
+        user = User.objects.create_user(usn.lower(), f"{usn}@example.com", "password")
+        student = Student.objects.create(
+            user=user, usn=usn, department="CSE", semester=5
+        )
+        for i in range(history):
+            event = Event.objects.create(
+                club=self.club,
+                name=f"{usn} event {i}",
+                event_date=datetime.date(2025, 1, 1) + datetime.timedelta(days=i),
+                start_time=datetime.time(10, 0),
+                aicte_category=self.category,
+                points_awarded=5,
+            )
+            EventRegistration.objects.create(event=event, student=student)
+            EventAttendance.objects.create(event=event, student=student)
+            Certificate.objects.create(event=event, student=student)
+            AICTEPointTransaction.objects.create(
+                student=student,
+                event=event,
+                category=self.category,
+                points_allocated=5,
+                status="PENDING" if i % 2 else "APPROVED",
+            )
+        return student
+
+    def get_detail(self, student):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(f"/api/students/{student.id}/")
+        self.assertEqual(response.status_code, 200)
+        return response.data, len(queries)
+
+    def test_query_count_is_independent_of_history(self):
+        _, few = self.get_detail(self.make_student("1AB22CS001", history=1))
+        data, many = self.get_detail(self.make_student("1AB22CS002", history=12))
+
+        self.assertLessEqual(few, self.MAX_QUERIES)
+        self.assertEqual(few, many)
+
+        stats = data["detailed_stats"]
+        self.assertEqual(stats["events"]["registered_count"], 12)
+        self.assertEqual(stats["events"]["participated_count"], 12)
+        self.assertEqual(stats["certificates"]["count"], 12)
+        self.assertEqual(stats["approvals"]["pending_count"], 6)
+        self.assertEqual(stats["aicte_points"]["total_earned"], 30)
+
+
+class ConcurrentHallBookingTests(TransactionTestCase):
+    """Concurrent requests for one free slot must approve exactly one booking."""
+
+    REQUESTS = 8
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(
+            "organizer", "organizer@example.com", "password", user_type="club_organizer"
+        )
+        club = Club.objects.create(name="Coding Club")
+        self.event = Event.objects.create(
+            club=club,
+            name="Hackathon",
+            event_date=datetime.date(2025, 3, 1),
+            start_time=datetime.time(10, 0),
+        )
+        self.hall = Hall.objects.create(name="Seminar Hall", code="SH1", capacity=100)
+
+    def book(self, barrier, responses):
+        client = APIClient()
+        client.force_authenticate(self.organizer)
+        try:
+            barrier.wait()
+            response = client.post(
+                "/api/hall-bookings/",
+                {
+                    "hall": self.hall.id,
+                    "event": self.event.id,
+                    "booking_date": "2025-03-01",
+                    "start_time": "10:00",
+                    "end_time": "12:00",
+                },
+                format="json",
+            )
+            responses.append(response.status_code)
+        finally:
+            connection.close()
+
+    def test_exactly_one_concurrent_booking_is_approved(self):
+        barrier = threading.Barrier(self.REQUESTS)
+        responses = []
+        threads = [
+            threading.Thread(target=self.book, args=(barrier, responses))
+            for _ in range(self.REQUESTS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(responses, [201] * self.REQUESTS)
+        statuses = list(
+            HallBooking.objects.filter(hall=self.hall).values_list(
+                "booking_status", flat=True
+            )
+        )
+        self.assertEqual(statuses.count("APPROVED"), 1)
+        self.assertEqual(statuses.count("PENDING"), self.REQUESTS - 1)
+
+
+class BackgroundJobTests(TestCase):
+    """Jobs are claimed once, retried with backoff and failed for good."""
+
+    def setUp(self):
+        self.calls = []
+        self.outcomes = []
+        handlers = mock.patch.dict(jobs.JOB_HANDLERS, {"test": self.handler})
+        handlers.start()
+        self.addCleanup(handlers.stop)
+
+    def handler(self, job):
+        self.calls.append(job.id)
+        outcome = self.outcomes.pop(0) if self.outcomes else {"done": True}
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    def enqueue(self, **fields):
+        with self.captureOnCommitCallbacks():
+            job = jobs.enqueue("test", {"n": 1})
+        if fields:
+            BackgroundJob.objects.filter(pk=job.pk).update(**fields)
+        return job
+
+    def test_a_job_is_claimed_by_one_worker(self):
+        job = self.enqueue()
+        self.enqueue(run_after=now() + datetime.timedelta(minutes=5))
+
+        claimed = jobs.claim_job("worker-1")
+        self.assertEqual(claimed.id, job.id)
+        self.assertEqual(claimed.status, "RUNNING")
+        self.assertEqual(claimed.locked_by, "worker-1")
+        self.assertEqual(claimed.attempts, 1)
+        # The other job is not runnable yet
+        self.assertIsNone(jobs.claim_job("worker-2"))
+
+    def test_a_successful_run_records_the_result(self):
+        self.enqueue()
+        job = jobs.run_job(jobs.claim_job("worker-1"), backoff=10)
+
+        self.assertEqual(self.calls, [job.id])
+        job.refresh_from_db()
+        self.assertEqual(job.status, "SUCCEEDED")
+        self.assertEqual(job.result, {"done": True})
+        self.assertEqual(job.locked_by, "")
+        self.assertIsNotNone(job.finished_at)
+
+    def test_a_failed_run_is_retried_with_exponential_backoff(self):
+        self.enqueue(attempts=1)
+        self.outcomes = [RuntimeError("render failed")]
+
+        before = now()
+        job = jobs.run_job(jobs.claim_job("worker-1"), backoff=10)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, "QUEUED")
+        self.assertEqual(job.attempts, 2)
+        self.assertIn("RuntimeError: render failed", job.error)
+        # 10 * 2**(2 - 1) seconds after the failure
+        self.assertGreaterEqual(
+            job.run_after, before + datetime.timedelta(seconds=20)
+        )
+        self.assertLess(job.run_after, now() + datetime.timedelta(seconds=21))
+        self.assertIsNone(jobs.claim_job("worker-1"))
+
+    def test_the_last_failed_attempt_fails_the_job(self):
+        self.enqueue(attempts=2)
+        self.outcomes = [RuntimeError("still down")]
+
+        job = jobs.run_job(jobs.claim_job("worker-1"), backoff=10)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ("FAILED", 3))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_bad_input_is_not_retried(self):
+        self.enqueue()
+        self.outcomes = [ValidationError("Unsupported file type")]
+
+        job = jobs.run_job(jobs.claim_job("worker-1"), backoff=10)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ("FAILED", 1))
+        self.assertEqual(job.error, "Unsupported file type")
+
+    def test_an_outcome_is_discarded_once_the_lock_is_lost(self):
+        self.enqueue()
+        job = jobs.claim_job("worker-1")
+        # Re-queued as stale and claimed by another worker meanwhile
+        BackgroundJob.objects.filter(pk=job.pk).update(
+            status="QUEUED", locked_by=""
+        )
+        jobs.claim_job("worker-2")
+
+        job = jobs.run_job(job, backoff=10)
+
+        self.assertEqual((job.status, job.locked_by), ("RUNNING", "worker-2"))
+        self.assertIsNone(job.result)
+
+    def test_stale_jobs_are_requeued_or_failed(self):
+        stale = now() - datetime.timedelta(hours=1)
+        retried = self.enqueue(
+            status="RUNNING", attempts=1, locked_by="gone", locked_at=stale
+        )
+        exhausted = self.enqueue(
+            status="RUNNING", attempts=3, locked_by="gone", locked_at=stale
+        )
+        running = self.enqueue(
+            status="RUNNING", attempts=1, locked_by="alive", locked_at=now()
+        )
+
+        self.assertEqual(jobs.requeue_stale_jobs(lock_timeout=60), 1)
+
+        statuses = dict(BackgroundJob.objects.values_list("id", "status"))
+        self.assertEqual(statuses[retried.id], "QUEUED")
+        self.assertEqual(statuses[exhausted.id], "FAILED")
+        self.assertEqual(statuses[running.id], "RUNNING")
+
+
+class AICTELedgerTests(TestCase):
+    """Ledger totals follow every transaction save, delete and bulk insert."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.technical = AICTECategory.objects.create(name="Technical")
+        cls.cultural = AICTECategory.objects.create(name="Cultural")
+        club = Club.objects.create(name="Coding Club")
+        cls.events = [
+            Event.objects.create(
+                club=club,
+                name=f"Workshop {i}",
+                event_date=datetime.date(2025, 2, 1 + i),
+                start_time=datetime.time(10, 0),
+            )
+            for i in range(2)
+        ]
+        user = User.objects.create_user(
+            "1ab22cs001", "1ab22cs001@example.com", "password"
+        )
+        cls.student = Student.objects.create(
+            user=user, usn="1AB22CS001", department="CSE", semester=5
+        )
+
+    def transaction(self, event=0, category=None, points=10, **fields):
+        return AICTEPointTransaction.objects.create(
+            student=self.student,
+            event=self.events[event],
+            category=category or self.technical,
+            points_allocated=points,
+            **fields,
+        )
+
+    def totals(self, category=None):
+        """(approved, pending, rejected) of the student, or of a category."""
+        if category is None:
+            student = Student.objects.get(pk=self.student.pk)
+            return (
+                student.aicte_approved_points,
+                student.aicte_pending_points,
+                student.aicte_rejected_points,
+            )
+        entry = AICTEPointLedger.objects.filter(
+            student=self.student, category=category
+        ).first()
+        if entry is None:
+            return None
+        return (
+            entry.approved_points,
+            entry.pending_points,
+            entry.rejected_points,
+        )
+
+    def test_a_status_change_moves_the_points(self):
+        txn = self.transaction(status="PENDING")
+        self.assertEqual(self.totals(), (0, 10, 0))
+        self.assertEqual(self.totals(self.technical), (0, 10, 0))
+
+        txn.status = "APPROVED"
+        txn.save()
+        self.assertEqual(self.totals(), (10, 0, 0))
+        self.assertEqual(self.totals(self.technical), (10, 0, 0))
+
+        txn.status = "REJECTED"
+        txn.save()
+        self.assertEqual(self.totals(), (0, 0, 10))
+
+    def test_a_points_or_category_change_moves_the_points(self):
+        txn = self.transaction(status="APPROVED")
+        self.transaction(event=1, status="APPROVED", points=5)
+
+        txn.points_allocated = 20
+        txn.category = self.cultural
+        txn.save()
+
+        self.assertEqual(self.totals(), (25, 0, 0))
+        self.assertEqual(self.totals(self.technical), (5, 0, 0))
+        self.assertEqual(self.totals(self.cultural), (20, 0, 0))
+
+    def test_saving_unchanged_points_changes_nothing(self):
+        txn = self.transaction(status="APPROVED")
+        txn.save()
+        self.assertEqual(self.totals(), (10, 0, 0))
+
+    def test_a_deleted_transaction_takes_its_points(self):
+        txn = self.transaction(status="APPROVED")
+        self.transaction(event=1, status="PENDING", points=5)
+
+        txn.delete()
+
+        self.assertEqual(self.totals(), (0, 5, 0))
+        self.assertEqual(self.totals(self.technical), (0, 5, 0))
+
+    def test_bulk_created_transactions_are_recorded(self):
+        created = AICTEPointTransaction.objects.bulk_create(
+            [
+                AICTEPointTransaction(
+                    student=self.student,
+                    event=event,
+                    category=self.technical,
+                    points_allocated=10,
+                    status="PENDING",
+                )
+                for event in self.events
+            ]
+        )
+        self.assertEqual(self.totals(), (0, 0, 0))
+
+        aicte_ledger.record_created(created)
+
+        self.assertEqual(self.totals(), (0, 20, 0))
+        self.assertEqual(self.totals(self.technical), (0, 20, 0))
+
+    def test_rebuild_repairs_drift(self):
+        self.transaction(status="APPROVED")
+        self.transaction(event=1, category=self.cultural, status="PENDING")
+        self.assertEqual(aicte_ledger.rebuild_ledger(dry_run=True), (0, 0))
+
+        Student.objects.filter(pk=self.student.pk).update(
+            aicte_approved_points=99
+        )
+        AICTEPointLedger.objects.filter(category=self.cultural).delete()
+
+        self.assertEqual(aicte_ledger.rebuild_ledger(), (1, 1))
+        self.assertEqual(self.totals(), (10, 10, 0))
+        self.assertEqual(self.totals(self.cultural), (0, 10, 0))
+        self.assertEqual(aicte_ledger.rebuild_ledger(dry_run=True), (0, 0))
+
+
+class HallAllocationTests(TestCase):
+    """Batch allocation moves events between halls to place more of them."""
+
+    DAY = datetime.date(2025, 4, 1)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create_user(
+            "organizer",
+            "organizer@example.com",
+            "password",
+            user_type="club_organizer",
+        )
+        cls.club = Club.objects.create(name="Coding Club")
+        cls.small = Hall.objects.create(
+            name="Room 101", code="R101", capacity=30
+        )
+        cls.big = Hall.objects.create(
+            name="Auditorium", code="AUD", capacity=100
+        )
+
+    def event(self, name, start, end, participants, **fields):
+        return Event.objects.create(
+            club=self.club,
+            name=name,
+            event_date=self.DAY,
+            start_time=datetime.time(*start),
+            end_time=datetime.time(*end),
+            max_participants=participants,
+            status="scheduled",
+            needsVenueCampus=True,
+            created_by=self.organizer,
+            **fields,
+        )
+
+    def test_an_event_is_moved_to_make_room_for_a_larger_one(self):
+        # The talk asks for the auditorium first, but only the auditorium
+        # seats the hackathon that overlaps it
+        talk = self.event("Talk", (10, 0), (12, 0), 20, primary_hall=self.big)
+        hackathon = self.event("Hackathon", (10, 30), (11, 30), 80)
+
+        allocation = hall_allocation.allocate_halls(self.DAY, self.DAY)
+
+        self.assertEqual(
+            allocation.assignments, {talk: self.small, hackathon: self.big}
+        )
+        self.assertEqual(allocation.conflicts, [])
+        preferences = {
+            row["event_name"]: row["preference"]
+            for row in allocation.as_dict()["assigned"]
+        }
+        self.assertEqual(preferences, {"Talk": "other", "Hackathon": "other"})
+
+    def test_unplaceable_events_are_reported_with_suggestions(self):
+        self.event("Talk", (10, 0), (12, 0), 20, primary_hall=self.big)
+        self.event("Hackathon", (10, 30), (11, 30), 80)
+        self.event("Meetup", (11, 0), (12, 0), 25)
+        self.event("Convocation", (9, 0), (10, 0), 150)
+
+        report = hall_allocation.allocate_halls(self.DAY, self.DAY).as_dict()
+
+        self.assertEqual(len(report["assigned"]), 2)
+        conflicts = {
+            conflict["event_name"]: conflict
+            for conflict in report["conflicts"]
+        }
+        self.assertEqual(
+            conflicts["Convocation"]["reason"],
+            hall_allocation.NO_HALL_LARGE_ENOUGH,
+        )
+        self.assertEqual(conflicts["Convocation"]["suggestions"], [])
+        meetup = conflicts["Meetup"]
+        self.assertEqual(meetup["reason"], hall_allocation.ALL_HALLS_BUSY)
+        # The same hour as soon as each hall is free again, earliest first
+        self.assertEqual(
+            [
+                (s["hall_name"], s["start_time"], s["end_time"])
+                for s in meetup["suggestions"]
+            ],
+            [
+                ("Auditorium", datetime.time(11, 30), datetime.time(12, 30)),
+                ("Room 101", datetime.time(12, 0), datetime.time(13, 0)),
+            ],
+        )
+
+    def test_existing_bookings_are_respected(self):
+        other = self.event("Booked by hand", (9, 0), (17, 0), 10)
+        HallBooking.objects.create(
+            hall=self.small,
+            event=other,
+            booked_by=self.organizer,
+            booking_date=self.DAY,
+            start_time=datetime.time(9, 0),
+            end_time=datetime.time(17, 0),
+            booking_status="APPROVED",
+        )
+        talk = self.event("Talk", (10, 0), (11, 0), 20)
+
+        allocation = hall_allocation.allocate_halls(self.DAY, self.DAY)
+
+        self.assertEqual(allocation.assignments, {talk: self.big})
+
+    def test_run_allocation_books_the_halls(self):
+        talk = self.event("Talk", (10, 0), (12, 0), 20, primary_hall=self.big)
+        hackathon = self.event("Hackathon", (10, 30), (11, 30), 80)
+
+        hall_allocation.run_allocation(self.DAY, self.DAY, user=self.organizer)
+
+        talk.refresh_from_db()
+        hackathon.refresh_from_db()
+        self.assertEqual(talk.assigned_hall, self.small)
+        self.assertEqual(hackathon.assigned_hall, self.big)
+        bookings = HallBooking.objects.filter(booking_status="APPROVED")
+        self.assertEqual(
+            set(bookings.values_list("event_id", "hall_id")),
+            {(talk.id, self.small.id), (hackathon.id, self.big.id)},
+        )
+        # Nothing is left to place
+        again = hall_allocation.run_allocation(self.DAY, self.DAY)
+        self.assertEqual(again.assignments, {})
+
+
+class FailingConnection:
+    """An email connection that refuses the recipients in refused."""
+
+    def __init__(self, refused=()):
+        self.refused = set(refused)
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def send_messages(self, messages):
+        for message in messages:
+            if set(message.to) & self.refused:
+                raise ConnectionError("Recipient refused")
+        mail.outbox.extend(messages)
+        return len(messages)
+
+
+class EmailOutboxTests(TestCase):
+    """Queued emails are claimed once, sent in batches and retried."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            "student", "student@example.com", "password"
+        )
+
+    def setUp(self):
+        # The rate limit counters
+        cache.clear()
+
+    def queue(self, to_email, **fields):
+        return EmailOutbox.objects.create(
+            to_email=to_email,
+            subject="Event Reminder",
+            body_text="See you there",
+            max_attempts=3,
+            **fields,
+        )
+
+    def test_a_batch_is_claimed_by_one_worker(self):
+        first = self.queue("a@example.com")
+        second = self.queue("b@example.com")
+        self.queue("c@example.com", run_after=now() + datetime.timedelta(1))
+
+        claimed = mailer.claim_batch("worker-1", 10)
+
+        self.assertEqual(
+            [email.id for email in claimed], [first.id, second.id]
+        )
+        self.assertTrue(
+            all(
+                (email.status, email.locked_by, email.attempts)
+                == ("SENDING", "worker-1", 1)
+                for email in claimed
+            )
+        )
+        self.assertEqual(mailer.claim_batch("worker-2", 10), [])
+
+    def test_sent_emails_are_recorded(self):
+        notification = Notification.objects.create(
+            user=self.user, title="Event Reminder", message="See you there"
+        )
+        self.queue("a@example.com", notification=notification)
+        self.queue("b@example.com")
+
+        sent, failed = mailer.send_batch(mailer.claim_batch("worker-1", 10))
+
+        self.assertEqual((sent, failed), (2, 0))
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(
+            set(EmailOutbox.objects.values_list("status", flat=True)),
+            {"SENT"},
+        )
+        notification.refresh_from_db()
+        self.assertTrue(notification.is_email_sent)
+
+    def test_a_failed_email_is_retried_with_exponential_backoff(self):
+        sent_ok = self.queue("a@example.com")
+        refused = self.queue("b@example.com", attempts=1)
+        connection = FailingConnection(refused=["b@example.com"])
+
+        before = now()
+        with mock.patch.object(
+            mailer, "get_connection", return_value=connection
+        ):
+            result = mailer.send_batch(
+                mailer.claim_batch("worker-1", 10), backoff=60
+            )
+
+        self.assertEqual(result, (1, 1))
+        sent_ok.refresh_from_db()
+        refused.refresh_from_db()
+        self.assertEqual(sent_ok.status, "SENT")
+        self.assertEqual((refused.status, refused.attempts), ("QUEUED", 2))
+        self.assertIn("Recipient refused", refused.last_error)
+        # 60 * 2**(2 - 1) seconds after the batch
+        self.assertGreaterEqual(
+            refused.run_after, before + datetime.timedelta(seconds=120)
+        )
+        self.assertLess(
+            refused.run_after, now() + datetime.timedelta(seconds=121)
+        )
+
+    def test_the_last_failed_attempt_fails_the_email(self):
+        email = self.queue("b@example.com", attempts=2)
+        connection = FailingConnection(refused=["b@example.com"])
+
+        with mock.patch.object(
+            mailer, "get_connection", return_value=connection
+        ):
+            mailer.send_batch(mailer.claim_batch("worker-1", 10))
+
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ("FAILED", 3))
+
+    def test_sends_are_capped_by_the_rate_limit(self):
+        for i in range(5):
+            self.queue(f"student{i}@example.com")
+
+        with self.settings(EMAIL_RATE_LIMIT_PER_MINUTE=3):
+            sent, _, wait = mailer.deliver("worker-1", batch_size=10)
+            self.assertEqual((sent, wait), (3, 0))
+            sent, _, wait = mailer.deliver("worker-1", batch_size=10)
+
+        self.assertEqual(sent, 0)
+        self.assertGreater(wait, 0)
+        self.assertEqual(
+            EmailOutbox.objects.filter(status="QUEUED").count(), 2
+        )
+
+    def test_unclaimed_sends_are_given_back(self):
+        self.queue("a@example.com")
+
+        with self.settings(EMAIL_RATE_LIMIT_PER_MINUTE=1):
+            # Another process claims the email first
+            with mock.patch.object(mailer, "claim_batch", return_value=[]):
+                self.assertEqual(mailer.deliver("worker-1"), (0, 0, 0))
+            sent, _, _ = mailer.deliver("worker-2")
+
+        self.assertEqual(sent, 1)
+
+
+@override_settings(EVENT_REMINDER_OFFSETS=["24h", "1h"])
+class EventReminderTests(TestCase):
+    """Each reminder goes out once; a late registration gets the closest."""
+
+    NOW = make_aware(datetime.datetime(2025, 5, 1, 9, 0))
+
+    @classmethod
+    def setUpTestData(cls):
+        club = Club.objects.create(name="Coding Club")
+        # 20 hours away: the 24h reminder is due, the 1h one is not yet
+        starts = localtime(cls.NOW + datetime.timedelta(hours=20))
+        cls.event = Event.objects.create(
+            club=club,
+            name="Hackathon",
+            event_date=starts.date(),
+            start_time=starts.time(),
+            status="scheduled",
+        )
+        cls.students = []
+        for i in range(2):
+            user = User.objects.create_user(
+                f"1ab22cs00{i}", f"1ab22cs00{i}@example.com", "password"
+            )
+            cls.students.append(
+                Student.objects.create(
+                    user=user,
+                    usn=f"1AB22CS00{i}",
+                    department="CSE",
+                    semester=5,
+                )
+            )
+
+    def register(self, student):
+        EventRegistration.objects.create(event=self.event, student=student)
+
+    def reminders(self):
+        return set(
+            EventReminder.objects.values_list("student_id", "kind", "skipped")
+        )
+
+    def notified(self):
+        return list(
+            Notification.objects.filter(
+                notification_type="event_reminder"
+            ).values_list("user_id", flat=True)
+        )
+
+    def test_a_reminder_is_sent_once(self):
+        self.register(self.students[0])
+
+        first = event_reminders.send_due_reminders(at=self.NOW)
+        later = self.NOW + datetime.timedelta(minutes=1)
+        second = event_reminders.send_due_reminders(at=later)
+
+        self.assertEqual((first["due"], first["sent"]), (1, 1))
+        self.assertEqual((second["due"], second["sent"]), (0, 0))
+        self.assertEqual(self.notified(), [self.students[0].user_id])
+        self.assertEqual(
+            self.reminders(), {(self.students[0].id, "24h", False)}
+        )
+
+    def test_each_kind_is_sent_when_due(self):
+        self.register(self.students[0])
+        event_reminders.send_due_reminders(at=self.NOW)
+
+        hour_before = self.NOW + datetime.timedelta(hours=19, minutes=30)
+        result = event_reminders.send_due_reminders(at=hour_before)
+
+        self.assertEqual(result["sent"], 1)
+        self.assertEqual(len(self.notified()), 2)
+        self.assertEqual(
+            self.reminders(),
+            {
+                (self.students[0].id, "24h", False),
+                (self.students[0].id, "1h", False),
+            },
+        )
+
+    def test_a_late_registration_only_gets_the_closest_reminder(self):
+        self.register(self.students[0])
+        event_reminders.send_due_reminders(at=self.NOW)
+        # Registers half an hour before the start: both kinds are due
+        self.register(self.students[1])
+
+        hour_before = self.NOW + datetime.timedelta(hours=19, minutes=30)
+        result = event_reminders.send_due_reminders(at=hour_before)
+
+        self.assertEqual((result["sent"], result["skipped"]), (2, 1))
+        late = self.students[1]
+        self.assertEqual(
+            {r for r in self.reminders() if r[0] == late.id},
+            {(late.id, "24h", True), (late.id, "1h", False)},
+        )
+        message = Notification.objects.filter(user_id=late.user_id).get()
+        self.assertIn("less than 1 hour", message.message)
+
+    def test_started_events_get_no_reminders(self):
+        self.register(self.students[0])
+
+        started = self.NOW + datetime.timedelta(hours=21)
+        result = event_reminders.send_due_reminders(at=started)
+
+        self.assertEqual(result["due"], 0)
+        self.assertEqual(self.notified(), [])
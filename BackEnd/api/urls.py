@@ -25,7 +25,7 @@ from .views import (
     
     # Admin Management
     AdminUserListViewSet, AdminClubManagementViewSet, AdminMenteeAssignmentViewSet,
-    AdminAICTEConfigViewSet, AdminReportingViewSet,
+    AdminAICTEConfigViewSet, AdminReportingViewSet, AdminHallAllocationViewSet,
     
     # Club Management
     ClubViewSet, ClubMemberViewSet, ClubRoleViewSet,
@@ -45,6 +45,9 @@ from .views import (
     # Notifications & Audit
     NotificationViewSet, AuditLogViewSet,
     
+    # Background Jobs
+    BackgroundJobViewSet,
+    
     # Reports
     dashboard_stats
 )
@@ -60,6 +63,7 @@ router.register(r'admin/clubs', AdminClubManagementViewSet, basename='admin-club
 router.register(r'admin/mentees', AdminMenteeAssignmentViewSet, basename='admin-mentee-assignment')
 router.register(r'admin/aicte', AdminAICTEConfigViewSet, basename='admin-aicte-config')
 router.register(r'admin/reports', AdminReportingViewSet, basename='admin-reports')
+router.register(r'admin/hall-allocation', AdminHallAllocationViewSet, basename='admin-hall-allocation')
 router.register(r'events', EventViewSet, basename='event')
 router.register(r'event-attendance', EventAttendanceViewSet, basename='event-attendance')
 router.register(r'certificates', CertificateViewSet, basename='certificate')
@@ -73,8 +77,14 @@ router.register(r'aicte-categories', AICTECategoryViewSet, basename='aicte-categ
 router.register(r'aicte-transactions', AICTEPointTransactionViewSet, basename='aicte-transaction')
 router.register(r'notifications', NotificationViewSet, basename='notification')
 router.register(r'audit-logs', AuditLogViewSet, basename='audit-log')
+router.register(r'jobs', BackgroundJobViewSet, basename='job')
 
 urlpatterns = [
+    # Admin user management (ahead of the router, whose admin/users/<pk>/
+    # would take these paths)
+    path('admin/users/create/', AdminUserCreationView.as_view(), name='admin-create-user'),
+    path('admin/users/bulk-create/', BulkUserCreationView.as_view(), name='admin-bulk-create-users'),
+
     path('', include(router.urls)),
     
     # Authentication endpoints
@@ -93,10 +103,6 @@ urlpatterns = [
     path('profile/mentor/', MentorProfileView.as_view(), name='mentor-profile'),
     path('profile/club-organizer/', ClubOrganizerProfileView.as_view(), name='club-organizer-profile'),
     
-    # Admin user management
-    path('admin/users/create/', AdminUserCreationView.as_view(), name='admin-create-user'),
-    path('admin/users/bulk-create/', BulkUserCreationView.as_view(), name='admin-bulk-create-users'),
-    
     # Admin Club management
     path('admin/clubs/create/', AdminClubManagementViewSet.as_view({'post': 'create'}), name='admin-create-club'),
     path('admin/clubs/<int:pk>/assign-organizer/', AdminClubManagementViewSet.as_view({'post': 'assign_organizer'}), name='assign-organizer'),
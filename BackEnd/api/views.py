@@ -1,17 +1,14 @@
-import csv
-import io
 import secrets
 import string
-import threading
 from datetime import datetime
 
-import openpyxl
-import qrcode
-from django.conf import settings
-from django.core.files.base import ContentFile
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.files.storage import default_storage
 from django.db import transaction
-from django.db.models import Count, F, Q, Sum
+from django.db.models import Count, F, OuterRef, Prefetch, Q, Subquery, Sum
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.http import parse_etags
 from django.utils.timezone import now, timedelta
 from rest_framework import generics, status, viewsets
 from rest_framework.decorators import action, api_view, permission_classes
@@ -19,21 +16,40 @@ from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 
-from .certificate_generator import CertificateGenerator
+from .caching import cache_stats, cached_response, invalidate_tags
+from .certificate_export import build_certificates_pdf, iter_certificates_zip
 from .email_utils import (
+    event_cancellation_context,
+    event_registration_context,
     send_account_locked_email,
-    send_certificate_generation_email,
-    send_event_cancellation_email,
-    send_event_registration_email,
-    send_hall_booking_decision_email,
     send_password_reset_email,
-    send_points_decision_email,
     send_verification_email,
 )
+from .hall_allocation import run_allocation
+from .hall_availability import (
+    CALENDAR_MAX_DAYS,
+    free_halls,
+    hall_calendar,
+    hall_calendar_etag,
+    is_hall_free,
+    next_free_slot,
+    run_locked,
+)
+from .importers import (
+    CSV_EXTENSIONS,
+    EXCEL_EXTENSIONS,
+    ImportField,
+    ImportSchema,
+    RowError,
+    RowReader,
+)
+from .jobs import enqueue
+from .mailer import email_metrics
 from .models import (
     AICTECategory,
     AICTEPointTransaction,
     AuditLog,
+    BackgroundJob,
     Certificate,
     CertificateTemplate,
     Club,
@@ -51,11 +67,16 @@ from .models import (
     Student,
     User,
 )
+from .notifications import notify
+from .pagination import HeaderCursorPagination, paginate
 from .permissions import IsAdmin, IsClubAdmin, IsMentor, IsStudent
+from .provisioning import credentials_csv, provision_users, read_user_file
 from .serializers import (
     AICTECategorySerializer,
     AICTEPointTransactionSerializer,
     AuditLogSerializer,
+    BackgroundJobSerializer,
+    CertificateGenerationRunSerializer,
     CertificateSerializer,
     CertificateTemplateSerializer,
     ClubMemberSerializer,
@@ -78,6 +99,7 @@ from .serializers import (
     StudentSerializer,
     UserSerializer,
 )
+from .stats import get_counters, mentor_key, record_mentor_changes, student_key
 
 
 def log_action(user, action):
@@ -105,7 +127,7 @@ class RegisterView(generics.CreateAPIView):
         user = serializer.save()
         # Send verification email
         try:
-            threading.Thread(target=send_verification_email, args=(user,)).start()
+            send_verification_email(user)
         except Exception as e:
             print(f"Error sending verification email: {e}")
         log_action(user, f"User registered: {user.username}")
@@ -186,7 +208,7 @@ class ResendVerificationEmailView(generics.GenericAPIView):
         user.save()
 
         try:
-            threading.Thread(target=send_verification_email, args=(user,)).start()
+            send_verification_email(user)
         except Exception as e:
             print(f"Error sending verification email: {e}")
         log_action(user, "Verification email resent")
@@ -225,7 +247,7 @@ class RequestPasswordResetView(generics.GenericAPIView):
         user.save()
 
         try:
-            threading.Thread(target=send_password_reset_email, args=(user, otp)).start()
+            send_password_reset_email(user, otp)
         except Exception as e:
             print(f"Error sending password reset email: {e}")
         log_action(user, "Password reset requested")
@@ -323,7 +345,7 @@ class LoginView(generics.GenericAPIView):
             user.save()
 
             try:
-                threading.Thread(target=send_verification_email, args=(user,)).start()
+                send_verification_email(user)
                 log_action(user, "Verification email sent during login attempt")
             except Exception as e:
                 print(f"Error sending verification email: {e}")
@@ -567,71 +589,60 @@ class StudentViewSet(viewsets.ReadOnlyModelViewSet):
             raise PermissionDenied("Students can only view their own details.")
         elif user.user_type == "mentor":
             mentor_profile = getattr(user, "mentor_profile", None)
-            if not mentor_profile or instance.mentor != mentor_profile:
+            if not mentor_profile or instance.mentor_id != mentor_profile.id:
                 raise PermissionDenied("Mentors can only view their mentees' details.")
         # Admin can view any student
 
         # Get basic data from serializer
         data = StudentSerializer(instance).data
 
-        # Add detailed stats
+        # Add detailed stats; the ledger keeps the points total on the row
         total_aicte_points = instance.total_aicte_points
         required_points = instance.required_aicte_points
-        is_aicte_completed = instance.is_aicte_completed
-
-        # Events participated in (attended events)
-        participated_events = (
-            EventAttendance.objects.filter(student=instance, is_present=True)
-            .select_related("event")
-            .values("event", "event__name")
-        )
+        is_aicte_completed = total_aicte_points >= required_points
 
+        # Everything below reads the prefetched related rows (see
+        # get_queryset), so the query count does not grow with history
+        participated_events = [
+            {"event_id": record.event_id, "event_name": record.event.name}
+            for record in instance.present_attendance
+        ]
         participated_count = len(participated_events)
 
         # Events registered for (both attended and registered)
-        registered_events = (
-            EventRegistration.objects.filter(student=instance)
-            .select_related("event")
-            .values("event", "event__name")
-        )
-
+        registered_events = [
+            {"event_id": registration.event_id, "event_name": registration.event.name}
+            for registration in instance.event_registrations.all()
+        ]
         registered_count = len(registered_events)
 
         # Certificates earned
-        certificates = Certificate.objects.filter(student=instance).select_related(
-            "event"
-        )
-        certificates_count = certificates.count()
-        certificates_data = [
-            {
-                "id": cert.id,
-                "event_name": cert.event.name,
-                "issue_date": cert.issue_date,
-                "file_url": request.build_absolute_uri(cert.file.url)
-                if cert.file
-                else None,
-            }
-            for cert in certificates
-        ]
+        certificates = instance.certificates.all()
+        certificates_count = len(certificates)
+        certificates_data = []
+        certificate_urls = {}  # event id -> URL of the student's first certificate
+        for cert in certificates:
+            file_url = request.build_absolute_uri(cert.file.url) if cert.file else None
+            certificates_data.append(
+                {
+                    "id": cert.id,
+                    "event_name": cert.event.name,
+                    "issue_date": cert.issue_date,
+                    "file_url": file_url,
+                }
+            )
+            certificate_urls.setdefault(cert.event_id, file_url)
 
         # Pending approvals
-        pending_transactions = AICTEPointTransaction.objects.filter(
-            student=instance, status="PENDING"
-        ).select_related("event", "category")
-
         pending_data = [
             {
                 "id": tx.id,
                 "event_name": tx.event.name,
                 "points_allocated": tx.points_allocated,
                 "category_name": tx.category.name,
-                "certificate_url": request.build_absolute_uri(
-                    certificates.filter(event=tx.event).first().file.url
-                )
-                if certificates.filter(event=tx.event).exists()
-                else None,
+                "certificate_url": certificate_urls.get(tx.event_id),
             }
-            for tx in pending_transactions
+            for tx in instance.pending_transactions
         ]
 
         # Add detailed stats to response
@@ -647,14 +658,8 @@ class StudentViewSet(viewsets.ReadOnlyModelViewSet):
             "events": {
                 "registered_count": registered_count,
                 "participated_count": participated_count,
-                "registered": [
-                    {"event_id": item["event"], "event_name": item["event__name"]}
-                    for item in registered_events
-                ],
-                "participated": [
-                    {"event_id": item["event"], "event_name": item["event__name"]}
-                    for item in participated_events
-                ],
+                "registered": registered_events,
+                "participated": participated_events,
             },
             "certificates": {"count": certificates_count, "list": certificates_data},
             "approvals": {
@@ -666,6 +671,38 @@ class StudentViewSet(viewsets.ReadOnlyModelViewSet):
         return Response(data)
 
     def get_queryset(self):
+        queryset = self.get_visible_students()
+        if self.action == "retrieve":
+            # One query per relation for the detailed stats
+            queryset = queryset.select_related("user").prefetch_related(
+                Prefetch(
+                    "eventattendance_set",
+                    queryset=EventAttendance.objects.filter(
+                        is_present=True
+                    ).select_related("event"),
+                    to_attr="present_attendance",
+                ),
+                Prefetch(
+                    "event_registrations",
+                    queryset=EventRegistration.objects.select_related("event"),
+                ),
+                Prefetch(
+                    "certificates",
+                    queryset=Certificate.objects.select_related("event").order_by("id"),
+                ),
+                Prefetch(
+                    "aicte_transactions",
+                    queryset=AICTEPointTransaction.objects.filter(
+                        status="PENDING"
+                    ).select_related("event", "category"),
+                    to_attr="pending_transactions",
+                ),
+            )
+        elif self.action == "list":
+            queryset = queryset.select_related("user")
+        return queryset
+
+    def get_visible_students(self):
         user = self.request.user
         # Admin can see all students
         if user.user_type == "admin":
@@ -842,8 +879,19 @@ class AdminUserCreationView(generics.CreateAPIView):
 
 class BulkUserCreationView(generics.GenericAPIView):
     """
-    Bulk user creation from CSV file.
+    Bulk user creation from a CSV or XLSX file.
     CSV format: username,email,first_name,last_name,user_type,usn/employee_id,department,semester/designation
+
+    The accounts are created by a background job (hashing thousands of
+    temporary passwords takes far longer than a request may); poll
+    /jobs/<job_id>/ for the result and download the temporary passwords
+    from /jobs/<job_id>/credentials/.
+
+    Optional form fields (or query parameters):
+      - dry_run=true: validate the file and report what would be created,
+        straight away
+      - report=csv: with dry_run, respond with a CSV of the accounts that
+        would be created instead of JSON
     """
 
     permission_classes = [IsAuthenticated]
@@ -858,97 +906,60 @@ class BulkUserCreationView(generics.GenericAPIView):
                 {"error": "CSV file is required."}, status=status.HTTP_400_BAD_REQUEST
             )
 
-        try:
-            decoded_file = csv_file.read().decode("utf-8").splitlines()
-            csv_reader = csv.DictReader(decoded_file)
-
-            created_users = []
-            errors = []
-
-            for row_num, row in enumerate(csv_reader, start=2):
-                try:
-                    username = row.get("username", "").strip()
-                    email = row.get("email", "").strip()
-                    first_name = row.get("first_name", "").strip()
-                    last_name = row.get("last_name", "").strip()
-                    user_type = row.get("user_type", "").strip()
-                    department = row.get("department", "").strip()
-
-                    if not all([username, email, user_type]):
-                        errors.append(f"Row {row_num}: Missing required fields")
-                        continue
-
-                    # Generate temporary password
-                    temp_password = secrets.token_urlsafe(12)
-
-                    user = User.objects.create(
-                        username=username,
-                        email=email,
-                        first_name=first_name,
-                        last_name=last_name,
-                        user_type=user_type,
-                        is_email_verified=True,
-                    )
-                    user.set_password(temp_password)
-                    user.save()
-
-                    # Create role-specific profile
-                    if user_type == "student":
-                        usn = row.get("usn", "").strip()
-                        semester = int(row.get("semester", 1))
-                        if not usn:
-                            errors.append(f"Row {row_num}: USN required for student")
-                            user.delete()
-                            continue
-                        Student.objects.create(
-                            user=user, usn=usn, department=department, semester=semester
-                        )
-
-                    elif user_type == "mentor":
-                        employee_id = row.get("employee_id", "").strip()
-                        designation = row.get("designation", "").strip()
-                        if not all([employee_id, designation]):
-                            errors.append(
-                                f"Row {row_num}: Employee ID and Designation required for mentor"
-                            )
-                            user.delete()
-                            continue
-                        Mentor.objects.create(
-                            user=user,
-                            employee_id=employee_id,
-                            department=department,
-                            designation=designation,
-                        )
-
-                    created_users.append(
-                        {
-                            "username": username,
-                            "email": email,
-                            "temporary_password": temp_password,
-                        }
-                    )
-                    log_action(
-                        request.user, f"Created user via bulk import: {username}"
-                    )
-
-                except Exception as e:
-                    errors.append(f"Row {row_num}: {str(e)}")
+        def option(name):
+            value = request.data.get(name) or request.query_params.get(name) or ""
+            return str(value).strip().lower()
 
+        if option("dry_run") not in ("1", "true", "yes"):
+            if not csv_file.name.lower().endswith(CSV_EXTENSIONS + EXCEL_EXTENSIONS):
+                return Response(
+                    {"error": "Unsupported file type; only .csv and .xlsx allowed"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            # Keep the upload in storage until the worker has imported it
+            stored_path = default_storage.save(
+                f"job_uploads/users_{csv_file.name}", csv_file
+            )
+            job = enqueue(
+                "provision_users",
+                {"file": stored_path, "filename": csv_file.name},
+                user=request.user,
+            )
+            log_action(request.user, f"Queued bulk user import of {csv_file.name}")
             return Response(
                 {
-                    "created_count": len(created_users),
-                    "created_users": created_users,
-                    "errors": errors,
+                    "message": "User import queued for processing",
+                    "job_id": job.id,
+                    "job": BackgroundJobSerializer(job).data,
                 },
-                status=status.HTTP_201_CREATED,
+                status=status.HTTP_202_ACCEPTED,
             )
 
+        try:
+            result = provision_users(
+                read_user_file(csv_file, csv_file.name), request.user, dry_run=True
+            )
+        except DjangoValidationError as e:
+            return Response(
+                {"error": "; ".join(e.messages)}, status=status.HTTP_400_BAD_REQUEST
+            )
         except Exception as e:
             return Response(
                 {"error": f"Error processing CSV: {str(e)}"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        if option("report") == "csv":
+            response = HttpResponse(
+                credentials_csv(result["created_users"]), content_type="text/csv"
+            )
+            response["Content-Disposition"] = (
+                'attachment; filename="user_credentials.csv"'
+            )
+            return response
+
+        return Response(result, status=status.HTTP_200_OK)
+
 
 # ============================================================================
 # MENTOR-MENTEE MANAGEMENT
@@ -999,9 +1010,85 @@ class MentorMenteeAssignmentView(generics.GenericAPIView):
         )
 
 
+def _check_mentee_row(data):
+    if not all([data["mentor_employee_id"], data["student_usn"]]):
+        raise ValueError("Missing mentor_employee_id or student_usn")
+
+
+MENTEE_ASSIGNMENT_SCHEMA = ImportSchema(
+    [ImportField("mentor_employee_id"), ImportField("student_usn")],
+    validate=_check_mentee_row,
+)
+
+
+def assign_mentees_from_file(file_obj, admin_user):
+    """
+    Assign students to mentors from a mentor_employee_id,student_usn sheet.
+
+    Rows are streamed and applied a batch at a time: mentors and students
+    are looked up with one query each and saved with one bulk update.
+    Returns (assigned_count, errors) with errors as "Row N: ..." strings.
+    """
+    rows = RowReader.from_file(file_obj, file_obj.name, MENTEE_ASSIGNMENT_SCHEMA)
+    assigned_count = 0
+    errors = []
+
+    for batch in rows.batches():
+        mentors = Mentor.objects.in_bulk(
+            {row["mentor_employee_id"] for _, row in batch}, field_name="employee_id"
+        )
+        students = Student.objects.in_bulk(
+            {row["student_usn"] for _, row in batch}, field_name="usn"
+        )
+
+        assigned = {}
+        previous_mentors = {}
+        for row_num, row in batch:
+            mentor = mentors.get(row["mentor_employee_id"])
+            if not mentor:
+                errors.append(
+                    RowError(
+                        row_num,
+                        f"Mentor with employee ID {row['mentor_employee_id']} not found",
+                    )
+                )
+                continue
+            student = students.get(row["student_usn"])
+            if not student:
+                errors.append(
+                    RowError(row_num, f"Student with USN {row['student_usn']} not found")
+                )
+                continue
+            previous_mentors.setdefault(student.id, student.mentor_id)
+            student.mentor = mentor
+            assigned[student.id] = student
+            assigned_count += 1
+
+        with transaction.atomic():
+            Student.objects.bulk_update(assigned.values(), ["mentor"])
+            record_mentor_changes(
+                (student.id, previous_mentors[student.id], student.mentor_id)
+                for student in assigned.values()
+            )
+            # Mentors' transaction and certificate lists follow their mentees
+            invalidate_tags("aicte", "certificates")
+            AuditLog.objects.bulk_create(
+                [
+                    AuditLog(
+                        user=admin_user,
+                        action=f"Assigned mentee {student.usn} to mentor {student.mentor.employee_id}",
+                    )
+                    for student in assigned.values()
+                ]
+            )
+
+    errors = sorted(rows.errors + errors, key=lambda error: error.row)
+    return assigned_count, [str(error) for error in errors]
+
+
 class BulkMenteeAssignmentView(generics.GenericAPIView):
     """
-    Bulk mentee assignment from CSV file.
+    Bulk mentee assignment from a CSV or XLSX file.
     CSV format: mentor_employee_id,student_usn
     """
 
@@ -1018,54 +1105,16 @@ class BulkMenteeAssignmentView(generics.GenericAPIView):
             )
 
         try:
-            decoded_file = csv_file.read().decode("utf-8").splitlines()
-            csv_reader = csv.DictReader(decoded_file)
-
-            assigned_count = 0
-            errors = []
-
-            for row_num, row in enumerate(csv_reader, start=2):
-                try:
-                    mentor_emp_id = row.get("mentor_employee_id", "").strip()
-                    student_usn = row.get("student_usn", "").strip()
-
-                    if not all([mentor_emp_id, student_usn]):
-                        errors.append(
-                            f"Row {row_num}: Missing mentor_employee_id or student_usn"
-                        )
-                        continue
-
-                    mentor = Mentor.objects.filter(employee_id=mentor_emp_id).first()
-                    student = Student.objects.filter(usn=student_usn).first()
-
-                    if not mentor:
-                        errors.append(
-                            f"Row {row_num}: Mentor with ID {mentor_emp_id} not found"
-                        )
-                        continue
-
-                    if not student:
-                        errors.append(
-                            f"Row {row_num}: Student with USN {student_usn} not found"
-                        )
-                        continue
-
-                    student.mentor = mentor
-                    student.save()
-                    assigned_count += 1
-                    log_action(
-                        request.user,
-                        f"Bulk assigned student {student_usn} to mentor {mentor_emp_id}",
-                    )
-
-                except Exception as e:
-                    errors.append(f"Row {row_num}: {str(e)}")
-
+            assigned_count, errors = assign_mentees_from_file(csv_file, request.user)
             return Response(
                 {"assigned_count": assigned_count, "errors": errors},
                 status=status.HTTP_200_OK,
             )
 
+        except DjangoValidationError as e:
+            return Response(
+                {"error": "; ".join(e.messages)}, status=status.HTTP_400_BAD_REQUEST
+            )
         except Exception as e:
             return Response(
                 {"error": f"Error processing CSV: {str(e)}"},
@@ -1381,7 +1430,7 @@ class AdminMenteeAssignmentViewSet(viewsets.ViewSet):
 
     @action(detail=False, methods=["post"])
     def bulk_assign(self, request):
-        """Bulk assign mentees to mentors from CSV
+        """Bulk assign mentees to mentors from CSV/XLSX
         CSV format: mentor_employee_id,student_usn
         """
         csv_file = request.FILES.get("csv_file")
@@ -1391,50 +1440,14 @@ class AdminMenteeAssignmentViewSet(viewsets.ViewSet):
             )
 
         try:
-            decoded_file = csv_file.read().decode("utf-8").splitlines()
-            csv_reader = csv.DictReader(decoded_file)
-
-            assigned = 0
-            errors = []
-
-            for row_num, row in enumerate(csv_reader, start=2):
-                try:
-                    mentor_emp_id = row.get("mentor_employee_id", "").strip()
-                    student_usn = row.get("student_usn", "").strip()
-
-                    if not all([mentor_emp_id, student_usn]):
-                        errors.append(
-                            f"Row {row_num}: Missing mentor_employee_id or student_usn"
-                        )
-                        continue
-
-                    mentor = Mentor.objects.filter(employee_id=mentor_emp_id).first()
-                    if not mentor:
-                        errors.append(
-                            f"Row {row_num}: Mentor with employee ID {mentor_emp_id} not found"
-                        )
-                        continue
-
-                    student = Student.objects.filter(usn=student_usn).first()
-                    if not student:
-                        errors.append(
-                            f"Row {row_num}: Student with USN {student_usn} not found"
-                        )
-                        continue
-
-                    student.mentor = mentor
-                    student.save()
-                    assigned += 1
-                    log_action(
-                        request.user,
-                        f"Assigned mentee {student_usn} to mentor {mentor_emp_id}",
-                    )
-                except Exception as e:
-                    errors.append(f"Row {row_num}: {str(e)}")
-
+            assigned, errors = assign_mentees_from_file(csv_file, request.user)
             return Response(
                 {"assigned": assigned, "errors": errors}, status=status.HTTP_200_OK
             )
+        except DjangoValidationError as e:
+            return Response(
+                {"error": "; ".join(e.messages)}, status=status.HTTP_400_BAD_REQUEST
+            )
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -1462,6 +1475,51 @@ class AdminAICTEConfigViewSet(viewsets.ModelViewSet):
         log_action(self.request.user, f"Deleted AICTE category: {category_name}")
 
 
+class AdminHallAllocationViewSet(viewsets.ViewSet):
+    """
+    Admin batch hall allocation for scheduled events (see api.hall_allocation).
+    """
+
+    permission_classes = [IsAdmin]
+
+    def create(self, request):
+        """
+        Allocate halls to the scheduled events of a date range that need one.
+        Body:
+        - start: (YYYY-MM-DD) required, first day
+        - end: (YYYY-MM-DD) optional, last day (default: a week from start)
+        - dry_run: optional, plan without booking any hall
+        """
+        try:
+            first_day = datetime.strptime(request.data["start"], "%Y-%m-%d").date()
+            last_day = (
+                datetime.strptime(request.data["end"], "%Y-%m-%d").date()
+                if request.data.get("end")
+                else first_day + timedelta(days=6)
+            )
+        except (KeyError, TypeError, ValueError):
+            return Response(
+                {"error": "start (YYYY-MM-DD) is required; end is YYYY-MM-DD"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if not 0 <= (last_day - first_day).days < CALENDAR_MAX_DAYS:
+            return Response(
+                {
+                    "error": f"end must be on or after start and within {CALENDAR_MAX_DAYS} days of it"
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        dry_run = str(request.data.get("dry_run", "")).lower() in ("1", "true", "yes")
+        allocation = run_allocation(
+            first_day, last_day, request.user, dry_run=dry_run
+        )
+
+        return Response(
+            {"dry_run": dry_run, **allocation.as_dict()}, status=status.HTTP_200_OK
+        )
+
+
 class AdminReportingViewSet(viewsets.ViewSet):
     """
     Admin system reporting and analytics.
@@ -1471,29 +1529,41 @@ class AdminReportingViewSet(viewsets.ViewSet):
 
     @action(detail=False, methods=["get"])
     def system_stats(self, request):
-        """Get system-wide statistics"""
+        """Get system-wide statistics (materialised counters, see api.stats)"""
+        counters = get_counters(
+            [
+                "users",
+                "students",
+                "mentors",
+                "clubs",
+                "events",
+                "certificates",
+                "hall_bookings:APPROVED",
+                "users:student",
+                "users:mentor",
+                "users:club_organizer",
+                "users:admin",
+            ]
+        )
         stats = {
-            "total_users": User.objects.count(),
-            "total_students": Student.objects.count(),
-            "total_mentors": Mentor.objects.count(),
-            "total_clubs": Club.objects.count(),
-            "total_events": Event.objects.count(),
-            "total_certificates_issued": Certificate.objects.count(),
-            "active_bookings": HallBooking.objects.filter(
-                booking_status="APPROVED"
-            ).count(),
+            "total_users": counters["users"],
+            "total_students": counters["students"],
+            "total_mentors": counters["mentors"],
+            "total_clubs": counters["clubs"],
+            "total_events": counters["events"],
+            "total_certificates_issued": counters["certificates"],
+            "active_bookings": counters["hall_bookings:APPROVED"],
             "user_breakdown": {
-                "students": User.objects.filter(user_type="student").count(),
-                "mentors": User.objects.filter(user_type="mentor").count(),
-                "club_organizers": User.objects.filter(
-                    user_type="club_organizer"
-                ).count(),
-                "admins": User.objects.filter(user_type="admin").count(),
+                "students": counters["users:student"],
+                "mentors": counters["users:mentor"],
+                "club_organizers": counters["users:club_organizer"],
+                "admins": counters["users:admin"],
             },
         }
         return Response(stats, status=status.HTTP_200_OK)
 
     @action(detail=False, methods=["get"])
+    @cached_response("aicte", per_user=False)
     def aicte_compliance_report(self, request):
         """Get AICTE compliance summary report"""
         department = request.query_params.get("department")
@@ -1509,11 +1579,15 @@ class AdminReportingViewSet(viewsets.ViewSet):
         regular_students = students_query.filter(admission_type="regular")
         lateral_students = students_query.filter(admission_type="lateral")
 
-        # Calculate compliance stats
-        regular_completed = regular_students.filter(total_aicte_points__gte=100).count()
+        # Calculate compliance stats (indexed reads of the AICTE ledger totals)
+        regular_completed = regular_students.filter(
+            aicte_approved_points__gte=100
+        ).count()
         regular_pending = regular_students.count() - regular_completed
 
-        lateral_completed = lateral_students.filter(total_aicte_points__gte=75).count()
+        lateral_completed = lateral_students.filter(
+            aicte_approved_points__gte=75
+        ).count()
         lateral_pending = lateral_students.count() - lateral_completed
 
         # Overall statistics
@@ -1575,13 +1649,19 @@ class AdminReportingViewSet(viewsets.ViewSet):
                 Student.objects.values("department")
                 .annotate(
                     total_students=Count("id"),
-                    regular_students=Count(Q(admission_type="regular")),
-                    lateral_students=Count(Q(admission_type="lateral")),
+                    regular_students=Count("id", filter=Q(admission_type="regular")),
+                    lateral_students=Count("id", filter=Q(admission_type="lateral")),
                     completed_regular=Count(
-                        Q(admission_type="regular", total_aicte_points__gte=100)
+                        "id",
+                        filter=Q(
+                            admission_type="regular", aicte_approved_points__gte=100
+                        ),
                     ),
                     completed_lateral=Count(
-                        Q(admission_type="lateral", total_aicte_points__gte=75)
+                        "id",
+                        filter=Q(
+                            admission_type="lateral", aicte_approved_points__gte=75
+                        ),
                     ),
                 )
                 .annotate(
@@ -1606,8 +1686,8 @@ class AdminReportingViewSet(viewsets.ViewSet):
         days = int(request.query_params.get("days", 30))
 
         cutoff_date = now() - timedelta(days=days)
-        logs = AuditLog.objects.filter(timestamp__gte=cutoff_date).order_by(
-            "-timestamp"
+        logs = AuditLog.objects.filter(timestamp__gte=cutoff_date).select_related(
+            "user"
         )
 
         if user_id:
@@ -1615,8 +1695,7 @@ class AdminReportingViewSet(viewsets.ViewSet):
         if action_search:
             logs = logs.filter(action__icontains=action_search)
 
-        serializer = AuditLogSerializer(logs, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return paginate(request, logs, AuditLogSerializer, ("-timestamp", "-id"))
 
     @action(detail=False, methods=["get"])
     def user_activity_report(self, request):
@@ -1633,6 +1712,7 @@ class AdminReportingViewSet(viewsets.ViewSet):
         return Response(report, status=status.HTTP_200_OK)
 
     @action(detail=False, methods=["get"])
+    @cached_response("events", per_user=False)
     def event_statistics(self, request):
         """Get event statistics and attendance"""
         stats = {
@@ -1651,6 +1731,7 @@ class AdminReportingViewSet(viewsets.ViewSet):
         return Response(stats, status=status.HTTP_200_OK)
 
     @action(detail=False, methods=["get"])
+    @cached_response("halls", per_user=False)
     def hall_utilization_report(self, request):
         """Get hall booking statistics"""
         halls = Hall.objects.annotate(
@@ -1672,6 +1753,25 @@ class AdminReportingViewSet(viewsets.ViewSet):
 
         return Response(list(halls), status=status.HTTP_200_OK)
 
+    @action(detail=False, methods=["get"])
+    def cache_stats(self, request):
+        """Hit/miss counts of the cached API responses"""
+        return Response(cache_stats(), status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=["get"])
+    def email_stats(self, request):
+        """Outbox depth, delivery throughput and failures (see api.mailer)"""
+        try:
+            window = int(request.query_params.get("minutes", 60))
+        except ValueError:
+            return Response(
+                {"error": "minutes must be an integer"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if window < 1:
+            window = 60
+        return Response(email_metrics(window), status=status.HTTP_200_OK)
+
 
 # ============================================================================
 # CLUB MANAGEMENT
@@ -1738,6 +1838,8 @@ class EventViewSet(viewsets.ModelViewSet):
     queryset = Event.objects.all().select_related("aicte_category", "club")
     serializer_class = EventSerializer
     permission_classes = [IsClubAdmin]
+    pagination_class = HeaderCursorPagination
+    cursor_ordering = ("-event_date", "-start_time", "-id")
 
     def get_serializer_class(self):
         """Return StudentEventSerializer for students, EventSerializer for others"""
@@ -1778,19 +1880,58 @@ class EventViewSet(viewsets.ModelViewSet):
 
         # students should see only scheduled events
         if hasattr(user, "student_profile"):
-            return Event.objects.filter(status="scheduled")
+            events = Event.objects.filter(status="scheduled").annotate(
+                my_registration_status=Subquery(
+                    EventRegistration.objects.filter(
+                        event=OuterRef("pk"), student=user.student_profile
+                    ).values("status")[:1]
+                )
+            )
 
         # club organizers see only their club's events
         elif user.user_type == "club_organizer":
             club_organizer_profile = getattr(user, "club_organizer_profile", None)
             if club_organizer_profile and club_organizer_profile.club:
-                return Event.objects.filter(club=club_organizer_profile.club)
+                events = Event.objects.filter(club=club_organizer_profile.club)
             else:
                 # Return empty queryset if club organizer has no club assigned
                 return Event.objects.none()
 
         # admins see all events
-        return Event.objects.all()
+        else:
+            events = Event.objects.all()
+
+        events = events.select_related(
+            "created_by",
+            "aicte_category",
+            "primary_hall",
+            "secondary_hall",
+            "assigned_hall",
+        ).annotate(registration_count=Count("registrations"))
+        if self._include_registrations():
+            events = events.prefetch_related(
+                Prefetch(
+                    "registrations",
+                    queryset=EventRegistration.objects.select_related("student"),
+                )
+            )
+        return events
+
+    def _include_registrations(self):
+        """Lists only nest registrations when asked to with ?expand=registrations."""
+        if self.action != "list":
+            return True
+        expand = self.request.query_params.get("expand", "")
+        return "registrations" in [name.strip() for name in expand.split(",")]
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["include_registrations"] = self._include_registrations()
+        return context
+
+    @cached_response("events")
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
 
     def perform_create(self, serializer):
         user = self.request.user
@@ -1824,7 +1965,7 @@ class EventViewSet(viewsets.ModelViewSet):
             and event._original_status != "cancelled"
         ):
             self._send_cancellation_emails(
-                event, reason=request.data.get("cancellation_reason", "")
+                event, reason=self.request.data.get("cancellation_reason", "")
             )
 
         log_action(user, f"Updated Event: {event.name}")
@@ -1838,13 +1979,12 @@ class EventViewSet(viewsets.ModelViewSet):
         if event.assigned_hall:
             return
 
-        # Try to assign hall using event's assign_hall method
-        hall_assigned = event.assign_hall()
-        event.save()
-
-        if hall_assigned:
-            # Create hall booking for the assigned hall
-            try:
+        def assign():
+            # Try to assign hall using event's assign_hall method, holding
+            # the preferred halls' locks for the day until the booking exists
+            hall_assigned = event.assign_hall()
+            event.save()
+            if hall_assigned:
                 HallBooking.objects.create(
                     hall=event.assigned_hall,
                     event=event,
@@ -1855,22 +1995,36 @@ class EventViewSet(viewsets.ModelViewSet):
                     booked_by=event.created_by,
                     approved_by=event.created_by,  # Auto-approved since preferences checked
                 )
-                log_action(
-                    event.created_by,
-                    f"Auto-assigned hall {event.assigned_hall.name} to event {event.name}",
-                )
-            except Exception as e:
-                # Log error but don't prevent event creation
-                print(f"Error creating hall booking: {e}")
+            return hall_assigned
+
+        preferred_halls = [
+            (hall_id, event.event_date)
+            for hall_id in (event.primary_hall_id, event.secondary_hall_id)
+            if hall_id
+        ]
+        try:
+            hall_assigned = run_locked(preferred_halls, assign)
+        except Exception as e:
+            # Log error but don't prevent event update
+            print(f"Error creating hall booking: {e}")
+            return
+
+        if hall_assigned:
+            log_action(
+                event.created_by,
+                f"Auto-assigned hall {event.assigned_hall.name} to event {event.name}",
+            )
         else:
             # No hall available - create notification for organizer
             organizer_profile = getattr(event.club, "organizers", None)
             if organizer_profile and organizer_profile.exists():
                 organizer = organizer_profile.first().user
-                Notification.objects.create(
-                    user=organizer,
-                    title="Hall Assignment Failed",
-                    message=f"No halls available for event '{event.name}' on {event.event_date} from {event.start_time}. Please reschedule or contact admin.",
+                notify(
+                    [organizer],
+                    "warning",
+                    "Hall Assignment Failed",
+                    f"No halls available for event '{event.name}' on {event.event_date} from {event.start_time}. Please reschedule or contact admin.",
+                    event=event,
                 )
             log_action(
                 event.created_by,
@@ -1879,21 +2033,27 @@ class EventViewSet(viewsets.ModelViewSet):
 
     def _send_cancellation_emails(self, event, reason=""):
         """
-        Send cancellation emails to all registered students for this event
+        Notify all registered students that this event is cancelled, in the
+        app and by email as each prefers (see api.notifications)
         """
-        registrations = EventRegistration.objects.filter(
-            event=event, status__in=["REGISTERED", "ATTENDED"]
-        ).select_related("student__user")
-
-        for registration in registrations:
-            student = registration.student
-            try:
-                threading.Thread(
-                    target=send_event_cancellation_email,
-                    args=(student.user, event, reason),
-                ).start()
-            except Exception as e:
-                print(f"Error sending cancellation email to {student.user.email}: {e}")
+        students = User.objects.filter(
+            student_profile__event_registrations__event=event,
+            student_profile__event_registrations__status__in=[
+                "REGISTERED",
+                "ATTENDED",
+            ],
+        )
+        message = f"'{event.name}' on {event.event_date} has been cancelled."
+        if reason:
+            message += f" Reason: {reason}"
+        notify(
+            students,
+            "event_cancellation",
+            "Event Cancelled",
+            message,
+            email=("event_cancellation", event_cancellation_context(event, reason)),
+            event=event,
+        )
 
     def retrieve(self, request, *args, **kwargs):
         """Override retrieve to set _original_status for comparison in update"""
@@ -1961,15 +2121,16 @@ class EventViewSet(viewsets.ModelViewSet):
         if not created:
             return Response({"message": "Already registered."})
 
-        # Send event registration confirmation email
+        # Confirm in the app and by email, as the student prefers
         try:
-            certificate_url = request.build_absolute_uri(
-                "/certificates"
-            )  # Placeholder for certificate download URL
-            threading.Thread(
-                target=send_event_registration_email,
-                args=(student.user, event, certificate_url),
-            ).start()
+            notify(
+                [student.user],
+                "event_registration",
+                "Event Registration Confirmed",
+                f"You are registered for '{event.name}' on {event.event_date}.",
+                email=("event_registration", event_registration_context(event)),
+                event=event,
+            )
         except Exception as e:
             print(f"Error sending event registration email: {e}")
 
@@ -2027,6 +2188,8 @@ class EventViewSet(viewsets.ModelViewSet):
           - student_id OR usn (prefer student_id)
           - attendance (present/cancelled/no-show) or is_present (1/0/true/false)
         If no file provided and request contains 'attendance' array, uses that.
+
+        The import runs as a background job; poll /jobs/<job_id>/ for the result.
         """
         event = self.get_object()
 
@@ -2039,322 +2202,139 @@ class EventViewSet(viewsets.ModelViewSet):
 
         # If multipart file present
         file_obj = request.FILES.get("file")
-        attendance_items = []
 
         if file_obj:
             filename = file_obj.name.lower()
-            if filename.endswith(".csv"):
-                try:
-                    decoded = file_obj.read().decode("utf-8")
-                    reader = csv.DictReader(io.StringIO(decoded))
-                    for row in reader:
-                        attendance_items.append(row)
-                except Exception as e:
-                    return Response(
-                        {"error": f"Failed to parse CSV: {str(e)}"},
-                        status=status.HTTP_400_BAD_REQUEST,
-                    )
-            elif filename.endswith(".xlsx") or filename.endswith(".xls"):
-                try:
-                    wb = openpyxl.load_workbook(file_obj, data_only=True)
-                    ws = wb.active
-                    headers = [
-                        cell.value for cell in next(ws.iter_rows(min_row=1, max_row=1))
-                    ]
-                    for row in ws.iter_rows(min_row=2, values_only=True):
-                        row_dict = {headers[i]: row[i] for i in range(len(headers))}
-                        attendance_items.append(row_dict)
-                except Exception as e:
-                    return Response(
-                        {"error": f"Failed to parse Excel: {str(e)}"},
-                        status=status.HTTP_400_BAD_REQUEST,
-                    )
-            else:
+            if not filename.endswith((".csv", ".xlsx", ".xls")):
                 return Response(
                     {"error": "Unsupported file type; only .csv and .xlsx allowed"},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
+            # Keep the upload in storage until the worker has imported it
+            stored_path = default_storage.save(
+                f"job_uploads/attendance_{event.id}_{file_obj.name}", file_obj
+            )
+            payload = {"file": stored_path, "filename": file_obj.name}
         else:
             # fallback to json attendance array
             attendance_items = request.data.get("attendance", [])
-
-        if not isinstance(attendance_items, list):
-            return Response(
-                {"error": "Attendance payload must be a list"},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
-        created_count = 0
-        points_created = 0
-        certificates_created = 0
-
-        with transaction.atomic():
-            for item in attendance_items:
-                # support student_id or usn; normalize keys (strings)
-                student_id = (
-                    item.get("student_id") or item.get("studentId") or item.get("id")
-                )
-                usn = item.get("usn") or item.get("USN")
-                attendance_flag = (
-                    item.get("attendance")
-                    or item.get("status")
-                    or item.get("is_present")
-                )
-                # normalize attendance flag
-                is_present = False
-                if attendance_flag is None:
-                    # if missing, default to present
-                    is_present = True
-                else:
-                    s = str(attendance_flag).strip().lower()
-                    if s in ["present", "p", "1", "true", "yes", "attended"]:
-                        is_present = True
-                    else:
-                        is_present = False
-
-                try:
-                    if student_id:
-                        student = Student.objects.get(id=int(student_id))
-                    elif usn:
-                        student = Student.objects.get(usn=usn)
-                    else:
-                        # skip if cannot identify
-                        continue
-                except Student.DoesNotExist:
-                    continue
-
-                attendance_record, created = EventAttendance.objects.update_or_create(
-                    event=event,
-                    student=student,
-                    defaults={"is_present": is_present, "marked_by": request.user},
+            if not isinstance(attendance_items, list):
+                return Response(
+                    {"error": "Attendance payload must be a list"},
+                    status=status.HTTP_400_BAD_REQUEST,
                 )
-                if created:
-                    created_count += 1
-
-                # allocate AICTE points in PENDING if present and event awards points
-                if is_present and event.aicte_category and event.points_awarded > 0:
-                    # Generate 8-character verification code with random alphanumeric characters
-                    verification_code = "".join(
-                        secrets.choice(string.ascii_letters + string.digits)
-                        for _ in range(8)
-                    )
+            payload = {"attendance": attendance_items}
 
-                    # Use get_or_create to prevent duplicate AICTE transactions for the same student-event
-                    aicte_transaction, created = (
-                        AICTEPointTransaction.objects.get_or_create(
-                            student=student,
-                            event=event,
-                            defaults={
-                                "category": event.aicte_category,
-                                "points_allocated": event.points_awarded,
-                                "verification_code": verification_code,
-                                "status": "PENDING",
-                                "created_at": now(),
-                            },
-                        )
-                    )
-
-                    if created:
-                        points_created += 1
-
-                # generate basic certificate placeholder (Certificate model may need file generation later)
-                if is_present:
-                    cert, cert_created = Certificate.objects.get_or_create(
-                        event=event, student=student
-                    )
-                    if cert_created:
-                        # create a QR placeholder - not full PDF generation here
-                        qr_data = f"Certificate ID: {cert.id}, Event: {event.id}, Student: {student.usn}"
-                        qr = qrcode.make(qr_data)
-                        # If Certificate has an image/file field:
-                        # buffer = io.BytesIO()
-                        # qr.save(buffer, format='PNG')
-                        # cert.qr_image.save(f"cert_{cert.id}_qr.png", ContentFile(buffer.getvalue()))
-                        certificates_created += 1
-
-            # mark event completed if not already
-            if event.status != "completed":
-                event.status = "completed"
-                event.save()
-            log_action(
-                request.user,
-                f"Uploaded attendance for event {event.name}: created {created_count} attendance records, {points_created} AICTE transactions, {certificates_created} certificates",
-            )
+        job = enqueue("upload_attendance", payload, user=request.user, event=event)
+        log_action(request.user, f"Queued attendance upload for event {event.name}")
 
         return Response(
             {
-                "message": "Attendance processed",
-                "attendance_records_created": created_count,
-                "aicte_transactions_created": points_created,
-                "certificates_created": certificates_created,
+                "message": "Attendance upload queued for processing",
+                "job_id": job.id,
+                "job": BackgroundJobSerializer(job).data,
             },
-            status=status.HTTP_200_OK,
+            status=status.HTTP_202_ACCEPTED,
         )
 
     @action(detail=True, methods=["post"], url_path="generate-certificates")
     def generate_certificates(self, request, pk=None):
-        """Generate certificates for event participants (idempotent)"""
-        import hashlib
-        from os import path
+        """
+        Generate certificates for event participants (idempotent).
 
+        Rendering runs as a background job; progress is available from
+        certificate-progress and the job from /jobs/<job_id>/.
+        """
         event = self.get_object()
         if event.status != "completed":
             raise ValidationError(
                 "Certificates can only be generated for completed events."
             )
-
-        attendees = EventAttendance.objects.filter(
-            event=event, is_present=True
-        ).select_related("student__user")
-        if not attendees.exists():
+        if not EventAttendance.objects.filter(event=event, is_present=True).exists():
             raise ValidationError("No attendees found for this event.")
 
-        # Determine template type based on AICTE category
-        template_type = "certificate_regular"
-        if event.aicte_category:
-            template_type = "certificate_aicte"
-
-        template_dir = path.join(settings.MEDIA_ROOT, "certificates", "templates")
-        template_path = path.join(template_dir, f"{template_type}.png")
-        metadata_path = path.join(template_dir, f"{template_type}.json")
-
-        if not path.exists(template_path) or not path.exists(metadata_path):
-            raise ValidationError(
-                f"Certificate template or metadata file not found: {template_type}"
-            )
+        job = enqueue(
+            "generate_certificates",
+            {"base_url": request.build_absolute_uri("/")},
+            user=request.user,
+            event=event,
+        )
+        log_action(
+            request.user, f"Queued certificate generation for event: {event.name}"
+        )
 
-        # Get signature paths
-        faculty_signature_path = ""
-        principal_signature_path = ""
+        return Response(
+            {
+                "message": f'Certificate generation for "{event.name}" has been queued.',
+                "job_id": job.id,
+                "job": BackgroundJobSerializer(job).data,
+            },
+            status=status.HTTP_202_ACCEPTED,
+        )
 
-        # Try to get faculty signature from club coordinator
-        if event.club and event.club.faculty_coordinator:
-            mentor = event.club.faculty_coordinator
-            if hasattr(mentor, "signature") and mentor.signature:
-                faculty_signature_path = path.join(
-                    settings.MEDIA_ROOT, str(mentor.signature)
-                )
-            elif hasattr(mentor.user, "signature") and mentor.user.signature:
-                faculty_signature_path = path.join(
-                    settings.MEDIA_ROOT, str(mentor.user.signature)
-                )
+    @action(detail=True, methods=["get"], url_path="export-certificates")
+    def export_certificates(self, request, pk=None):
+        """
+        Download every generated certificate of the event in one response.
 
-        # Try to get principal signature from PrincipalSignature model
-        active_principal_sig = PrincipalSignature.objects.filter(is_active=True).first()
-        if active_principal_sig and active_principal_sig.signature_image:
-            principal_signature_path = path.join(
-                settings.MEDIA_ROOT, str(active_principal_sig.signature_image)
-            )
-
-        # Delete existing certificates for this event to enable re-generation
-        existing_certs = Certificate.objects.filter(event=event)
-        existing_count = existing_certs.count()
-        if existing_count > 0:
-            for cert in existing_certs:
-                # Delete the file from storage
-                if cert.file:
-                    cert.file.delete(save=False)
-            existing_certs.delete()
-            log_action(
-                request.user,
-                f"Deleted {existing_count} existing certificates for event: {event.name}",
+        ?type=zip (default) streams a ZIP of the individual PDFs;
+        ?type=pdf returns a single merged multi-page PDF.
+        """
+        event = self.get_object()
+        export_type = request.query_params.get("type", "zip").lower()
+        if export_type not in ("zip", "pdf"):
+            raise ValidationError("type must be 'zip' or 'pdf'.")
+
+        certificates = (
+            Certificate.objects.filter(event=event)
+            .exclude(file__isnull=True)
+            .exclude(file="")
+            .select_related("student")
+            .order_by("student__usn")
+        )
+        if not certificates.exists():
+            return Response(
+                {"error": "No certificates have been generated for this event."},
+                status=status.HTTP_404_NOT_FOUND,
             )
 
-        certificate_count = 0
-        errors = []
-
-        for attendance in attendees:
-            student = attendance.student
-            try:
-                # Create new certificate record (force new since old ones deleted)
-                certificate = Certificate.objects.create(
-                    event=event, student=student, issue_date=now()
-                )
-
-                # Generate certificate using CertificateGenerator
-                generator = CertificateGenerator(template_path, metadata_path)
-
-                # Add verification code if there's an AICTE transaction for this student/event
-                aicte_transaction = AICTEPointTransaction.objects.filter(
-                    student=student, event=event
-                ).first()
-                code = (
-                    aicte_transaction.verification_code
-                    if aicte_transaction and aicte_transaction.verification_code
-                    else "N/A"
-                )
-                qr_text = f"Certificate ID: {certificate.id}, Student: {student.usn}, Event: {event.name}, Verification Code: {code}"
-
-                # Generate certificate PDF
-                pdf_buffer = generator.generate_certificate(
-                    template_type=template_type,
-                    student_name=student.user.get_full_name() or student.user.username,
-                    event_name=event.name,
-                    club_name=event.club.name if event.club else "",
-                    date=event.event_date.strftime("%d %b %Y"),
-                    usn=getattr(student, "usn", "N/A"),
-                    points=event.points_awarded if event.aicte_category else 0,
-                    qr_text=qr_text,
-                    faculty_signature_path=faculty_signature_path,
-                    principal_signature_path=principal_signature_path,
-                )
-
-                # Save PDF to certificate record with proper naming
-                file_name = f"certificate_{certificate.id}.pdf"
-                certificate.file.save(
-                    file_name, ContentFile(pdf_buffer.getvalue()), save=True
-                )
-
-                # Generate hash for verification
-                pdf_buffer.seek(0)
-                file_hash = hashlib.sha256(pdf_buffer.read()).hexdigest()
-                certificate.file_hash = file_hash
-                certificate.save()
-
-                certificate_count += 1
-
-                # Create notifications for students
-                Notification.objects.create(
-                    user=student.user,
-                    title="Certificate Generated",
-                    message=f"Your certificate for '{event.name}' has been generated successfully.",
-                    notification_type="certificate_generated",
-                    event=event,
-                )
-
-                # Send certificate generation email
-                certificate_url = (
-                    request.build_absolute_uri(certificate.file.url)
-                    if certificate.file
-                    else None
-                )
-                try:
-                    threading.Thread(
-                        target=send_certificate_generation_email,
-                        args=(student.user, event, certificate_url),
-                    ).start()
-                except Exception as e:
-                    print(f"Error sending certificate generation email: {e}")
-
-            except Exception as e:
-                errors.append(f"Student {student.user.username}: {str(e)}")
-                continue
-
         log_action(
             request.user,
-            f"Generated {certificate_count} certificates for event: {event.name}",
+            f"Exported certificates ({export_type}) for event: {event.name}",
         )
+        filename = f"event_{event.id}_certificates.{export_type}"
 
-        response_data = {
-            "message": f'Successfully generated {certificate_count} certificates for event "{event.name}".',
-            "certificate_count": certificate_count,
-        }
+        if export_type == "zip":
+            response = StreamingHttpResponse(
+                iter_certificates_zip(certificates.iterator(chunk_size=200)),
+                content_type="application/zip",
+            )
+            response["Content-Disposition"] = f'attachment; filename="{filename}"'
+            return response
 
-        if errors:
-            response_data["errors"] = errors
-            response_data["warning"] = f"{len(errors)} certificates failed to generate."
+        merged, page_count = build_certificates_pdf(
+            certificates.iterator(chunk_size=200)
+        )
+        response = FileResponse(
+            merged,
+            as_attachment=True,
+            filename=filename,
+            content_type="application/pdf",
+        )
+        response["X-Page-Count"] = str(page_count)
+        return response
 
-        return Response(response_data)
+    @action(detail=True, methods=["get"], url_path="certificate-progress")
+    def certificate_progress(self, request, pk=None):
+        """Progress of the latest certificate generation run for this event"""
+        event = self.get_object()
+        run = event.certificate_runs.first()
+        if run is None:
+            return Response(
+                {"detail": "Certificates have not been generated for this event."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return Response(CertificateGenerationRunSerializer(run).data)
 
 
 class EventAttendanceViewSet(viewsets.ModelViewSet):
@@ -2443,27 +2423,147 @@ class HallViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Get all available halls
-        all_halls = Hall.objects.filter(is_available=True)
-
-        # Find halls with conflicts
-        conflicting_hall_ids = (
-            HallBooking.objects.filter(
-                booking_date=booking_date,
-                booking_status__in=["APPROVED", "PENDING"],
-                start_time__lt=end_time,
-                end_time__gt=start_time,
-            )
-            .values_list("hall_id", flat=True)
-            .distinct()
+        # Available halls are those without an overlapping booking
+        available_halls = free_halls(
+            Hall.objects.filter(is_available=True), booking_date, start_time, end_time
         )
 
-        # Available halls are those without conflicts
-        available_halls = all_halls.exclude(id__in=conflicting_hall_ids)
-
         serializer = self.get_serializer(available_halls, many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=["get"])
+    def calendar(self, request):
+        """
+        Free and busy intervals of halls for every day of a date range.
+        Query params:
+        - start: (YYYY-MM-DD) required, first day
+        - end: (YYYY-MM-DD) optional, last day (default: a week from start,
+          at most CALENDAR_MAX_DAYS days)
+        - halls: optional, comma-separated hall ids (default: all halls)
+        - opens, closes: (HH:MM) optional, the part of each day free
+          intervals are reported for (default: the whole day)
+        Responses carry an ETag; If-None-Match with the current tag gets
+        a 304 without reading the bookings.
+        """
+        params = request.query_params
+        try:
+            first_day = datetime.strptime(params["start"], "%Y-%m-%d").date()
+            last_day = (
+                datetime.strptime(params["end"], "%Y-%m-%d").date()
+                if params.get("end")
+                else first_day + timedelta(days=6)
+            )
+            opens, closes = (
+                datetime.strptime(params[name], "%H:%M").time()
+                if params.get(name)
+                else None
+                for name in ("opens", "closes")
+            )
+            hall_ids = (
+                [int(hall_id) for hall_id in params["halls"].split(",") if hall_id]
+                if params.get("halls")
+                else None
+            )
+        except (KeyError, ValueError):
+            return Response(
+                {
+                    "error": "start (YYYY-MM-DD) is required; end is YYYY-MM-DD, opens and closes are HH:MM, halls is a comma-separated list of ids"
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if not 0 <= (last_day - first_day).days < CALENDAR_MAX_DAYS:
+            return Response(
+                {
+                    "error": f"end must be on or after start and within {CALENDAR_MAX_DAYS} days of it"
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if opens and closes and opens >= closes:
+            return Response(
+                {"error": "opens must be before closes"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        halls = self.get_queryset()
+        if hall_ids is not None:
+            halls = halls.filter(id__in=hall_ids)
+        hall_ids = list(halls.order_by("name").values_list("id", flat=True))
+
+        etag = hall_calendar_etag(hall_ids, first_day, last_day, opens, closes)
+        if_none_match = request.headers.get("If-None-Match", "")
+        if etag in parse_etags(if_none_match) or if_none_match.strip() == "*":
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            grid = hall_calendar(hall_ids, first_day, last_day, opens, closes)
+            response = Response(
+                [
+                    {
+                        "hall": hall_id,
+                        "days": [
+                            {
+                                "date": day["date"],
+                                "busy": [
+                                    {"start_time": start, "end_time": end}
+                                    for start, end in day["busy"]
+                                ],
+                                "free": [
+                                    {"start_time": start, "end_time": end}
+                                    for start, end in day["free"]
+                                ],
+                            }
+                            for day in days
+                        ],
+                    }
+                    for hall_id, days in grid.items()
+                ]
+            )
+        response["ETag"] = etag
+        # Let the browser keep the calendar but revalidate it every time
+        response["Cache-Control"] = "private, no-cache"
+        return response
+
+    @action(detail=True, methods=["get"])
+    def next_slot(self, request, pk=None):
+        """
+        Find the next free slot of a hall.
+        Query params:
+        - date: (YYYY-MM-DD) required, first day to search
+        - minutes: required, length of the slot
+        - after: (HH:MM) optional, earliest start on the first day
+        - days: optional, number of days to search (default 1, at most 31)
+        """
+        hall = self.get_object()
+        try:
+            day = datetime.strptime(request.query_params["date"], "%Y-%m-%d").date()
+            minutes = int(request.query_params["minutes"])
+            after = request.query_params.get("after")
+            after = datetime.strptime(after, "%H:%M").time() if after else None
+            days = min(int(request.query_params.get("days", 1)), 31)
+            if minutes <= 0 or days <= 0:
+                raise ValueError
+        except (KeyError, ValueError):
+            return Response(
+                {
+                    "error": "date (YYYY-MM-DD) and a positive minutes are required; after is HH:MM"
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        slot = next_free_slot(hall, day, minutes, after=after, days=days)
+        if slot is None:
+            return Response({"hall": hall.id, "slot": None})
+        slot_date, start_time, end_time = slot
+        return Response(
+            {
+                "hall": hall.id,
+                "slot": {
+                    "date": slot_date,
+                    "start_time": start_time,
+                    "end_time": end_time,
+                },
+            }
+        )
+
 
 class HallBookingViewSet(viewsets.ModelViewSet):
     queryset = HallBooking.objects.all().select_related("hall", "event", "booked_by")
@@ -2489,6 +2589,10 @@ class HallBookingViewSet(viewsets.ModelViewSet):
         # admins see all hall bookings
         return HallBooking.objects.all().select_related("hall", "event", "booked_by")
 
+    @cached_response("halls", "events")
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
     def get_permissions(self):
         # keep default but individual actions enforce role
         if self.action in ["approve", "reject", "list_admin_pending"]:
@@ -2496,17 +2600,17 @@ class HallBookingViewSet(viewsets.ModelViewSet):
         return super().get_permissions()
 
     def _has_conflict(self, hall, booking_date, start_time, end_time):
-        # returns True if any approved or pending booking overlaps
-        qs = HallBooking.objects.filter(hall=hall, booking_date=booking_date).exclude(
-            pk=self.kwargs.get("pk", None)
+        # returns True if any approved or pending booking (other than the
+        # one being approved) overlaps [start_time, end_time)
+        pk = self.kwargs.get("pk")
+        return not is_hall_free(
+            hall,
+            booking_date,
+            start_time,
+            end_time,
+            exclude_booking=int(pk) if pk else None,
+            use_cache=False,
         )
-        # consider both pending and approved to avoid overlaps
-        qs = qs.filter(booking_status__in=["PENDING", "APPROVED"])
-        for b in qs:
-            # convert to comparable times
-            if b.start_time <= end_time and start_time <= b.end_time:
-                return True
-        return False
 
     def create(self, request, *args, **kwargs):
         """
@@ -2546,22 +2650,24 @@ class HallBookingViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        conflict = self._has_conflict(hall, booking_date_obj, start_time, end_time)
-
-        # set booking_status based on conflict
-        data["booking_status"] = "PENDING" if conflict else "APPROVED"
-        data["booked_by"] = request.user.id
-
         serializer = self.get_serializer(data=data)
         serializer.is_valid(raise_exception=True)
 
-        with transaction.atomic():
-            booking = serializer.save()
+        def book():
+            # Runs holding the hall's lock for the day, so no other booking
+            # of the slot can be approved between the check and the save
+            conflict = self._has_conflict(
+                hall, booking_date_obj, start_time, end_time
+            )
+            serializer.instance = None  # a retry starts from scratch
+            booking = serializer.save(
+                # set booking_status based on conflict
+                booking_status="PENDING" if conflict else "APPROVED",
+                booked_by=request.user,
+                # automatic approval by system (user)
+                approved_by=None if conflict else request.user,
+            )
             if not conflict:
-                booking.approved_by = (
-                    request.user
-                )  # automatic approval by system (user)
-                booking.save()
                 log_action(
                     request.user,
                     f"Auto-approved hall booking: {booking.hall.name} on {booking.booking_date} {booking.start_time}-{booking.end_time}",
@@ -2572,6 +2678,8 @@ class HallBookingViewSet(viewsets.ModelViewSet):
                     f"Created pending hall booking: {booking.hall.name} on {booking.booking_date} {booking.start_time}-{booking.end_time}",
                 )
 
+        run_locked([(hall, booking_date_obj)], book)
+
         headers = self.get_success_headers(serializer.data)
         return Response(
             serializer.data, status=status.HTTP_201_CREATED, headers=headers
@@ -2583,29 +2691,39 @@ class HallBookingViewSet(viewsets.ModelViewSet):
         if request.user.user_type != "admin":
             raise PermissionDenied("Only administrators can approve bookings")
         booking = self.get_object()
-        if booking.booking_status == "APPROVED":
-            return Response(
-                {"detail": "Booking already approved"},
-                status=status.HTTP_400_BAD_REQUEST,
+
+        def approve_booking():
+            # Re-read under the hall's lock for the day: another admin may
+            # have approved this or an overlapping booking meanwhile
+            booking.refresh_from_db()
+            if booking.booking_status == "APPROVED":
+                return Response(
+                    {"detail": "Booking already approved"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            # check again for conflicts before approving
+            if self._has_conflict(
+                booking.hall,
+                booking.booking_date,
+                booking.start_time,
+                booking.end_time,
+            ):
+                return Response(
+                    {"error": "Conflicting booking found — cannot approve"},
+                    status=status.HTTP_409_CONFLICT,
+                )
+            booking.booking_status = "APPROVED"
+            booking.approved_by = request.user
+            booking.save()
+            log_action(
+                request.user,
+                f"Approved hall booking: {booking.hall.name} for {booking.event.name if booking.event else 'N/A'}",
             )
-        # check again for conflicts before approving
-        if self._has_conflict(
-            booking.hall, booking.booking_date, booking.start_time, booking.end_time
-        ):
             return Response(
-                {"error": "Conflicting booking found — cannot approve"},
-                status=status.HTTP_409_CONFLICT,
+                {"message": "Hall booking approved", "status": booking.booking_status}
             )
-        booking.booking_status = "APPROVED"
-        booking.approved_by = request.user
-        booking.save()
-        log_action(
-            request.user,
-            f"Approved hall booking: {booking.hall.name} for {booking.event.name if booking.event else 'N/A'}",
-        )
-        return Response(
-            {"message": "Hall booking approved", "status": booking.booking_status}
-        )
+
+        return run_locked([(booking.hall_id, booking.booking_date)], approve_booking)
 
     @action(detail=True, methods=["post"])
     def reject(self, request, pk=None):
@@ -2687,18 +2805,25 @@ class CertificateViewSet(viewsets.ReadOnlyModelViewSet):
 
     serializer_class = CertificateSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = HeaderCursorPagination
+    cursor_ordering = ("-issue_date", "-id")
 
     def get_queryset(self):
         user = self.request.user
+        certificates = Certificate.objects.select_related("student", "event")
         if user.user_type == "student":
-            return Certificate.objects.filter(student__user=user)
+            return certificates.filter(student__user=user)
         elif user.user_type == "mentor":
             mentees = Student.objects.filter(mentor__user=user)
-            return Certificate.objects.filter(student__in=mentees)
+            return certificates.filter(student__in=mentees)
         elif user.user_type == "admin":
-            return Certificate.objects.all()
+            return certificates.all()
         return Certificate.objects.none()
 
+    @cached_response("certificates")
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
     @action(detail=False, methods=["get"], url_path="verify/(?P<file_hash>[^/.]+)")
     def verify(self, request, file_hash=None):
         """Verify certificate by file hash"""
@@ -2757,10 +2882,14 @@ class AICTEPointTransactionViewSet(viewsets.ModelViewSet):
     queryset = AICTEPointTransaction.objects.all()
     serializer_class = AICTEPointTransactionSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = HeaderCursorPagination
+    cursor_ordering = ("-created_at", "-id")
 
     def get_queryset(self):
         user = self.request.user
-        queryset = AICTEPointTransaction.objects.all()
+        queryset = AICTEPointTransaction.objects.select_related(
+            "student__user", "event", "category", "approved_by"
+        )
 
         # Apply user-type based filtering
         if user.user_type == "student":
@@ -2780,6 +2909,10 @@ class AICTEPointTransactionViewSet(viewsets.ModelViewSet):
 
         return queryset
 
+    @cached_response("aicte")
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
     @action(detail=True, methods=["post"])
     def approve(self, request, pk=None):
         """Mentor approval of AICTE points"""
@@ -2815,15 +2948,8 @@ class AICTEPointTransactionViewSet(viewsets.ModelViewSet):
         tx.approval_date = now()
         tx.save()
 
-        # Send AICTE points approval email
-        try:
-            threading.Thread(
-                target=send_points_decision_email,
-                args=(tx.student.user, tx.event, tx.points_allocated, "approved"),
-            ).start()
-        except Exception as e:
-            print(f"Error sending AICTE points approval email: {e}")
-
+        # The student is notified and emailed by
+        # signals.notify_on_transaction_status_change
         log_action(request.user, f"Approved AICTE transaction ID {tx.id}")
 
         return Response({"message": "Points approved successfully."})
@@ -2843,21 +2969,8 @@ class AICTEPointTransactionViewSet(viewsets.ModelViewSet):
         tx.approval_date = now()
         tx.save()
 
-        # Send AICTE points rejection email
-        try:
-            threading.Thread(
-                target=send_points_decision_email,
-                args=(
-                    tx.student.user,
-                    tx.event,
-                    tx.points_allocated,
-                    "rejected",
-                    tx.rejection_reason,
-                ),
-            ).start()
-        except Exception as e:
-            print(f"Error sending AICTE points rejection email: {e}")
-
+        # The student is notified and emailed by
+        # signals.notify_on_transaction_status_change
         log_action(request.user, f"Rejected AICTE transaction ID {tx.id}")
 
         return Response({"message": "Points rejected."})
@@ -2876,6 +2989,8 @@ class NotificationViewSet(viewsets.ModelViewSet):
     queryset = Notification.objects.all()
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = HeaderCursorPagination
+    cursor_ordering = ("-created_at", "-id")
 
     def get_queryset(self):
         return self.queryset.filter(user=self.request.user).order_by("-created_at")
@@ -3015,14 +3130,56 @@ class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
     Audit logs - admin only access.
     """
 
-    queryset = AuditLog.objects.all()
+    queryset = AuditLog.objects.select_related("user")
     serializer_class = AuditLogSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = HeaderCursorPagination
+    cursor_ordering = ("-timestamp", "-id")
 
     def get_queryset(self):
         if self.request.user.user_type != "admin":
             raise PermissionDenied("Only administrators can view audit logs.")
-        return super().get_queryset().order_by("-timestamp")
+        return super().get_queryset().order_by("-timestamp", "-id")
+
+
+class BackgroundJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Background job status - users see the jobs they queued, admins see all.
+    """
+
+    queryset = BackgroundJob.objects.select_related("created_by", "event")
+    serializer_class = BackgroundJobSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.user.user_type != "admin":
+            queryset = queryset.filter(created_by=self.request.user)
+
+        event_id = self.request.query_params.get("event")
+        if event_id:
+            queryset = queryset.filter(event_id=event_id)
+        job_status = self.request.query_params.get("status")
+        if job_status:
+            queryset = queryset.filter(status=job_status.upper())
+        return queryset
+
+    @action(detail=True, methods=["get"])
+    def credentials(self, request, pk=None):
+        """
+        The accounts created by a finished bulk user import and their
+        temporary passwords, as CSV.
+        """
+        job = self.get_object()
+        if job.job_type != "provision_users" or job.status != "SUCCEEDED":
+            raise ValidationError("Only finished user imports have credentials.")
+        response = HttpResponse(
+            credentials_csv(job.result["created_users"]), content_type="text/csv"
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="user_credentials_{job.id}.csv"'
+        )
+        return response
 
 
 @api_view(["GET"])
@@ -3038,17 +3195,17 @@ def dashboard_stats(request):
                 {"error": "Student profile not found"}, status=status.HTTP_404_NOT_FOUND
             )
 
+        keys = {
+            "events_registered": student_key(student.id, "registrations"),
+            "certificates_earned": student_key(student.id, "certificates"),
+            "pending_approvals": student_key(student.id, "pending_approvals"),
+        }
+        counters = get_counters(keys.values())
         return Response(
             {
                 "role": "student",
                 "total_aicte_points": student.total_aicte_points,
-                "events_registered": student.event_registrations.count(),
-                "certificates_earned": Certificate.objects.filter(
-                    student=student
-                ).count(),
-                "pending_approvals": AICTEPointTransaction.objects.filter(
-                    student=student, status="PENDING"
-                ).count(),
+                **{name: counters[key] for name, key in keys.items()},
             }
         )
 
@@ -3059,29 +3216,34 @@ def dashboard_stats(request):
                 {"error": "Mentor profile not found"}, status=status.HTTP_404_NOT_FOUND
             )
 
-        mentees = Student.objects.filter(mentor=mentor)
-        pending_approvals = AICTEPointTransaction.objects.filter(
-            student__in=mentees, status="PENDING"
-        ).count()
+        counters = get_counters(
+            [
+                mentor_key(mentor.id, "mentees"),
+                mentor_key(mentor.id, "pending_approvals"),
+            ]
+        )
 
         return Response(
             {
                 "role": "mentor",
-                "total_mentees": mentees.count(),
-                "pending_approvals": pending_approvals,
+                "total_mentees": counters[mentor_key(mentor.id, "mentees")],
+                "pending_approvals": counters[
+                    mentor_key(mentor.id, "pending_approvals")
+                ],
                 "profile_completed": mentor.profile_completed,
             }
         )
 
     elif user.user_type == "admin":
+        counters = get_counters(["users", "students", "mentors", "clubs", "events"])
         return Response(
             {
                 "role": "admin",
-                "total_users": User.objects.count(),
-                "total_students": Student.objects.count(),
-                "total_mentors": Mentor.objects.count(),
-                "total_clubs": Club.objects.count(),
-                "total_events": Event.objects.count(),
+                "total_users": counters["users"],
+                "total_students": counters["students"],
+                "total_mentors": counters["mentors"],
+                "total_clubs": counters["clubs"],
+                "total_events": counters["events"],
             }
         )
 
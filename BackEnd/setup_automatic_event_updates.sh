@@ -12,6 +12,12 @@
 # - Scheduled events become "ongoing" when start time is reached
 # - Ongoing/Scheduled events become "completed" when end time is reached
 #
+# Besides this periodic command, two processes must run continuously
+# (docker-compose.prod.yml starts both as the worker and mailer services):
+# - python manage.py run_workers      # certificate generation, attendance import
+# - python manage.py deliver_emails   # sends the emails queued in the outbox;
+#                                     # without it no notification email leaves
+#
 
 # Configuration
 VIRTUAL_ENV_PATH="/home/lazypanda69/Projects/Web_Dev/CertifyTrack/BackEnd/.venv"
@@ -90,6 +96,11 @@ echo "2. Kubernetes CronJob"
 echo "3. AWS Lambda scheduled event"
 echo "4. Django-Q or Celery periodic tasks"
 echo ""
+echo "Also keep these running (e.g. as systemd services or under supervisor):"
+echo "python manage.py run_workers       # Background jobs"
+echo "python manage.py deliver_emails    # Email delivery from the outbox"
+echo "Without deliver_emails, only verification and password reset emails are sent."
+echo ""
 echo "Manual test commands:"
 echo "cd $PROJECT_PATH && source $VIRTUAL_ENV_PATH/bin/activate"
 echo "python manage.py update_event_statuses --dry-run    # Test without changes"
@@ -108,4 +108,28 @@ api.interceptors.response.use(
   }
 );
 
+// Poll a background job (/jobs/<id>/) until it has succeeded or failed.
+// onPoll, if given, is called with the job after every poll.
+const JOB_POLL_INTERVAL_MS = 2000;
+const JOB_WAIT_LIMIT_MS = 10 * 60 * 1000;
+
+export const waitForJob = async (jobId, onPoll) => {
+  const deadline = Date.now() + JOB_WAIT_LIMIT_MS;
+  for (;;) {
+    const { data: job } = await api.get(`/jobs/${jobId}/`);
+    if (onPoll) await onPoll(job);
+    if (job.status === "SUCCEEDED" || job.status === "FAILED") return job;
+    if (Date.now() > deadline) {
+      throw new Error(
+        "The job is still running. Check back later for the result."
+      );
+    }
+    await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+  }
+};
+
+// The message of a failed job: its last error line
+export const jobError = (job) =>
+  (job.error || "").trim().split("\n").pop() || "The job failed";
+
 export default api;
@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from "react";
-import api from "../api";
+import api, { jobError, waitForJob } from "../api";
 
 const EventAttendanceForm = ({ eventId }) => {
   const [events, setEvents] = useState([]);
@@ -111,7 +111,24 @@ const EventAttendanceForm = ({ eventId }) => {
         { headers: { "Content-Type": "multipart/form-data" } }
       );
 
-      alert(res.data.message || "Attendance uploaded successfully!");
+      // The sheet is imported by a background job; wait for its counts
+      const job = await waitForJob(res.data.job_id);
+      if (job.status === "FAILED") {
+        alert(jobError(job));
+        return;
+      }
+      const result = job.result;
+      alert(
+        `Attendance uploaded: ${result.attendance_records_created} created, ` +
+          `${result.attendance_records_updated} updated, ` +
+          `${result.rows_skipped} rows skipped.`
+      );
+      const skipped = result.rows.filter((row) =>
+        ["invalid", "not_found"].includes(row.status)
+      );
+      if (skipped.length > 0) {
+        console.error("Skipped attendance rows:", skipped);
+      }
       setCanGenerateCertificates(true);
 
       await loadParticipants(selectedEvent);
@@ -120,7 +137,11 @@ const EventAttendanceForm = ({ eventId }) => {
       setAttendancePreview([]);
     } catch (err) {
       console.error(err);
-      alert(err.response?.data?.error || "Failed to upload attendance");
+      alert(
+        err.response?.data?.error ||
+          err.message ||
+          "Failed to upload attendance"
+      );
     } finally {
       setLoading(false);
     }
@@ -138,20 +159,31 @@ const EventAttendanceForm = ({ eventId }) => {
         `/events/${selectedEvent}/generate-certificates/`
       );
 
-      const message =
-        res.data.message ||
-        `Successfully generated ${res.data.certificate_count} certificates.`;
-      alert(message);
+      // Rendering runs as a background job; wait until it finishes
+      const job = await waitForJob(res.data.job_id);
+      if (job.status === "FAILED") {
+        alert(jobError(job));
+        return;
+      }
+      alert(
+        `Successfully generated ${job.result.certificate_count} certificates.`
+      );
 
-      if (res.data.errors && res.data.errors.length > 0) {
-        console.error("Certificate generation errors:", res.data.errors);
-        alert(`${res.data.warning}\n\nCheck console for details.`);
+      if (job.result.errors && job.result.errors.length > 0) {
+        console.error("Certificate generation errors:", job.result.errors);
+        alert(
+          `${job.result.errors.length} certificates could not be generated.\n\nCheck console for details.`
+        );
       }
 
       // Allow regenerating certificates even after successful generation
     } catch (err) {
       console.error(err);
-      alert(err.response?.data?.error || "Failed to generate certificates");
+      alert(
+        err.response?.data?.error ||
+          err.message ||
+          "Failed to generate certificates"
+      );
     } finally {
       setGeneratingCertificates(false);
     }
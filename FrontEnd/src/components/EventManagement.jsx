@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from "react";
-import api from "../api";
+import api, { jobError, waitForJob } from "../api";
 import EventAttendanceForm from "./EventAttendanceForm";
 
 const EventManagement = ({ clubId, onEventCreated, onEventUpdated }) => {
@@ -228,21 +228,45 @@ const EventManagement = ({ clubId, onEventCreated, onEventUpdated }) => {
       return;
 
     try {
+      setError("");
       setSuccess("Generating certificates...");
       const res = await api.post(`/events/${eventId}/generate-certificates/`);
 
-      const message =
-        res.data.message ||
-        `Successfully generated ${res.data.certificate_count} certificates.`;
-      setSuccess(message);
+      // Rendering runs as a background job; follow it until it finishes
+      const job = await waitForJob(res.data.job_id, async (job) => {
+        if (job.status !== "RUNNING") return;
+        const { data: run } = await api.get(
+          `/events/${eventId}/certificate-progress/`
+        );
+        if (run.status === "RUNNING") {
+          setSuccess(
+            `Generating certificates... ${run.done} of ${run.total} done`
+          );
+        }
+      });
+      if (job.status === "FAILED") {
+        setSuccess("");
+        setError(jobError(job));
+        return;
+      }
 
-      if (res.data.errors && res.data.errors.length > 0) {
-        console.error("Certificate generation errors:", res.data.errors);
-        setError(`${res.data.warning}\n\nCheck console for details.`);
+      setSuccess(
+        `Successfully generated ${job.result.certificate_count} certificates.`
+      );
+      if (job.result.errors && job.result.errors.length > 0) {
+        console.error("Certificate generation errors:", job.result.errors);
+        setError(
+          `${job.result.errors.length} certificates could not be generated.\n\nCheck console for details.`
+        );
       }
     } catch (err) {
       console.error(err);
-      setError(err.response?.data?.error || "Failed to generate certificates");
+      setSuccess("");
+      setError(
+        err.response?.data?.error ||
+          err.message ||
+          "Failed to generate certificates"
+      );
     }
   };
 
@@ -574,7 +598,7 @@ const EventManagement = ({ clubId, onEventCreated, onEventUpdated }) => {
                       </span>
                     </td>
                     <td className="px-6 py-3">
-                      {event.registrations?.length || 0} /{" "}
+                      {event.registration_count ?? 0} /{" "}
                       {event.max_participants || "∞"}
                     </td>
                     <td className="px-6 py-3 space-x-2">